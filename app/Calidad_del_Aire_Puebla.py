@@ -1,9 +1,13 @@
 import streamlit as st
+from utils import diagnostico
 import pandas as pd
 from utils.data_loader import cargar_datos_dia_anterior
 from utils.graficos import concentracion_horaria_heatmap, concentracion_horaria, area_horaria_estacion
+from utils.estaciones import catalogo
 from utils.mapa import mapa
-from utils.levels_contaminacion import menu_contaminante
+from utils.pestanas import pestana_activa
+from utils.levels_contaminacion import menu_contaminante, clasificar_tabla
+from utils.indicadores import INDICADORES, cargar_indicadores
 
 # Configuración de la página
 st.set_page_config(
@@ -12,23 +16,31 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="collapsed"
 )
+diagnostico.iniciar("inicio")
 
 # =======================
 # Encabezado
 # =======================
+diagnostico.seccion("Encabezado")
 st.title("💨 Calidad del Aire en Puebla - Día Anterior")
 st.caption("Último análisis con datos por estación, contaminante y hora. Incluye visualización y evaluación diaria.")
 
 # ========================
 # Carga y limpieza de datos
 # ========================
+diagnostico.seccion("Carga y limpieza de datos")
 df = cargar_datos_dia_anterior()
 df = df.drop(columns=['O3_8hrs'])
+if df.empty:
+    st.warning("Sin datos del día anterior: la descarga diaria todavía no trae mediciones.")
+    diagnostico.panel()
+    st.stop()
 
 # ========================
 # Estadísticas por estación
 # ========================
-media_por_estacion = df.groupby('Estacion').mean()
+diagnostico.seccion("Estadísticas por estación")
+media_por_estacion = df.groupby('Estacion', observed=True).mean()
 media_por_estacion = media_por_estacion.drop(columns=['DateTime', 'Anio', 'Mes', 'Dia', 'Hora'])
 
 st.markdown("### 🧾 Promedio diario por estación")
@@ -38,19 +50,13 @@ with st.expander("🔍 Ver tabla de promedios por estación"):
 # ========================
 # Evaluación por estación y contaminante
 # ========================
+diagnostico.seccion("Evaluación por estación y contaminante")
 st.markdown("### 🌤️ Evaluación por estación y contaminante")
 
-switcher = {
-    'santa': 'Agua Santa',
-    'bine': 'Benemérito Instituto Normal del Estado (BINE)',
-    'ninfas': 'Las Ninfas',
-    'utp': 'Universidad Tecnológica de Puebla (UTP)',
-    'vel': 'Velódromo'
-}
-
 try:
+    categorias, niveles, _ = clasificar_tabla(media_por_estacion)
     for estacion in media_por_estacion.index:
-        st.markdown(f"#### 🏭 Estación: `{switcher.get(estacion)}`")
+        st.markdown(f"#### 🏭 Estación: `{catalogo().etiqueta(estacion)}`")
         cols = st.columns(3)
         for i, contaminante in enumerate(media_por_estacion.columns):
             valor = media_por_estacion.loc[estacion, contaminante]
@@ -59,7 +65,8 @@ try:
                 cols[i % 3].info(f"**{contaminante}**: No se obtuvo información.")
                 continue
 
-            calidad, nivel, color = menu_contaminante(contaminante, valor)
+            calidad = categorias.loc[estacion, contaminante]
+            nivel = niveles.loc[estacion, contaminante]
             texto = f"**{contaminante}**: {calidad} (Nivel {nivel})\n\n`{valor:.3f} ppm`"
 
             if calidad == "Buena":
@@ -73,9 +80,26 @@ except Exception as e:
     st.error("⚠️ No se pudo generar el resumen por estación.")
     st.text(str(e))
 
+# ========================
+# Indicadores normativos (promedios móviles)
+# ========================
+diagnostico.seccion("Indicadores normativos")
+st.markdown("### ⏱️ Indicadores normativos del día")
+st.caption("Máximo del día de los promedios móviles de 8 h (O3, CO) y 24 h (SO2, PM10, PM2.5); "
+           "cada promedio requiere al menos 75 % de horas con dato.")
+
+fecha_datos = df['DateTime'].min().date()
+indicadores_dia = cargar_indicadores(fecha_datos, fecha_datos)
+maximos = indicadores_dia.groupby('Estacion', observed=True)[list(INDICADORES.values())].max()
+categorias_indicadores, _, _ = clasificar_tabla(maximos)
+tabla_indicadores = (maximos.round(1).astype(str) + " · " + categorias_indicadores).where(maximos.notna(), "Sin datos")
+tabla_indicadores.index = [catalogo().etiqueta(estacion) for estacion in tabla_indicadores.index]
+st.dataframe(tabla_indicadores, use_container_width=True)
+
 # ========================
 # Contaminante más crítico automáticamente
 # ========================
+diagnostico.seccion("Contaminante más crítico")
 contaminantes = ['O3', 'NO2', 'CO', 'SO2', 'PM10', 'PM2_5']
 contaminante_default = max(contaminantes, key=lambda c: df[c].mean())
 selection = st.selectbox("🧪 Selecciona el contaminante a analizar:", contaminantes, index=contaminantes.index(contaminante_default))
@@ -83,6 +107,7 @@ selection = st.selectbox("🧪 Selecciona el contaminante a analizar:", contamin
 # ========================
 # Métricas generales
 # ========================
+diagnostico.seccion("Métricas generales")
 st.markdown("### 📊 Métricas generales del día")
 media_general = df[selection].mean()
 maximo = df[selection].max()
@@ -96,6 +121,7 @@ col_c.metric("Mínimo diario", f"{minimo:.3f} ppm")
 # ========================
 # Comparación + Mapa en columnas
 # ========================
+diagnostico.seccion("Comparación y mapa")
 st.markdown("### 🌡️ Comparación Horaria y Mapa Interactivo")
 col1, col2 = st.columns([1, 1])
 
@@ -129,14 +155,14 @@ with col1:
         st.warning("No se pudo calcular el punto más crítico por falta de datos.")
 
 
-    tabs = st.tabs(["Gráfico de líneas", "Mapa de calor", "Area apilada diaria"])
-    with tabs[0]:
+    vista = pestana_activa(["Gráfico de líneas", "Mapa de calor", "Area apilada diaria"], "vista_inicio")
+    if vista == "Gráfico de líneas":
         st.markdown(f"#### 📈 Evolución horaria de `{selection}`")
         concentracion_horaria(df, selection)
-    with tabs[1]:
+    elif vista == "Mapa de calor":
         st.markdown(f"#### 🔥 Mapa de calor de `{selection}`")
         concentracion_horaria_heatmap(df, selection)
-    with tabs[2]:
+    else:
         st.markdown(f"#### 📊 Área apilada diaria de `{selection}`")
         area_horaria_estacion(df, selection)
 
@@ -147,6 +173,7 @@ with col2:
 # ========================
 # 📎 Información técnica y descarga
 # ========================
+diagnostico.seccion("Información técnica y descarga")
 with st.expander("📎 Ver registros sin procesar"):
     st.dataframe(df, use_container_width=True)
 
@@ -157,3 +184,5 @@ st.download_button(
     file_name="datos_dia_anterior.csv",
     mime="text/csv"
 )
+
+diagnostico.panel()
@@ -1,10 +1,14 @@
 import streamlit as st
+from utils import diagnostico
 import pandas as pd
 import datetime
 import calendar
 
 
-from utils.data_loader import cargar_datos_por_anio
+from utils.data_loader import anios_disponibles, cargar_rango
+from utils.agregados import cargar_cubo
+from utils.estaciones import catalogo
+from utils.pestanas import pestana_activa
 from utils.graficos import (
     evolucion_promedio, concentracion_horaria, concentracion_horaria_heatmap,
     boxplot, barras_promedio, concentracion_diaria_por_mes,
@@ -14,10 +18,12 @@ from utils.graficos import (
 
 # Configuración general de la página
 st.set_page_config(page_title="Histórico de Calidad del Aire", page_icon="📅", layout="wide")
+diagnostico.iniciar("analisis_historico")
 
 # ============================
 # 🧠 Encabezado principal
 # ============================
+diagnostico.seccion("Encabezado principal")
 st.title("📅 Análisis Histórico de la Calidad del Aire en Puebla")
 st.markdown("""
 Explora cómo ha variado la calidad del aire en diferentes estaciones de Puebla.
@@ -25,39 +31,54 @@ Analiza por día, mes, año o compara entre años distintos.
 """)
 
 
-def mostrar_metricas_resumen(df, contaminante):
-    promedio = df[contaminante].mean()
-    maximo = df[contaminante].max()
-    minimo = df[contaminante].min()
+def mostrar_metricas_resumen(df, contaminante, cubo=None):
+    if cubo is not None:
+        resumen = cubo.resumen(contaminante) or dict(promedio=float('nan'), maximo=float('nan'), minimo=float('nan'))
+        promedio, maximo, minimo = resumen['promedio'], resumen['maximo'], resumen['minimo']
+    else:
+        promedio = df[contaminante].mean()
+        maximo = df[contaminante].max()
+        minimo = df[contaminante].min()
 
     col1, col2, col3 = st.columns(3)
     col1.metric("Promedio", f"{promedio:.2f} ppm")
     col2.metric("Máximo", f"{maximo:.2f} ppm")
     col3.metric("Mínimo", f"{minimo:.2f} ppm")
 
-def metricas_anuales(df, contaminante, anio):
-    df['Mes'] = df['DateTime'].dt.month
-    df['Fecha'] = df['DateTime'].dt.date
+def metricas_anuales(df, contaminante, anio, cubo=None):
+    if cubo is not None:
+        # Promedio mensual, pico y promedio total desde el cubo de agregados
+        promedio_mensual = cubo.promedio_mensual(contaminante, por_estacion=False)
+        resumen = cubo.resumen(contaminante)
+        if resumen is None:
+            st.warning(f"Sin datos de {contaminante} para {anio}.")
+            return
+        valor_max, fecha_max, estacion_max = resumen['maximo'], resumen['fecha_maximo'], resumen['estacion_maximo']
+        promedio_anual = resumen['promedio']
+    else:
+        df['Mes'] = df['DateTime'].dt.month
+        df['Fecha'] = df['DateTime'].dt.date
 
-    # Promedio mensual
-    promedio_mensual = df.groupby('Mes')[contaminante].mean()
-    mes_peor = promedio_mensual.idxmax()
-    valor_mes_peor = promedio_mensual.max()
+        # Promedio mensual
+        promedio_mensual = df.groupby('Mes')[contaminante].mean()
 
-    # Día más contaminado
-    idx_max = df[contaminante].idxmax()
-    valor_max = df.loc[idx_max, contaminante]
-    fecha_max = df.loc[idx_max, 'Fecha']
+        # Día más contaminado
+        idx_max = df[contaminante].idxmax()
+        valor_max = df.loc[idx_max, contaminante]
+        fecha_max = df.loc[idx_max, 'Fecha']
 
-    # Promedio total
-    promedio_anual = df[contaminante].mean()
+        # Promedio total
+        promedio_anual = df[contaminante].mean()
+
+        # Nombre de la estación
+        estacion_max = df.loc[idx_max, 'Estacion']
+
+    mes_peor = promedio_mensual.idxmax()
+    valor_mes_peor = promedio_mensual.max()
 
     # Nombre del mes
     mes_nombre = calendar.month_name[mes_peor].capitalize()
 
-    # Nombre de la estación
-    estacion_max = df.loc[idx_max, 'Estacion']
-
     # Mostrar métricas
     col1, col2, col3 = st.columns(3)
     col1.metric("Mes más contaminado",
@@ -75,59 +96,59 @@ def metricas_anuales(df, contaminante, anio):
 # ============================
 # Parámetros generales
 # ============================
+diagnostico.seccion("Parámetros generales")
 contaminantes = ['O3', 'NO2', 'CO', 'SO2', 'PM10', 'PM2_5']
-estaciones = {'santa', 'bine', 'ninfas', 'utp', 'vel'}
+estaciones = catalogo().claves()
+anios = anios_disponibles()
 
 st.sidebar.header("⚙️ Parámetros de análisis")
 
 contaminante = st.sidebar.selectbox("Contaminante", contaminantes)
-estaciones_seleccionadas = st.sidebar.multiselect("Estaciones", list(estaciones), default=list(estaciones))
+estaciones_seleccionadas = st.sidebar.multiselect("Estaciones", estaciones, default=estaciones)
 periodo = st.sidebar.radio("Periodo", ["Día", "Mes", "Año", "Comparación Anual"], horizontal=False)
 
 # ============================
 # Día
 # ============================
 if periodo == "Día":
+    diagnostico.seccion("Día")
     st.markdown("## 📆 Análisis Diario")
 
     min_fecha = datetime.date(2021, 1, 1)
     max_fecha = datetime.date.today() - datetime.timedelta(days=1)
 
     d = st.date_input("Selecciona una fecha", max_fecha, min_value=min_fecha, max_value=max_fecha)
-    df = cargar_datos_por_anio(d.year)
+    df_filtrado = cargar_rango(d, d, estaciones=estaciones_seleccionadas)
 
     st.info(f"Fecha seleccionada: **{d}**")
 
-    df_filtrado = df[
-        (df['Estacion'].isin(estaciones_seleccionadas)) &
-        (df['DateTime'].dt.date == d)
-    ]
-
     if df_filtrado.empty:
         st.warning("No hay datos disponibles para esta fecha.")
     else:
         st.subheader(f"📈 Concentración horaria de `{contaminante}`")
         mostrar_metricas_resumen(df_filtrado, contaminante)
 
-        tabs = st.tabs(["📈 Línea diaria", "📊 Heatmap", " Área apilada por hora y estación"])
+        vista = pestana_activa(["📈 Línea diaria", "📊 Heatmap", " Área apilada por hora y estación"], "vista_dia")
 
-        with tabs[0]:
+        if vista == "📈 Línea diaria":
             concentracion_horaria(df_filtrado, contaminante)
-        with tabs[1]:
+        elif vista == "📊 Heatmap":
             concentracion_horaria_heatmap(df_filtrado, contaminante)
-        with tabs[2]:
+        else:
             area_horaria_estacion(df_filtrado, contaminante)
 
 # ============================
 # Mes
 # ============================
 elif periodo == "Mes":
+    diagnostico.seccion("Mes")
     st.markdown("## 🗓️ Análisis Mensual")
 
     mes = st.selectbox("Selecciona el mes", list(range(1, 13)))
-    anio = st.selectbox("Selecciona el año", [2021, 2022, 2023, 2024, 2025])
-    df = cargar_datos_por_anio(anio)
-    df_mes = df[df['DateTime'].dt.month == mes]
+    anio = st.selectbox("Selecciona el año", anios)
+    ultimo_dia = calendar.monthrange(anio, mes)[1]
+    df_mes = cargar_rango(datetime.date(anio, mes, 1), datetime.date(anio, mes, ultimo_dia),
+                          estaciones=estaciones_seleccionadas)
 
     month_names = {
         1: "Enero", 2: "Febrero", 3: "Marzo", 4: "Abril", 5: "Mayo", 6: "Junio",
@@ -142,113 +163,112 @@ elif periodo == "Mes":
         st.warning("No hay datos disponibles para este mes.")
     else:
 
+        cubo = cargar_cubo([anio]).filtrar(estaciones_seleccionadas, datetime.date(anio, mes, 1),
+                                           datetime.date(anio, mes, ultimo_dia))
+
         st.subheader(f"{contaminante} en el mes seleccionado")
-        mostrar_metricas_resumen(df_filtrado, contaminante)
+        mostrar_metricas_resumen(df_filtrado, contaminante, cubo)
 
-        tabs = st.tabs(["📈 Línea diaria", "📊 Barras", "📦 Boxplot", "📉 Área apilada"])
+        vista = pestana_activa(["📈 Línea diaria", "📊 Barras", "📦 Boxplot", "📉 Área apilada"], "vista_mes")
 
-        with tabs[0]:
-            concentracion_diaria_por_mes(df_filtrado, contaminante, estaciones_seleccionadas, mes)
-        with tabs[1]:
-            barras_diarias_por_mes(df_filtrado, contaminante, estaciones_seleccionadas, mes)
-        with tabs[2]:
+        if vista == "📈 Línea diaria":
+            concentracion_diaria_por_mes(df_filtrado, contaminante, estaciones_seleccionadas, mes, cubo)
+        elif vista == "📊 Barras":
+            barras_diarias_por_mes(df_filtrado, contaminante, estaciones_seleccionadas, mes, cubo)
+        elif vista == "📦 Boxplot":
             boxplot_dia_por_estacion(df_filtrado, contaminante, estaciones_seleccionadas, mes)
-        with tabs[3]:
-            area_apilada_diaria(df_filtrado, contaminante, estaciones_seleccionadas, mes)
+        else:
+            area_apilada_diaria(df_filtrado, contaminante, estaciones_seleccionadas, mes, cubo)
 
 # ============================
 # Año
 # ============================
 elif periodo == "Año":
+    diagnostico.seccion("Año")
     st.markdown("## 📊 Análisis Anual")
 
-    anio = st.selectbox("Selecciona el año", [2021, 2022, 2023, 2024, 2025])
-    df = cargar_datos_por_anio(anio)
+    anio_inicio, anio_fin = st.select_slider("Selecciona el rango de años", options=anios, value=(anios[-1], anios[-1]))
+    anio = f"{anio_inicio}" if anio_inicio == anio_fin else f"{anio_inicio}–{anio_fin}"
+    limites = cargar_rango(datetime.date(anio_inicio, 1, 1), datetime.date(anio_fin, 12, 31), columnas=[])
 
-    min_fecha = df['DateTime'].min().date()
-    max_fecha = df['DateTime'].max().date()
+    min_fecha = limites['DateTime'].min().date()
+    max_fecha = limites['DateTime'].max().date()
     rango_fechas = st.slider("Selecciona el rango de fechas", min_value=min_fecha, max_value=max_fecha, value=(min_fecha, max_fecha))
 
-    df_filtrado = df[
-        (df['Estacion'].isin(estaciones_seleccionadas)) &
-        (df['DateTime'].dt.date >= rango_fechas[0]) &
-        (df['DateTime'].dt.date <= rango_fechas[1])
-    ]
+    df_filtrado = cargar_rango(rango_fechas[0], rango_fechas[1], estaciones=estaciones_seleccionadas)
 
     if df_filtrado.empty:
         st.warning("No hay datos disponibles en este rango.")
     else:
         st.info(f"Mostrando datos de **{rango_fechas[0]} a {rango_fechas[1]}**")
+        cubo = cargar_cubo(range(anio_inicio, anio_fin + 1)).filtrar(estaciones_seleccionadas, *rango_fechas)
 
-        st.subheader(f"{contaminante} en el año seleccionado")
-        metricas_anuales(df_filtrado, contaminante, anio)
+        st.subheader(f"{contaminante} en el periodo seleccionado")
+        metricas_anuales(df_filtrado, contaminante, anio, cubo)
 
-        tabs = st.tabs(["📈 Línea diaria", "📊 Barras mensuales", "📦 Boxplot mensual"])
+        vista = pestana_activa(["📈 Línea diaria", "📊 Barras mensuales", "📦 Boxplot mensual"], "vista_anio")
 
-        with tabs[0]:
+        if vista == "📈 Línea diaria":
             evolucion_promedio(df_filtrado, contaminante, estaciones_seleccionadas)
-        with tabs[1]:
-            barras_promedio(df_filtrado, contaminante, estaciones_seleccionadas)
-        with tabs[2]:
+        elif vista == "📊 Barras mensuales":
+            barras_promedio(df_filtrado, contaminante, estaciones_seleccionadas, cubo)
+        else:
             boxplot(df_filtrado, contaminante, estaciones_seleccionadas)
 
 # ============================
 # Comparación Anual
 # ============================
 elif periodo == "Comparación Anual":
+    diagnostico.seccion("Comparación Anual")
     st.markdown("## 🔁 Comparación entre Años")
 
     col1, col2 = st.columns(2)
     with col1:
-        anio_1 = st.selectbox("Selecciona el año 1", [2021, 2022, 2023, 2024, 2025], index=3)
+        anio_1 = st.selectbox("Selecciona el año 1", anios, index=max(len(anios) - 2, 0))
     with col2:
-        anio_2 = st.selectbox("Selecciona el año 2", [2021, 2022, 2023, 2024, 2025], index=4)
-
-    estacion = st.selectbox("Estación a comparar", list(estaciones))
+        anio_2 = st.selectbox("Selecciona el año 2", anios, index=len(anios) - 1)
 
-    df1 = cargar_datos_por_anio(anio_1)
-    df2 = cargar_datos_por_anio(anio_2)
+    estacion = st.selectbox("Estación a comparar", estaciones, format_func=catalogo().etiqueta)
 
-    df_filtrado_1 = df1[df1['Estacion'] == estacion]
-    df_filtrado_2 = df2[df2['Estacion'] == estacion]
+    df_filtrado_1 = cargar_rango(datetime.date(anio_1, 1, 1), datetime.date(anio_1, 12, 31), estaciones=[estacion])
+    df_filtrado_2 = cargar_rango(datetime.date(anio_2, 1, 1), datetime.date(anio_2, 12, 31), estaciones=[estacion])
 
-    nombre_estacion = {
-        'santa': 'Agua Santa',
-        'bine': 'Benemérito Instituto Normal del Estado (BINE)',
-        'ninfas': 'Las Ninfas',
-        'utp': 'Universidad Tecnológica de Puebla (UTP)',
-        'vel': 'Velódromo'
-    }[estacion]
+    nombre_estacion = catalogo().etiqueta(estacion)
 
     if df_filtrado_1.empty or df_filtrado_2.empty:
         st.warning("No hay datos disponibles para esta comparación.")
     else:
+        cubo_1 = cargar_cubo([anio_1]).filtrar([estacion])
+        cubo_2 = cargar_cubo([anio_2]).filtrar([estacion])
 
         col1, col2 = st.columns(2)
         with col1:
             st.markdown(f"#### Resumen {anio_1}")
-            metricas_anuales(df_filtrado_1, contaminante, anio_1)
+            metricas_anuales(df_filtrado_1, contaminante, anio_1, cubo_1)
 
         with col2:
             st.markdown(f"#### Resumen {anio_2}")
-            metricas_anuales(df_filtrado_2, contaminante, anio_2)
+            metricas_anuales(df_filtrado_2, contaminante, anio_2, cubo_2)
 
-        tabs = st.tabs(["📈 Línea diaria", "📊 Heatmap", "📊 Boxplot"])
+        vista = pestana_activa(["📈 Línea diaria", "📊 Heatmap", "📊 Boxplot"], "vista_comparacion")
 
         st.info(f"Comparando `{contaminante}` en **{nombre_estacion}** entre {anio_1} y {anio_2}")
 
-        with tabs[0]:
-            comparar_anios_sobre_mes(df_filtrado_1, df_filtrado_2, contaminante, estacion, anio_1, anio_2)
+        if vista == "📈 Línea diaria":
+            comparar_anios_sobre_mes(df_filtrado_1, df_filtrado_2, contaminante, estacion, anio_1, anio_2,
+                                     (cubo_1, cubo_2))
 
-        with tabs[1]:
-            barras_comparativas_mensuales(df_filtrado_1, df_filtrado_2, contaminante, estacion, anio_1, anio_2)
+        elif vista == "📊 Heatmap":
+            barras_comparativas_mensuales(df_filtrado_1, df_filtrado_2, contaminante, estacion, anio_1, anio_2,
+                                          (cubo_1, cubo_2))
 
-        with tabs[2]:
+        else:
             boxplot_comparativo_anual(df_filtrado_1, df_filtrado_2, contaminante, anio_1, anio_2)
 
 # ============================
 # Exportación
 # ============================
+diagnostico.seccion("Exportación")
 if 'df_filtrado' in locals() and not df_filtrado.empty:
     st.download_button(
         label="⬇️ Descargar datos filtrados",
@@ -256,3 +276,5 @@ if 'df_filtrado' in locals() and not df_filtrado.empty:
         file_name="datos_historicos.csv",
         mime="text/csv"
     )
+
+diagnostico.panel()
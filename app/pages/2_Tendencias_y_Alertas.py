@@ -1,10 +1,16 @@
 import streamlit as st
+from utils import diagnostico
 import pandas as pd
-from utils.data_loader import cargar_datos_por_anio
-from utils.levels_contaminacion import menu_contaminante
+from utils.data_loader import cargar_pronosticos, cargar_rango
+from utils.agregados import cargar_cubo
+from utils.alertas import cargar_eventos
+from utils.graficos import pronostico
+from utils.levels_contaminacion import clasificar_vectorizado
+from utils.pestanas import pestana_activa
 import matplotlib.pyplot as plt
 
 st.set_page_config(page_title="Tendencias y Alertas", page_icon="🔥", layout="wide")
+diagnostico.iniciar("tendencias_y_alertas")
 
 st.title("🔥 Tendencias Recientes y Alertas de Calidad del Aire")
 st.markdown("""
@@ -15,53 +21,55 @@ valores fuera de norma o tendencias ascendentes.
 # ============================
 # Cargar datos de los últimos 7 días
 # ============================
+diagnostico.seccion("Cargar datos de los últimos 7 días")
 from datetime import datetime, timedelta
 
 hoy = datetime.now().date()
 ultimos_dias = [(hoy - timedelta(days=i)) for i in range(6, -1, -1)]
 
-df_all = pd.concat([cargar_datos_por_anio(d.year) for d in ultimos_dias], ignore_index=True)
-df_all['Fecha'] = df_all['DateTime'].dt.date
-
 # ============================
 # Parámetros
 # ============================
+diagnostico.seccion("Parámetros")
 contaminantes = ['O3', 'NO2', 'CO', 'SO2', 'PM10', 'PM2_5']
 contaminante = st.selectbox("Selecciona el contaminante para monitorear:", contaminantes)
 
+cubo = cargar_cubo(sorted({dia.year for dia in ultimos_dias})).filtrar(None, ultimos_dias[0], ultimos_dias[-1])
+
+if cubo.vacio():
+    st.warning("No hay datos disponibles para los últimos 7 días.")
+    diagnostico.panel()
+    st.stop()
+
 # ============================
 # Promedio diario por estación
 # ============================
-df_filtrado = df_all[df_all['Fecha'].isin(ultimos_dias)]
-
-promedios = df_filtrado.groupby(['Fecha', 'Estacion'])[contaminante].mean().reset_index()
-pivot = promedios.pivot(index='Fecha', columns='Estacion', values=contaminante)
+diagnostico.seccion("Promedio diario por estación")
+pivot = cubo.promedio_diario(contaminante)
 
 # ============================
-# Detección de alertas (valores por encima de nivel 3)
+# Alertas (nivel 4 o superior), ya evaluadas por el motor incremental
 # ============================
-def detectar_alertas(valor):
-    if pd.isna(valor):
-        return False
-    _, nivel, _ = menu_contaminante(contaminante, valor)
-    return nivel >= 4  # Muy mala o extremadamente mala
-
-alertas = promedios.copy()
-alertas['Alerta'] = alertas[contaminante].apply(detectar_alertas)
-alertas_detectadas = alertas[alertas['Alerta'] == True]
+diagnostico.seccion("Alertas")
+alertas_detectadas = cargar_eventos(ultimos_dias[0], ultimos_dias[-1])
 
 # ============================
 # Mostrar alertas
 # ============================
+diagnostico.seccion("Mostrar alertas")
 st.markdown("### ⚠ Alertas de alta contaminación (Nivel 4 o superior)")
+st.caption("Todos los contaminantes: promedio diario y máximo de los promedios móviles normativos (8 h y 24 h).")
 if alertas_detectadas.empty:
     st.success("No se detectaron alertas graves en los últimos 7 días.")
 else:
-    st.dataframe(alertas_detectadas[['Fecha', 'Estacion', contaminante]], use_container_width=True)
+    tabla_alertas = alertas_detectadas.assign(Fecha=alertas_detectadas['Fecha'].dt.date)
+    st.dataframe(tabla_alertas[['Fecha', 'Estacion', 'Medida', 'Criterio', 'valor', 'categoria']],
+                 use_container_width=True, hide_index=True)
 
 # ============================
 # Visualización de tendencias
 # ============================
+diagnostico.seccion("Visualización de tendencias")
 st.markdown("### 📊 Tendencia de concentración en los últimos 7 días")
 fig, ax = plt.subplots(figsize=(12, 5))
 pivot.plot(marker='o', ax=ax)
@@ -73,12 +81,39 @@ ax.legend(title="Estación", bbox_to_anchor=(1.02, 1), loc='upper left')
 fig.autofmt_xdate()
 st.pyplot(fig)
 
+# ============================
+# Pronóstico (precalculado por notebooks/modelado/pronosticos.py)
+# ============================
+diagnostico.seccion("Pronóstico")
+st.markdown("### 🔮 Pronóstico")
+pronosticos = cargar_pronosticos(contaminantes=[contaminante])
+if pronosticos.empty:
+    st.info("Aún no hay pronósticos para este contaminante; se generan después de cada actualización de datos.")
+else:
+    alcance = pestana_activa(["Próximas 24 h", "Próximos 7 días"], "alcance_pronostico")
+    horas = 24 if alcance == "Próximas 24 h" else 7 * 24
+    pronostico(pronosticos[pronosticos['horizonte'] <= horas], contaminante)
+
+    proximas = pronosticos[pronosticos['horizonte'] <= 24]
+    maximos = proximas.groupby('Estacion', observed=True)['pronostico'].max()
+    calidades, niveles, _ = clasificar_vectorizado(contaminante, maximos.to_numpy(dtype=float))
+    modelos = proximas.groupby('Estacion', observed=True)['modelo'].first().astype(str)
+    st.dataframe(pd.DataFrame({'Máximo próximas 24 h': maximos.round(3), 'Calidad': calidades, 'Nivel': niveles,
+                               'Modelo': modelos}),
+                 use_container_width=True)
+    st.caption(f"Modelos ajustados con datos hasta {pronosticos['origen'].max():%Y-%m-%d %H:%M}; "
+               "la banda es el intervalo de predicción del 90 %.")
+
 # ============================
 # Descarga
 # ============================
+diagnostico.seccion("Descarga")
+df_filtrado = cargar_rango(ultimos_dias[0], ultimos_dias[-1], columnas=[contaminante])
 st.download_button(
     label="⬇️ Descargar datos de los últimos 7 días",
     data=df_filtrado.to_csv(index=False).encode('utf-8'),
     file_name=f"ultimos_7_dias_{contaminante}.csv",
     mime='text/csv'
 )
+
+diagnostico.panel()
@@ -0,0 +1,301 @@
+"""Cubo de agregados precalculados por estación y contaminante.
+
+Para cada año se guardan suma, conteo, mínimo y máximo de cada contaminante
+en cuatro granos:
+
+* ``hora``: perfil horario de cada mes (``Anio``, ``Mes``, ``Hora``).
+* ``dia``: cada fecha (``Fecha``).
+* ``mes``: cada mes (``Anio``, ``Mes``).
+* ``anio``: el año completo (``Anio``).
+
+Con suma y conteo cualquier promedio sobre un conjunto de días es exacto, y
+mínimo y máximo se combinan sin volver a las filas horarias, así que las
+gráficas y métricas cuestan en función de los puntos que muestran y no de las
+filas crudas. Los archivos viven en ``data/Agregados/Anio={anio}/`` y se
+actualizan de forma incremental: sólo se agregan las filas posteriores a la
+última hora ya incluida, y el cubo se reconstruye si el número de filas del
+año muestra que cambió algo más.
+
+Para reconstruir todos los años desde la raíz del repositorio::
+
+    PYTHONPATH=app python -m utils.agregados
+"""
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from utils import columnar, data_loader, esquema
+from utils.cache import huella_archivos
+
+DIR_AGREGADOS = "data/Agregados"
+CONTAMINANTES = esquema.CONTAMINANTES
+GRANOS = {
+    'hora': ['Anio', 'Mes', 'Hora'],
+    'dia': ['Fecha'],
+    'mes': ['Anio', 'Mes'],
+    'anio': ['Anio'],
+}
+
+
+def ruta_cubo(anio, base=None):
+    return os.path.join(base or DIR_AGREGADOS, f"Anio={anio}")
+
+
+def _agregar(df, claves):
+    """Suma, conteo, mínimo y máximo por ``claves``, estación y contaminante."""
+    largo = df.melt(
+        id_vars=claves + ['Estacion'],
+        value_vars=[c for c in CONTAMINANTES if c in df.columns],
+        var_name='Contaminante',
+        value_name='valor',
+    )
+    agregado = largo.groupby(claves + ['Estacion', 'Contaminante'], observed=True)['valor'].agg(
+        suma='sum', conteo='count', minimo='min', maximo='max'
+    )
+    return agregado[agregado['conteo'] > 0].reset_index()
+
+
+def _combinar(partes, claves):
+    """Une agregados parciales del mismo grano sumando y tomando extremos."""
+    unido = esquema.concatenar(partes)
+    combinado = unido.groupby(claves + ['Estacion', 'Contaminante'], observed=True).agg(
+        suma=('suma', 'sum'), conteo=('conteo', 'sum'), minimo=('minimo', 'min'), maximo=('maximo', 'max')
+    )
+    return combinado.reset_index()
+
+
+def agregar_filas(df):
+    """Construye los cuatro granos a partir de filas horarias del esquema limpio."""
+    df = df.assign(
+        Fecha=df['DateTime'].dt.normalize(),
+        Anio=df['DateTime'].dt.year.astype('int16'),
+        Mes=df['DateTime'].dt.month.astype('int8'),
+        Hora=df['DateTime'].dt.hour.astype('int8'),
+    )
+    dia = _agregar(df, GRANOS['dia'])
+    mes = _combinar([dia.assign(
+        Anio=dia['Fecha'].dt.year.astype('int16'), Mes=dia['Fecha'].dt.month.astype('int8')
+    )], GRANOS['mes'])
+    return {
+        'hora': _agregar(df, GRANOS['hora']),
+        'dia': dia,
+        'mes': mes,
+        'anio': _combinar([mes], GRANOS['anio']),
+    }
+
+
+def combinar_granos(a, b):
+    return {grano: _combinar([a[grano], b[grano]], claves) for grano, claves in GRANOS.items()}
+
+
+def _huella_origen(anio):
+    return [list(h) for h in huella_archivos(data_loader._archivos_anio(anio))]
+
+
+def _leer_persistido(anio):
+    directorio = ruta_cubo(anio)
+    try:
+        with open(os.path.join(directorio, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        granos = {g: pd.read_parquet(os.path.join(directorio, f"{g}.parquet")) for g in GRANOS}
+    except (OSError, ValueError, ImportError):
+        return None, None
+    return granos, meta
+
+
+def _persistir(anio, granos, meta):
+    """Escribe los granos y al final ``meta.json``, que marca el cubo como válido."""
+    if not columnar.HAY_PARQUET:
+        return
+    directorio = ruta_cubo(anio)
+    try:
+        os.makedirs(directorio, exist_ok=True)
+        for grano, df in granos.items():
+            temporal = os.path.join(directorio, f"{grano}.parquet.tmp")
+            df.to_parquet(temporal, index=False)
+            os.replace(temporal, os.path.join(directorio, f"{grano}.parquet"))
+        temporal = os.path.join(directorio, "meta.json.tmp")
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(temporal, os.path.join(directorio, "meta.json"))
+    except OSError:
+        pass
+
+
+def construir_cubo(anio):
+    """Reconstruye por completo el cubo de ``anio`` desde los datos limpios."""
+    df = data_loader.cargar_datos_por_anio(anio)
+    granos = agregar_filas(df)
+    meta = {'marca': str(df['DateTime'].max()), 'filas': len(df), 'huella': _huella_origen(anio)}
+    _persistir(anio, granos, meta)
+    return granos
+
+
+def actualizar_cubo(anio):
+    """Devuelve el cubo de ``anio`` agregando sólo las horas nuevas.
+
+    Si no hay cubo persistido se construye completo. Si el archivo de origen
+    cambió, se leen únicamente las filas posteriores a la marca guardada,
+    hasta el último día con datos, de modo que una actualización diaria usa
+    el índice por día. Si el número de filas del año no es el ya agregado más
+    las nuevas (filas corregidas o borradas, o días anteriores a la marca
+    agregados después), el cubo se reconstruye con ``construir_cubo``.
+    """
+    granos, meta = _leer_persistido(anio)
+    if granos is None or 'filas' not in meta:
+        return construir_cubo(anio)
+
+    huella = _huella_origen(anio)
+    if meta['huella'] == huella:
+        return granos
+
+    filas, ultimo = data_loader.extension_anio(anio)
+    marca = pd.Timestamp(meta['marca'])
+    if ultimo is None or filas < meta['filas']:
+        return construir_cubo(anio)
+    nuevas = data_loader.cargar_rango(marca.normalize(), max(ultimo, marca.normalize()))
+    nuevas = nuevas[nuevas['DateTime'] > marca]
+    if meta['filas'] + len(nuevas) != filas:
+        return construir_cubo(anio)
+    if not nuevas.empty:
+        granos = combinar_granos(granos, agregar_filas(nuevas))
+        marca = nuevas['DateTime'].max()
+    _persistir(anio, granos, {'marca': str(marca), 'filas': filas, 'huella': huella})
+    return granos
+
+
+def _leer_vigente(anio):
+    """Granos persistidos de ``anio`` si están al día con sus archivos limpios."""
+    granos, meta = _leer_persistido(anio)
+    if granos is None or meta.get('huella') != _huella_origen(anio):
+        return None
+    return granos
+
+
+def cargar_cubo(anios):
+    """``Cubo`` de uno o varios años, memorizado en la caché de datos.
+
+    Cada año se toma del cubo persistido si está al día. Si falta o quedó
+    atrás se agrega en memoria sin escribirlo: actualizarlo le toca a
+    ``add_ayer.py`` (``actualizar_cubo``), no a la petición de una página.
+    """
+    partes = []
+    for anio in anios:
+        if not data_loader._existe_anio(anio):
+            continue
+        partes.append(data_loader.CACHE_DATOS.obtener_o_cargar(
+            ('cubo', anio),
+            huella_archivos(data_loader._archivos_anio(anio)),
+            lambda anio=anio: _leer_vigente(anio) or agregar_filas(data_loader.cargar_datos_por_anio(anio)),
+            copiar=False,
+        ))
+    if not partes:
+        return Cubo({grano: pd.DataFrame(columns=claves + ['Estacion', 'Contaminante', 'suma', 'conteo',
+                                                            'minimo', 'maximo'])
+                     for grano, claves in GRANOS.items()})
+    return Cubo({grano: esquema.concatenar([p[grano] for p in partes]) for grano in GRANOS})
+
+
+def _promedio(df, claves, por_estacion=True):
+    """Promedio ponderado (suma / conteo) agrupando por ``claves``."""
+    agrupado = df.groupby(claves + (['Estacion'] if por_estacion else []), observed=True)[['suma', 'conteo']].sum()
+    promedio = agrupado['suma'] / agrupado['conteo']
+    return promedio.unstack('Estacion') if por_estacion else promedio
+
+
+class Cubo:
+    """Vista de consulta sobre los granos de uno o varios años.
+
+    ``filtrar`` recorta por estaciones y fechas. Tras un recorte por fechas
+    sólo el grano diario sigue siendo exacto, así que las consultas lo usan en
+    lugar de los granos mensual y anual.
+    """
+
+    def __init__(self, granos, exacto=True):
+        self.granos = granos
+        self.exacto = exacto
+        self._huella = None
+
+    def huella(self):
+        """Hash del contenido de los granos, para claves de caché."""
+        if self._huella is None:
+            resumen = hashlib.sha1(str(self.exacto).encode("ascii"))
+            for grano in GRANOS:
+                resumen.update(pd.util.hash_pandas_object(self.granos[grano], index=False).values.tobytes())
+            self._huella = resumen.hexdigest()
+        return self._huella
+
+    def filtrar(self, estaciones=None, fecha_inicio=None, fecha_fin=None):
+        granos = dict(self.granos)
+        if estaciones is not None:
+            granos = {
+                g: esquema.quitar_estaciones_sin_datos(df[df['Estacion'].isin(estaciones)].reset_index(drop=True))
+                for g, df in granos.items()
+            }
+        if fecha_inicio is None and fecha_fin is None:
+            return Cubo(granos, self.exacto)
+
+        dia = granos['dia']
+        mascara = pd.Series(True, index=dia.index)
+        if fecha_inicio is not None:
+            mascara &= dia['Fecha'] >= pd.Timestamp(fecha_inicio)
+        if fecha_fin is not None:
+            mascara &= dia['Fecha'] <= pd.Timestamp(fecha_fin)
+        granos['dia'] = dia[mascara].reset_index(drop=True)
+        return Cubo(granos, exacto=False)
+
+    def _dia(self, contaminante):
+        dia = self.granos['dia']
+        return dia[dia['Contaminante'] == contaminante]
+
+    def vacio(self):
+        return self.granos['dia'].empty
+
+    def promedio_diario(self, contaminante, por_estacion=True):
+        """Promedio de cada fecha (índice ``Fecha``)."""
+        return _promedio(self._dia(contaminante), ['Fecha'], por_estacion)
+
+    def promedio_por_dia_del_mes(self, contaminante, por_estacion=True):
+        dia = self._dia(contaminante)
+        return _promedio(dia.assign(Dia=dia['Fecha'].dt.day), ['Dia'], por_estacion)
+
+    def promedio_por_dia_del_anio(self, contaminante, por_estacion=True):
+        dia = self._dia(contaminante)
+        return _promedio(dia.assign(DiaJuliano=dia['Fecha'].dt.dayofyear), ['DiaJuliano'], por_estacion)
+
+    def perfil_horario(self, contaminante, por_estacion=True):
+        """Promedio por hora del día (índice ``Hora``); requiere un cubo sin recorte de fechas."""
+        hora = self.granos['hora']
+        return _promedio(hora[hora['Contaminante'] == contaminante], ['Hora'], por_estacion)
+
+    def promedio_mensual(self, contaminante, por_estacion=True):
+        """Promedio por mes del año (índice ``Mes``), sumando todos los años."""
+        if self.exacto:
+            mes = self.granos['mes']
+            return _promedio(mes[mes['Contaminante'] == contaminante], ['Mes'], por_estacion)
+        dia = self._dia(contaminante)
+        return _promedio(dia.assign(Mes=dia['Fecha'].dt.month), ['Mes'], por_estacion)
+
+    def resumen(self, contaminante):
+        """Promedio, máximo y mínimo globales, y la fecha y estación del máximo."""
+        fuente = self.granos['anio'] if self.exacto else self.granos['dia']
+        datos = fuente[fuente['Contaminante'] == contaminante]
+        dia = self._dia(contaminante)
+        if datos.empty or dia.empty:
+            return None
+        pico = dia.loc[dia['maximo'].idxmax()]
+        return {
+            'promedio': datos['suma'].sum() / datos['conteo'].sum(),
+            'maximo': datos['maximo'].max(),
+            'minimo': datos['minimo'].min(),
+            'fecha_maximo': pico['Fecha'].date(),
+            'estacion_maximo': pico['Estacion'],
+        }
+
+
+if __name__ == "__main__":
+    for anio in data_loader.anios_disponibles():
+        granos = construir_cubo(anio)
+        print(f"✅ {anio}: {len(granos['dia'])} filas en el grano diario")
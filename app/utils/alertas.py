@@ -0,0 +1,284 @@
+"""Motor incremental de alertas de calidad del aire.
+
+Evalúa a la vez todas las estaciones y todas las medidas:
+
+* el promedio diario de cada contaminante (la regla original de la página
+  de Tendencias y Alertas), y
+* el máximo diario de cada indicador normativo de ``utils.indicadores``
+  (promedios móviles de 8 y 24 horas).
+
+Un día genera un evento cuando su valor alcanza ``NIVEL_ALERTA`` (muy mala o
+extremadamente mala). El estado vive en ``data/Alertas/alertas.json``:
+
+* ``marca``: última hora procesada.
+* ``contexto``: las horas previas que necesitan las ventanas móviles.
+* ``abiertos``: suma, conteo y máximo del día de la marca, que puede seguir
+  recibiendo horas.
+* ``eventos``: la lista de alertas ya evaluadas.
+* ``filas``: filas limpias de cada año ya procesadas.
+
+Cada actualización lee sólo las horas posteriores a la marca (hasta el
+último día con datos), suma sus agregados a los del día abierto y vuelve a
+evaluar únicamente los días que tocan, así que el costo crece con los datos
+nuevos y no con el historial. Si el número de filas de algún año no es el ya
+procesado más las horas nuevas (por ejemplo, un backfill agregó días
+anteriores a la marca), se reconstruye todo con ``reconstruir_alertas``.
+Una corrección que no cambie el número de filas no se detecta: después de
+reescribir datos limpios hay que reconstruir a mano. El archivo se
+reemplaza de forma atómica.
+
+Las actualizaciones corren en ``add_ayer.py`` o desde la raíz del
+repositorio::
+
+    PYTHONPATH=app python -m utils.alertas
+
+La aplicación sólo lee el estado con ``cargar_eventos``.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils import data_loader, esquema, indicadores
+from utils.cache import huella_archivos
+from utils.levels_contaminacion import categorias_por_nivel, clasificar_niveles
+
+DIR_ALERTAS = "data/Alertas"
+VERSION = 2
+NIVEL_ALERTA = 4
+
+CONTAMINANTES = ['O3', 'NO2', 'CO', 'SO2', 'PM10', 'PM2_5']
+MEDIDAS_MAXIMO = list(indicadores.INDICADORES.values())
+MEDIDAS = CONTAMINANTES + MEDIDAS_MAXIMO
+COLUMNAS_AGREGADOS = ['Fecha', 'Estacion', 'Medida', 'suma', 'conteo', 'maximo']
+COLUMNAS_EVENTOS = ['Fecha', 'Estacion', 'Medida', 'Criterio', 'valor', 'horas', 'nivel', 'categoria']
+TIPOS_EVENTOS = {'Fecha': 'datetime64[ns]', 'valor': 'float64', 'horas': 'int64', 'nivel': 'int8'}
+
+
+def ruta_estado(base=None):
+    return os.path.join(base or DIR_ALERTAS, "alertas.json")
+
+
+# ============================
+# Agregados diarios y evaluación
+# ============================
+
+def agregar_dias(horas):
+    """Suma, conteo y máximo por fecha, estación y medida de filas horarias."""
+    largo = horas.assign(Fecha=horas['DateTime'].dt.normalize()).melt(
+        id_vars=['Fecha', 'Estacion'],
+        value_vars=[m for m in MEDIDAS if m in horas.columns],
+        var_name='Medida',
+        value_name='valor',
+    )
+    agregado = largo.groupby(['Fecha', 'Estacion', 'Medida'], observed=True)['valor'].agg(
+        suma='sum', conteo='count', maximo='max'
+    )
+    return agregado[agregado['conteo'] > 0].reset_index()
+
+
+def combinar_dias(partes):
+    """Une agregados diarios parciales del mismo día sumando y tomando el máximo."""
+    partes = [p for p in partes if not p.empty]
+    if not partes:
+        return pd.DataFrame(columns=COLUMNAS_AGREGADOS)
+    unido = esquema.concatenar(partes)
+    combinado = unido.groupby(['Fecha', 'Estacion', 'Medida'], observed=True).agg(
+        suma=('suma', 'sum'), conteo=('conteo', 'sum'), maximo=('maximo', 'max')
+    )
+    return combinado.reset_index()
+
+
+def evaluar(diarios):
+    """Eventos de alerta de los agregados diarios (una fila por día, estación y medida).
+
+    Los contaminantes se evalúan con su promedio diario y los indicadores
+    normativos con su máximo del día.
+    """
+    es_maximo = diarios['Medida'].isin(MEDIDAS_MAXIMO).to_numpy()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        valor = np.where(es_maximo, diarios['maximo'].to_numpy(dtype=float),
+                         diarios['suma'].to_numpy(dtype=float) / diarios['conteo'].to_numpy(dtype=float))
+    nivel = np.zeros(len(diarios), dtype=np.int8)
+    for medida in diarios['Medida'].unique():
+        filas = (diarios['Medida'] == medida).to_numpy()
+        nivel[filas] = clasificar_niveles(medida, valor[filas])
+
+    eventos = pd.DataFrame({
+        'Fecha': diarios['Fecha'].to_numpy(),
+        'Estacion': diarios['Estacion'].astype(str).to_numpy(),
+        'Medida': diarios['Medida'].to_numpy(),
+        'Criterio': np.where(es_maximo, 'máximo móvil', 'promedio diario'),
+        'valor': valor,
+        'horas': diarios['conteo'].to_numpy(dtype=int),
+        'nivel': nivel,
+        'categoria': categorias_por_nivel[nivel],
+    })
+    eventos = eventos[eventos['nivel'] >= NIVEL_ALERTA]
+    return eventos.sort_values(['Fecha', 'Estacion', 'Medida']).reset_index(drop=True)
+
+
+# ============================
+# Estado
+# ============================
+
+def estado_vacio():
+    return {
+        'marca': None,
+        'contexto': pd.DataFrame(columns=['Estacion', 'DateTime'] + list(indicadores.VENTANAS)),
+        'abiertos': pd.DataFrame(columns=COLUMNAS_AGREGADOS),
+        'eventos': pd.DataFrame(columns=COLUMNAS_EVENTOS).astype(TIPOS_EVENTOS),
+        'filas': {},
+    }
+
+
+def procesar(nuevas, estado):
+    """Agrega las horas ``nuevas`` (posteriores a la marca) al estado y devuelve el nuevo estado."""
+    if nuevas.empty:
+        return estado
+    calculados, contexto = indicadores.actualizar(nuevas, estado['contexto'] if len(estado['contexto']) else None)
+    horas = nuevas.reset_index(drop=True).assign(**{m: calculados[m] for m in MEDIDAS_MAXIMO if m in calculados})
+
+    diarios = combinar_dias([estado['abiertos'], agregar_dias(horas)])
+    dias = set(diarios['Fecha'])
+    anteriores = estado['eventos'][~estado['eventos']['Fecha'].isin(dias)]
+    eventos = evaluar(diarios)
+    if not anteriores.empty:
+        eventos = pd.concat([anteriores, eventos], ignore_index=True)
+
+    marca = nuevas['DateTime'].max()
+    return {
+        'marca': marca,
+        'contexto': contexto[['Estacion', 'DateTime'] + [c for c in indicadores.VENTANAS if c in contexto]],
+        'abiertos': diarios[diarios['Fecha'] == marca.normalize()].reset_index(drop=True),
+        'eventos': eventos.sort_values(['Fecha', 'Estacion', 'Medida']).reset_index(drop=True),
+        'filas': estado['filas'],
+    }
+
+
+def _a_json(df, fechas):
+    datos = df.copy()
+    for columna in fechas:
+        datos[columna] = pd.to_datetime(datos[columna]).dt.strftime(esquema.FORMATO_FECHA)
+    datos = datos.astype(object).where(datos.notna(), None)
+    return {'columnas': list(datos.columns), 'filas': datos.values.tolist()}
+
+
+def _de_json(datos, fechas):
+    df = pd.DataFrame(datos['filas'], columns=datos['columnas'])
+    for columna in fechas:
+        df[columna] = pd.to_datetime(df[columna], format=esquema.FORMATO_FECHA)
+    return df
+
+
+def leer_estado(base=None):
+    try:
+        with open(ruta_estado(base), encoding="utf-8") as f:
+            datos = json.load(f)
+    except (OSError, ValueError):
+        return estado_vacio()
+    if datos.get('version') != VERSION:
+        return estado_vacio()
+    contexto = _de_json(datos['contexto'], ['DateTime'])
+    contexto[list(indicadores.VENTANAS)] = contexto[list(indicadores.VENTANAS)].astype('float32')
+    return {
+        'marca': pd.Timestamp(datos['marca']) if datos['marca'] else None,
+        'contexto': contexto.astype({'Estacion': 'category'}),
+        'abiertos': _de_json(datos['abiertos'], ['Fecha']),
+        'eventos': _de_json(datos['eventos'], ['Fecha']).astype(TIPOS_EVENTOS),
+        'filas': datos['filas'],
+    }
+
+
+def guardar_estado(estado, base=None):
+    ruta = ruta_estado(base)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    datos = {
+        'version': VERSION,
+        'marca': str(estado['marca']) if estado['marca'] is not None else None,
+        'contexto': _a_json(estado['contexto'], ['DateTime']),
+        'abiertos': _a_json(estado['abiertos'], ['Fecha']),
+        'eventos': _a_json(estado['eventos'], ['Fecha']),
+        'filas': estado['filas'],
+    }
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+
+# ============================
+# Actualización y lectura
+# ============================
+
+def _filas_por_anio():
+    return {str(anio): data_loader.extension_anio(anio)[0] for anio in data_loader.anios_disponibles()}
+
+
+def _horas_nuevas(marca):
+    """Filas limpias posteriores a ``marca`` (todas si no hay marca), hasta el último día con datos."""
+    anios = data_loader.anios_disponibles()
+    if not anios:
+        return data_loader.cargar_rango(pd.Timestamp.today(), pd.Timestamp.today(), columnas=CONTAMINANTES)
+    inicio = marca.normalize() if marca is not None else pd.Timestamp(anios[0], 1, 1)
+    _, ultimo = data_loader.extension_anio(anios[-1])
+    fin = max(ultimo, inicio) if ultimo is not None else inicio
+    horas = data_loader.cargar_rango(inicio, fin, columnas=CONTAMINANTES)
+    if marca is not None:
+        horas = horas[horas['DateTime'] > marca]
+    return horas.sort_values(['DateTime', 'Estacion'], kind='stable').reset_index(drop=True)
+
+
+def _solo_agregadas(estado, nuevas, filas):
+    """``True`` si las filas de cada año son las ya procesadas más las ``nuevas``."""
+    esperadas = dict(estado['filas'])
+    for anio, conteo in nuevas['DateTime'].dt.year.value_counts().items():
+        esperadas[str(anio)] = esperadas.get(str(anio), 0) + int(conteo)
+    return {a: n for a, n in esperadas.items() if n} == {a: n for a, n in filas.items() if n}
+
+
+def actualizar_alertas(base=None):
+    """Procesa las horas pendientes, guarda el estado y devuelve los eventos.
+
+    Si hubo cambios anteriores a la marca, reconstruye el estado completo.
+    """
+    estado = leer_estado(base)
+    filas = _filas_por_anio()
+    nuevas = _horas_nuevas(estado['marca'])
+    if estado['marca'] is not None and not _solo_agregadas(estado, nuevas, filas):
+        return reconstruir_alertas(base)
+    if not nuevas.empty or estado['filas'] != filas:
+        estado = dict(procesar(nuevas, estado), filas=filas)
+        guardar_estado(estado, base)
+    return estado['eventos']
+
+
+def reconstruir_alertas(base=None):
+    """Descarta el estado y procesa todo el historial (tras reescribir datos limpios)."""
+    filas = _filas_por_anio()
+    estado = dict(procesar(_horas_nuevas(None), estado_vacio()), filas=filas)
+    guardar_estado(estado, base)
+    return estado['eventos']
+
+
+def cargar_eventos(fecha_inicio=None, fecha_fin=None):
+    """Eventos de alerta entre dos fechas (incluidas), ya evaluados.
+
+    Sólo lee el estado guardado (en caché hasta que cambie el archivo); las
+    horas nuevas las procesa ``actualizar_alertas`` desde ``add_ayer.py``.
+    """
+    eventos = data_loader.CACHE_DATOS.obtener_o_cargar(
+        ('alertas',), huella_archivos([ruta_estado()]), lambda: leer_estado()['eventos']
+    )
+    mascara = pd.Series(True, index=eventos.index)
+    if fecha_inicio is not None:
+        mascara &= eventos['Fecha'] >= pd.Timestamp(fecha_inicio)
+    if fecha_fin is not None:
+        mascara &= eventos['Fecha'] <= pd.Timestamp(fecha_fin)
+    return eventos[mascara].reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    eventos = actualizar_alertas()
+    print(f"✅ {len(eventos)} eventos de alerta en {ruta_estado()}")
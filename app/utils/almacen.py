@@ -0,0 +1,230 @@
+"""Base de datos local (SQLite) con los datos limpios.
+
+Todas las mediciones viven en una tabla con clave primaria
+``(Estacion, DateTime)``; la ingesta hace *upsert*, así que volver a cargar
+un día o un año completo reemplaza las filas existentes en lugar de
+duplicarlas. Además de la clave primaria (que sirve a los filtros por
+estación), hay índices secundarios para los filtros de las páginas:
+
+* ``DateTime``, para rangos de fechas de todas las estaciones.
+* ``(Anio, Mes, Estacion)``, para años y meses completos.
+
+``DateTime`` se guarda como texto ``AAAA-MM-DD HH:MM:SS``, que ordena igual
+que las fechas, de modo que los rangos se resuelven con el índice.
+
+Para crear (o actualizar) la base desde los CSV de ``data/Clean`` desde la
+raíz del repositorio::
+
+    PYTHONPATH=app python -m utils.almacen
+
+Si el archivo existe, ``data_loader`` lo usa en lugar de los CSV para los
+años que estén al día: cada ingesta guarda en la tabla ``origenes`` el
+tamaño y la fecha de modificación del CSV limpio que cargó, y ``vigente``
+los compara con el archivo actual. Un año cuyo CSV cambió después se lee del
+CSV hasta que se vuelva a ingestar.
+"""
+import os
+import re
+import sqlite3
+from contextlib import closing
+
+import pandas as pd
+
+from utils import esquema
+
+DIR_CLEAN = "data/Clean"
+RUTA_DB = os.environ.get("CALIDAD_AIRE_DB", "data/calidad_aire.sqlite")
+TABLA = "mediciones"
+COLUMNAS_CLAVE = ['Estacion', 'DateTime']
+CALENDARIO = ['Anio', 'Mes', 'Dia', 'Hora']
+
+_ESQUEMA_SQL = f"""
+CREATE TABLE IF NOT EXISTS {TABLA} (
+    Estacion TEXT NOT NULL,
+    DateTime TEXT NOT NULL,
+    {", ".join(f"{c} INTEGER NOT NULL" for c in CALENDARIO)},
+    {", ".join(f"{c} REAL" for c in esquema.CONTAMINANTES)},
+    PRIMARY KEY (Estacion, DateTime)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_{TABLA}_fecha ON {TABLA} (DateTime);
+CREATE INDEX IF NOT EXISTS idx_{TABLA}_mes ON {TABLA} (Anio, Mes, Estacion);
+CREATE TABLE IF NOT EXISTS origenes (
+    Anio INTEGER PRIMARY KEY,
+    tamano INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+"""
+
+
+def existe(ruta=None):
+    return os.path.exists(ruta or RUTA_DB)
+
+
+def conectar(ruta=None, crear=False):
+    """Conexión a la base; con ``crear=True`` crea el archivo y la tabla si faltan."""
+    ruta = ruta or RUTA_DB
+    if not crear and not os.path.exists(ruta):
+        raise FileNotFoundError(f"No existe la base de datos: {ruta}")
+    if crear and os.path.dirname(ruta):
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    conexion = sqlite3.connect(ruta, timeout=30)
+    if crear:
+        conexion.executescript(_ESQUEMA_SQL)
+    return conexion
+
+
+# ============================
+# Ingesta
+# ============================
+
+def _filas(df):
+    """Tuplas en el orden de ``esquema.COLUMNAS`` con ``NaN`` → ``NULL``."""
+    datos = df[esquema.COLUMNAS].copy()
+    datos['Estacion'] = datos['Estacion'].astype(str)
+    datos['DateTime'] = pd.to_datetime(datos['DateTime']).dt.strftime(esquema.FORMATO_FECHA)
+    datos = datos.astype(object).where(datos.notna(), None)
+    return datos.itertuples(index=False, name=None)
+
+
+def upsert(df, ruta=None):
+    """Inserta las filas de ``df`` o reemplaza las que ya tienen su ``(Estacion, DateTime)``.
+
+    Todo ``df`` se escribe en una sola transacción; devuelve el número de filas.
+    """
+    columnas = ", ".join(esquema.COLUMNAS)
+    marcas = ", ".join("?" for _ in esquema.COLUMNAS)
+    actualizar = ", ".join(f"{c} = excluded.{c}" for c in esquema.COLUMNAS if c not in COLUMNAS_CLAVE)
+    sql = (f"INSERT INTO {TABLA} ({columnas}) VALUES ({marcas}) "
+           f"ON CONFLICT (Estacion, DateTime) DO UPDATE SET {actualizar}")
+    with closing(conectar(ruta, crear=True)) as conexion, conexion:
+        conexion.executemany(sql, _filas(df))
+    return len(df)
+
+
+def ingestar_anio(anio, clean=None, ruta=None):
+    """Carga ``datos_Clean_{anio}.csv`` en la base; repetirlo no duplica filas.
+
+    También registra el tamaño y la fecha de modificación del CSV, leídos
+    antes de cargarlo (si cambia durante la carga, el año queda no vigente).
+    """
+    ruta_csv = os.path.join(clean or DIR_CLEAN, f"datos_Clean_{anio}.csv")
+    estado = os.stat(ruta_csv)
+    filas = upsert(esquema.leer_csv(ruta_csv), ruta)
+    with closing(conectar(ruta, crear=True)) as conexion, conexion:
+        conexion.execute(
+            "INSERT OR REPLACE INTO origenes (Anio, tamano, mtime_ns) VALUES (?, ?, ?)",
+            (int(anio), estado.st_size, estado.st_mtime_ns),
+        )
+    return filas
+
+
+def ingestar_todo(clean=None, ruta=None):
+    """Carga todos los años presentes en ``clean``."""
+    anios = []
+    for nombre in sorted(os.listdir(clean or DIR_CLEAN)):
+        coincidencia = re.fullmatch(r"datos_Clean_(\d{4})\.csv", nombre)
+        if coincidencia:
+            anio = int(coincidencia.group(1))
+            filas = ingestar_anio(anio, clean, ruta)
+            print(f"✅ {anio}: {filas} filas en {ruta or RUTA_DB}")
+            anios.append(anio)
+    return anios
+
+
+# ============================
+# Consultas
+# ============================
+
+def _consulta(columnas=None, estaciones=None, desde=None, hasta=None, anio=None, mes=None):
+    """SQL y parámetros de una consulta; todos los filtros van al ``WHERE``."""
+    condiciones, parametros = [], []
+    if anio is not None:
+        condiciones.append("Anio = ?")
+        parametros.append(int(anio))
+    if mes is not None:
+        condiciones.append("Mes = ?")
+        parametros.append(int(mes))
+    if desde is not None:
+        condiciones.append("DateTime >= ?")
+        parametros.append(pd.Timestamp(desde).strftime(esquema.FORMATO_FECHA))
+    if hasta is not None:
+        condiciones.append("DateTime < ?")
+        parametros.append(pd.Timestamp(hasta).strftime(esquema.FORMATO_FECHA))
+    if estaciones is not None:
+        estaciones = [str(e) for e in estaciones]
+        condiciones.append(f"Estacion IN ({', '.join('?' for _ in estaciones)})")
+        parametros.extend(estaciones)
+
+    seleccion = [c for c in esquema.COLUMNAS if columnas is None or c in columnas]
+    sql = f"SELECT {', '.join(seleccion)} FROM {TABLA}"
+    if condiciones:
+        sql += " WHERE " + " AND ".join(condiciones)
+    return sql + " ORDER BY Estacion, DateTime", parametros
+
+
+def consultar(columnas=None, estaciones=None, desde=None, hasta=None, anio=None, mes=None, ruta=None):
+    """Filas que cumplen los filtros, con los tipos del esquema.
+
+    ``desde``/``hasta`` (``hasta`` exclusivo) acotan ``DateTime``; ``anio`` y
+    ``mes`` usan las columnas de calendario. ``columnas`` proyecta en SQL.
+    """
+    sql, parametros = _consulta(columnas, estaciones, desde, hasta, anio, mes)
+    with closing(conectar(ruta)) as conexion:
+        df = pd.read_sql_query(sql, conexion, params=parametros)
+    if 'DateTime' in df.columns:
+        df['DateTime'] = pd.to_datetime(df['DateTime'], format=esquema.FORMATO_FECHA)
+    return esquema.aplicar_esquema(df)
+
+
+def plan_consulta(columnas=None, estaciones=None, desde=None, hasta=None, anio=None, mes=None, ruta=None):
+    """Plan de SQLite para una consulta (``EXPLAIN QUERY PLAN``), útil para revisar índices."""
+    sql, parametros = _consulta(columnas, estaciones, desde, hasta, anio, mes)
+    with closing(conectar(ruta)) as conexion:
+        return [fila[-1] for fila in conexion.execute("EXPLAIN QUERY PLAN " + sql, parametros)]
+
+
+def anios(ruta=None):
+    """Años con al menos una fila en la base (vacío si no existe)."""
+    if not existe(ruta):
+        return []
+    with closing(conectar(ruta)) as conexion:
+        return [fila[0] for fila in conexion.execute(f"SELECT DISTINCT Anio FROM {TABLA} ORDER BY Anio")]
+
+
+def extension_anio(anio, ruta=None):
+    """``(filas, último día)`` de ``anio`` en la base, resueltos con el índice."""
+    with closing(conectar(ruta)) as conexion:
+        filas, ultima = conexion.execute(
+            f"SELECT COUNT(*), MAX(DateTime) FROM {TABLA} WHERE Anio = ?", (int(anio),)
+        ).fetchone()
+    return filas, pd.Timestamp(ultima).normalize() if ultima else None
+
+
+def vigente(anio, clean=None, ruta=None):
+    """El año está en la base y su CSV limpio no cambió desde la última ingesta."""
+    if not existe_anio(anio, ruta):
+        return False
+    try:
+        estado = os.stat(os.path.join(clean or DIR_CLEAN, f"datos_Clean_{anio}.csv"))
+    except FileNotFoundError:
+        return True
+    try:
+        with closing(conectar(ruta)) as conexion:
+            origen = conexion.execute(
+                "SELECT tamano, mtime_ns FROM origenes WHERE Anio = ?", (int(anio),)
+            ).fetchone()
+    except sqlite3.OperationalError:  # base anterior a la tabla ``origenes``
+        return False
+    return origen == (estado.st_size, estado.st_mtime_ns)
+
+
+def existe_anio(anio, ruta=None):
+    if not existe(ruta):
+        return False
+    with closing(conectar(ruta)) as conexion:
+        fila = conexion.execute(f"SELECT 1 FROM {TABLA} WHERE Anio = ? LIMIT 1", (int(anio),)).fetchone()
+    return fila is not None
+
+
+if __name__ == "__main__":
+    ingestar_todo()
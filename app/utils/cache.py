@@ -0,0 +1,129 @@
+"""Caché LRU en memoria compartida por todas las sesiones del proceso.
+
+Streamlit ejecuta cada sesión en su propio hilo pero importa los módulos de
+``utils`` una sola vez, así que una instancia de ``CacheLRU`` a nivel de módulo
+es visible para todos los usuarios. Cada entrada guarda la *huella* de los
+archivos de los que proviene (``mtime`` y tamaño); si la huella cambia, la
+entrada se descarta en la siguiente consulta.
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from utils import diagnostico
+
+MB = 1024 * 1024
+
+
+def tamano_objeto(valor):
+    """Bytes aproximados que ocupa ``valor`` en memoria."""
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, pd.Series):
+        return int(valor.memory_usage(deep=True))
+    if isinstance(valor, (bytes, bytearray, memoryview)):
+        return len(valor)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(tamano_objeto(v) for v in valor.values())
+    return sys.getsizeof(valor)
+
+
+def huella_archivos(rutas):
+    """``(ruta, mtime_ns, tamaño)`` de cada archivo existente en ``rutas``."""
+    huella = []
+    for ruta in rutas:
+        try:
+            estado = os.stat(ruta)
+        except FileNotFoundError:
+            continue
+        huella.append((ruta, estado.st_mtime_ns, estado.st_size))
+    return tuple(huella)
+
+
+class CacheLRU:
+    """Caché LRU acotada por bytes, con invalidación por huella.
+
+    ``max_bytes`` es el tope de memoria; al superarlo se desalojan las
+    entradas usadas hace más tiempo. Los contadores de aciertos, fallos,
+    desalojos e invalidaciones se consultan con ``estadisticas()``.
+    """
+
+    def __init__(self, max_bytes, tamano=tamano_objeto):
+        self.max_bytes = max_bytes
+        self._tamano = tamano
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        self._candado = threading.Lock()
+        self._contadores = dict(aciertos=0, fallos=0, desalojos=0, invalidaciones=0)
+
+    def obtener(self, clave, huella=None):
+        """Devuelve ``(True, valor)`` si hay una entrada vigente, si no ``(False, None)``."""
+        with self._candado:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and entrada[0] != huella:
+                self._quitar(clave)
+                self._contadores['invalidaciones'] += 1
+                entrada = None
+            if entrada is None:
+                self._contadores['fallos'] += 1
+                diagnostico.contar_cache(False)
+                return False, None
+            self._entradas.move_to_end(clave)
+            self._contadores['aciertos'] += 1
+            diagnostico.contar_cache(True)
+            return True, entrada[1]
+
+    def guardar(self, clave, valor, huella=None):
+        tamano = self._tamano(valor)
+        with self._candado:
+            if clave in self._entradas:
+                self._quitar(clave)
+            if tamano > self.max_bytes:
+                return
+            self._entradas[clave] = (huella, valor, tamano)
+            self._bytes += tamano
+            self._ajustar()
+
+    def obtener_o_cargar(self, clave, huella, cargar, copiar=True):
+        """Devuelve el valor en caché o lo calcula con ``cargar()`` y lo guarda.
+
+        Con ``copiar=True`` se entrega una copia, de modo que quien la reciba
+        pueda modificarla sin alterar la entrada compartida.
+        """
+        encontrado, valor = self.obtener(clave, huella)
+        if not encontrado:
+            valor = cargar()
+            self.guardar(clave, valor, huella)
+        return valor.copy() if copiar else valor
+
+    def configurar(self, max_bytes):
+        with self._candado:
+            self.max_bytes = max_bytes
+            self._ajustar()
+
+    def limpiar(self):
+        with self._candado:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def estadisticas(self):
+        with self._candado:
+            return dict(
+                self._contadores,
+                entradas=len(self._entradas),
+                bytes=self._bytes,
+                max_bytes=self.max_bytes,
+            )
+
+    def _quitar(self, clave):
+        _, _, tamano = self._entradas.pop(clave)
+        self._bytes -= tamano
+
+    def _ajustar(self):
+        while self._bytes > self.max_bytes and self._entradas:
+            clave = next(iter(self._entradas))
+            self._quitar(clave)
+            self._contadores['desalojos'] += 1
@@ -0,0 +1,149 @@
+"""Almacenamiento columnar (Parquet) de los datos limpios.
+
+Los CSV de ``data/Clean`` se convierten en archivos Parquet particionados por
+año y estación::
+
+    data/Columnar/Anio=2025/Estacion=santa/datos.parquet
+
+Cada archivo se escribe ordenado por ``DateTime`` en grupos de filas de un mes,
+así que un filtro por fechas sólo lee los grupos que lo intersectan y una
+lista de columnas sólo decodifica esas columnas.
+
+Para generar (o regenerar) los archivos desde la raíz del repositorio::
+
+    PYTHONPATH=app python -m utils.columnar
+
+``add_ayer.py`` y ``python -m utils.limpieza`` vuelven a exportar el año que
+actualizan si ya tenía particiones. Aun así, ``vigente`` descarta las
+particiones de un año más antiguas que su CSV limpio, para que una ingesta
+hecha por otro camino no quede oculta detrás de ellas.
+"""
+import os
+import re
+
+import pandas as pd
+
+from utils import esquema
+
+try:
+    import pyarrow  # noqa: F401
+    HAY_PARQUET = True
+except ImportError:  # pragma: no cover - depende del entorno
+    HAY_PARQUET = False
+
+DIR_CLEAN = "data/Clean"
+DIR_COLUMNAR = "data/Columnar"
+ARCHIVO_PARTICION = "datos.parquet"
+FILAS_POR_GRUPO = 24 * 31
+
+
+def ruta_anio(anio, base=DIR_COLUMNAR):
+    return os.path.join(base, f"Anio={anio}")
+
+
+def ruta_particion(anio, estacion, base=DIR_COLUMNAR):
+    return os.path.join(ruta_anio(anio, base), f"Estacion={estacion}", ARCHIVO_PARTICION)
+
+
+def estaciones_disponibles(anio, base=DIR_COLUMNAR):
+    """Estaciones con partición escrita para ``anio`` (orden alfabético)."""
+    directorio = ruta_anio(anio, base)
+    if not os.path.isdir(directorio):
+        return []
+    estaciones = []
+    for nombre in sorted(os.listdir(directorio)):
+        if nombre.startswith("Estacion="):
+            estacion = nombre.split("=", 1)[1]
+            if os.path.exists(ruta_particion(anio, estacion, base)):
+                estaciones.append(estacion)
+    return estaciones
+
+
+def existe_anio(anio, base=DIR_COLUMNAR):
+    return HAY_PARQUET and bool(estaciones_disponibles(anio, base))
+
+
+def vigente(anio, origen=DIR_CLEAN, base=DIR_COLUMNAR):
+    """Hay particiones de ``anio`` y ninguna es anterior a ``datos_Clean_{anio}.csv``."""
+    if not existe_anio(anio, base):
+        return False
+    ruta_csv = os.path.join(origen, f"datos_Clean_{anio}.csv")
+    if not os.path.exists(ruta_csv):
+        return True
+    referencia = os.path.getmtime(ruta_csv)
+    return all(
+        os.path.getmtime(ruta_particion(anio, estacion, base)) >= referencia
+        for estacion in estaciones_disponibles(anio, base)
+    )
+
+
+def exportar_anio(anio, origen=DIR_CLEAN, destino=DIR_COLUMNAR):
+    """Convierte ``datos_Clean_{anio}.csv`` en particiones por estación.
+
+    Cada archivo se escribe primero con un nombre temporal y luego se
+    reemplaza, de modo que un lector nunca ve una partición a medias.
+    """
+    df = esquema.leer_csv(os.path.join(origen, f"datos_Clean_{anio}.csv"))
+    for estacion, df_est in df.groupby('Estacion', sort=False, observed=True):
+        ruta = ruta_particion(anio, estacion, destino)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = ruta + ".tmp"
+        df_est = df_est.assign(Estacion=df_est['Estacion'].cat.remove_unused_categories())
+        df_est.sort_values('DateTime').to_parquet(
+            temporal, index=False, row_group_size=FILAS_POR_GRUPO
+        )
+        os.replace(temporal, ruta)
+    return len(df)
+
+
+def exportar_todo(origen=DIR_CLEAN, destino=DIR_COLUMNAR):
+    """Exporta todos los años presentes en ``origen``."""
+    anios = []
+    for nombre in sorted(os.listdir(origen)):
+        coincidencia = re.fullmatch(r"datos_Clean_(\d{4})\.csv", nombre)
+        if coincidencia:
+            anio = int(coincidencia.group(1))
+            filas = exportar_anio(anio, origen, destino)
+            print(f"✅ {anio}: {filas} filas exportadas a {ruta_anio(anio, destino)}")
+            anios.append(anio)
+    return anios
+
+
+def extension_anio(anio, base=DIR_COLUMNAR):
+    """``(filas, último día)`` de las particiones de ``anio``; sólo decodifica ``DateTime``."""
+    fechas = leer_anio(anio, columnas=['DateTime'], base=base)['DateTime']
+    return len(fechas), fechas.max().normalize() if len(fechas) else None
+
+
+def leer_anio(anio, columnas=None, estaciones=None, desde=None, hasta=None, base=DIR_COLUMNAR):
+    """Lee las particiones de un año aplicando proyección y filtros.
+
+    ``estaciones`` selecciona qué archivos se abren, ``columnas`` qué columnas
+    se decodifican y ``desde``/``hasta`` (``hasta`` exclusivo) se empujan al
+    lector de Parquet como filtro sobre ``DateTime``.
+    """
+    disponibles = estaciones_disponibles(anio, base)
+    if estaciones is not None:
+        disponibles = [e for e in disponibles if e in set(estaciones)]
+
+    filtros = []
+    if desde is not None:
+        filtros.append(('DateTime', '>=', pd.Timestamp(desde)))
+    if hasta is not None:
+        filtros.append(('DateTime', '<', pd.Timestamp(hasta)))
+
+    partes = [
+        pd.read_parquet(
+            ruta_particion(anio, estacion, base),
+            columns=columnas,
+            filters=filtros or None,
+        )
+        for estacion in disponibles
+    ]
+    if not partes:
+        return esquema.aplicar_esquema(pd.DataFrame(columns=columnas or esquema.COLUMNAS))
+    return esquema.concatenar(partes)
+
+
+if __name__ == "__main__":
+    exportar_todo()
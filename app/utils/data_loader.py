@@ -1,35 +1,248 @@
+import os
+import re
+
 import pandas as pd
 from datetime import datetime, timedelta
 
-def cargar_datos(path):
-    df = pd.read_csv(f"data/Clean/{path}")
-    df['DateTime'] = pd.to_datetime(df['DateTime'])
+from utils import almacen, columnar, esquema, indice_dias
+from utils.diagnostico import medido
+from utils.cache import MB, CacheLRU, huella_archivos
+
+DIR_CLEAN = "data/Clean"
+DIR_PRONOSTICOS = "data/Pronosticos"
+# Rangos de hasta este número de días se leen del CSV con el índice por día
+# en lugar de cargar el año completo.
+DIAS_MAX_INDICE = 31
+COLUMNAS_CLAVE = ['Estacion', 'DateTime']
+COLUMNAS_PRONOSTICOS = ['Estacion', 'Contaminante', 'DateTime', 'horizonte', 'pronostico', 'inferior', 'superior',
+                        'modelo', 'origen']
+
+# Caché compartida por todas las sesiones; el tope se ajusta con la variable
+# de entorno CALIDAD_AIRE_CACHE_MB o con ``configurar_cache``.
+CACHE_DATOS = CacheLRU(int(os.environ.get("CALIDAD_AIRE_CACHE_MB", "256")) * MB)
+
+
+def configurar_cache(max_mb):
+    CACHE_DATOS.configurar(int(max_mb * MB))
+
+
+def estadisticas_cache():
+    """Aciertos, fallos, desalojos, invalidaciones y ocupación de la caché."""
+    return CACHE_DATOS.estadisticas()
+
+
+def _clave_lista(valores):
+    return None if valores is None else tuple(valores)
+
+
+def _archivos_anio(anio):
+    """Archivos de los que depende un año: el CSV limpio, sus particiones y la base."""
+    rutas = [os.path.join(DIR_CLEAN, f"datos_Clean_{anio}.csv"), almacen.RUTA_DB]
+    rutas += [
+        columnar.ruta_particion(anio, estacion, columnar.DIR_COLUMNAR)
+        for estacion in columnar.estaciones_disponibles(anio, columnar.DIR_COLUMNAR)
+    ]
+    return rutas
+
+
+def _columnas_lectura(columnas):
+    """Columnas a leer: las pedidas más las claves ``Estacion`` y ``DateTime``."""
+    if columnas is None:
+        return None
+    return list(dict.fromkeys(list(columnas) + COLUMNAS_CLAVE))
+
+
+def _leer_csv(ruta, columnas=None, estaciones=None):
+    clave = ('csv', ruta, _clave_lista(columnas), _clave_lista(estaciones))
+    return CACHE_DATOS.obtener_o_cargar(
+        clave, huella_archivos([ruta]), lambda: _leer_csv_sin_cache(ruta, columnas, estaciones)
+    )
+
+
+@medido()
+def _leer_csv_sin_cache(ruta, columnas=None, estaciones=None):
+    df = esquema.leer_csv(ruta, _columnas_lectura(columnas))
+    if estaciones is not None:
+        df = esquema.quitar_estaciones_sin_datos(df[df['Estacion'].isin(estaciones)].reset_index(drop=True))
     return df
 
 
-def cargar_datos_dia_anterior():
+def _leer_anio(anio, columnas=None, estaciones=None, desde=None, hasta=None):
+    clave = ('anio', anio, _clave_lista(columnas), _clave_lista(estaciones), desde, hasta)
+    return CACHE_DATOS.obtener_o_cargar(
+        clave,
+        huella_archivos(_archivos_anio(anio)),
+        lambda: _leer_anio_sin_cache(anio, columnas, estaciones, desde, hasta),
+    )
+
+
+@medido()
+def _leer_anio_sin_cache(anio, columnas=None, estaciones=None, desde=None, hasta=None):
+    """Lee un año desde Parquet o desde la base SQLite si existen; si no, desde el CSV limpio.
+
+    Las particiones Parquet y la base sólo se usan si están al día con el CSV
+    limpio del año (``columnar.vigente`` y ``almacen.vigente``).
+
+    ``desde``/``hasta`` (``hasta`` exclusivo) se empujan al lector columnar y
+    al ``WHERE`` de la base, junto con las estaciones y las columnas.
+    En el respaldo CSV, los rangos cortos se leen con el índice por día y los
+    largos se recortan del año completo, que queda en caché.
+    """
+    if columnar.vigente(anio, DIR_CLEAN, columnar.DIR_COLUMNAR):
+        return columnar.leer_anio(
+            anio, _columnas_lectura(columnas), estaciones, desde, hasta, columnar.DIR_COLUMNAR
+        )
+    if almacen.vigente(anio, DIR_CLEAN):
+        return almacen.consultar(_columnas_lectura(columnas), estaciones, desde, hasta, anio=anio)
+
+    ruta = os.path.join(DIR_CLEAN, f"datos_Clean_{anio}.csv")
+    if desde is not None and hasta is not None:
+        fechas = pd.date_range(desde, hasta, inclusive='left', freq='D')
+        if len(fechas) <= DIAS_MAX_INDICE:
+            df = indice_dias.leer_dias(ruta, fechas, _columnas_lectura(columnas))
+            if estaciones is not None:
+                df = df[df['Estacion'].isin(estaciones)].reset_index(drop=True)
+            return esquema.quitar_estaciones_sin_datos(df)
+
+    if desde is None and hasta is None:
+        # El año completo queda en caché una sola vez, bajo la clave ``anio``.
+        return _leer_csv_sin_cache(ruta, columnas, estaciones)
+    df = _leer_anio(anio, columnas, estaciones)
+    mascara = pd.Series(True, index=df.index)
+    if desde is not None:
+        mascara &= df['DateTime'] >= pd.Timestamp(desde)
+    if hasta is not None:
+        mascara &= df['DateTime'] < pd.Timestamp(hasta)
+    return esquema.quitar_estaciones_sin_datos(df[mascara].reset_index(drop=True))
+
+
+@medido()
+def extension_anio(anio):
+    """``(filas, último día con datos)`` de ``anio`` en la fuente que usan los cargadores.
+
+    No lee las filas: usa el índice por día del CSV, ``COUNT``/``MAX`` en la
+    base o sólo la columna ``DateTime`` de las particiones. Sirve para acotar
+    las lecturas incrementales al final real de los datos (y así usar el
+    índice por día) y para detectar cambios que no son sólo filas nuevas.
+    """
+    if columnar.vigente(anio, DIR_CLEAN, columnar.DIR_COLUMNAR):
+        return columnar.extension_anio(anio, columnar.DIR_COLUMNAR)
+    if almacen.vigente(anio, DIR_CLEAN):
+        return almacen.extension_anio(anio)
+    ruta = os.path.join(DIR_CLEAN, f"datos_Clean_{anio}.csv")
+    if not os.path.exists(ruta):
+        return 0, None
+    return indice_dias.extension(ruta)
+
+
+def _existe_anio(anio):
+    return (os.path.exists(os.path.join(DIR_CLEAN, f"datos_Clean_{anio}.csv"))
+            or columnar.existe_anio(anio, columnar.DIR_COLUMNAR)
+            or almacen.existe_anio(anio))
+
+
+@medido()
+def anios_disponibles():
+    """Años con datos limpios, en CSV, en particiones Parquet o en la base SQLite."""
+    anios = set(almacen.anios())
+    for directorio, patron in ((DIR_CLEAN, r"datos_Clean_(\d{4})\.csv"),
+                               (columnar.DIR_COLUMNAR, r"Anio=(\d{4})")):
+        if os.path.isdir(directorio):
+            for nombre in os.listdir(directorio):
+                coincidencia = re.fullmatch(patron, nombre)
+                if coincidencia and _existe_anio(int(coincidencia.group(1))):
+                    anios.add(int(coincidencia.group(1)))
+    return sorted(anios)
+
+
+@medido()
+def cargar_datos(path, columnas=None, estaciones=None):
+    coincidencia = re.fullmatch(r"datos_Clean_(\d{4})\.csv", os.path.basename(path))
+    if coincidencia:
+        return _leer_anio(int(coincidencia.group(1)), columnas, estaciones)
+    return _leer_csv(os.path.join(DIR_CLEAN, path), columnas, estaciones)
+
+
+@medido()
+def cargar_datos_dia_anterior(columnas=None, estaciones=None):
     """Carga los datos correspondientes al día anterior.
 
-    La función selecciona automáticamente el archivo CSV según el año
-    obtenido de ``ayer.year``. Si el archivo no existe, se lanza un
+    La función selecciona automáticamente el archivo según el año obtenido de
+    ``ayer.year``. Usa las particiones Parquet cuando existen; si no, lee del
+    CSV sólo las filas de ayer mediante el índice por día, así que el costo no
+    crece con el tamaño del archivo. Si no hay datos para ese año, se lanza un
     ``FileNotFoundError`` con un mensaje descriptivo.
     """
     ayer = (datetime.today() - timedelta(days=1)).date()
-    ruta = f"data/Clean/datos_Clean_{ayer.year}.csv"
+    ruta = os.path.join(DIR_CLEAN, f"datos_Clean_{ayer.year}.csv")
 
     try:
-        df = pd.read_csv(ruta)
+        df_ayer = _leer_anio(ayer.year, columnas, estaciones, ayer, ayer + timedelta(days=1))
     except FileNotFoundError as e:
         raise FileNotFoundError(
             f"No se encontró el archivo de datos para el año {ayer.year}: {ruta}"
         ) from e
 
-    df['DateTime'] = pd.to_datetime(df['DateTime'])
-    df_ayer = df[df['DateTime'].dt.date == ayer]
     return df_ayer
 
-def cargar_datos_por_anio(anio):
-    ruta = f"data/Clean/datos_Clean_{anio}.csv"
-    df = pd.read_csv(ruta, parse_dates=['DateTime'])
-    return df
 
+@medido()
+def cargar_datos_por_anio(anio, columnas=None, estaciones=None):
+    return _leer_anio(anio, columnas, estaciones)
+
+
+@medido()
+def cargar_rango(fecha_inicio, fecha_fin, estaciones=None, columnas=None):
+    """Carga los registros entre ``fecha_inicio`` y ``fecha_fin`` (ambas incluidas).
+
+    Cada año del rango se lee una sola vez, con el filtro de fechas, estaciones
+    y columnas aplicado en la lectura. Los años sin archivo se omiten; si no
+    hay ninguno se devuelve un ``DataFrame`` vacío con las columnas esperadas.
+    """
+    inicio = pd.Timestamp(fecha_inicio).normalize()
+    fin = pd.Timestamp(fecha_fin).normalize() + pd.Timedelta(days=1)
+
+    partes = []
+    for anio in range(inicio.year, fin.year + 1):
+        desde = max(inicio, pd.Timestamp(anio, 1, 1))
+        hasta = min(fin, pd.Timestamp(anio + 1, 1, 1))
+        if desde >= hasta or not _existe_anio(anio):
+            continue
+        partes.append(_leer_anio(anio, columnas, estaciones, desde.date(), hasta.date()))
+
+    if not partes:
+        return esquema.aplicar_esquema(pd.DataFrame(columns=_columnas_lectura(columnas) or esquema.COLUMNAS))
+    return esquema.concatenar(partes)
+
+
+def ruta_pronosticos(base=None):
+    return os.path.join(base or DIR_PRONOSTICOS, "pronosticos.parquet")
+
+
+@medido()
+def _leer_pronosticos_sin_cache(ruta):
+    try:
+        return pd.read_parquet(ruta)
+    except (OSError, ValueError, ImportError):
+        return pd.DataFrame(columns=COLUMNAS_PRONOSTICOS)
+
+
+@medido()
+def cargar_pronosticos(estaciones=None, contaminantes=None, horas=None):
+    """Pronósticos precalculados por ``notebooks/modelado/pronosticos.py``.
+
+    Sólo lee el artefacto (una vez por versión del archivo, vía la caché de
+    datos); ningún modelo se ajusta aquí. ``horas`` limita el horizonte.
+    Sin artefacto se devuelve un ``DataFrame`` vacío con las columnas esperadas.
+    """
+    ruta = ruta_pronosticos()
+    df = CACHE_DATOS.obtener_o_cargar(('pronosticos', ruta), huella_archivos([ruta]),
+                                      lambda: _leer_pronosticos_sin_cache(ruta), copiar=False)
+    mascara = pd.Series(True, index=df.index)
+    if estaciones is not None:
+        mascara &= df['Estacion'].isin(estaciones)
+    if contaminantes is not None:
+        mascara &= df['Contaminante'].isin(contaminantes)
+    if horas is not None:
+        mascara &= df['horizonte'] <= horas
+    return df[mascara].reset_index(drop=True)
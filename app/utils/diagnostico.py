@@ -0,0 +1,217 @@
+"""Medición de tiempos por sesión (opcional) y panel de diagnóstico.
+
+Los cargadores, las gráficas y el mapa están envueltos con ``@medido``, y las
+páginas marcan sus secciones con ``seccion``. Cada *span* registra su
+duración, las filas de los ``DataFrame`` que recibe y devuelve, y los
+aciertos y fallos de caché ocurridos mientras corría.
+
+Está desactivado por omisión; entonces ``@medido`` sólo consulta una
+bandera y llama a la función. Se activa para todo el proceso con la variable
+de entorno ``CALIDAD_AIRE_DIAGNOSTICO=1`` o para una sesión agregando
+``?diagnostico=1`` a la URL. Con la medición activa:
+
+* ``panel()`` muestra en la barra lateral los spans de la ejecución actual.
+* Cada span se emite como una línea JSON en el logger
+  ``calidad_aire.diagnostico``, que escribe en stderr con nivel INFO (o el
+  de la variable ``CALIDAD_AIRE_NIVEL_LOG``).
+
+Streamlit ejecuta cada sesión en su propio hilo, así que los spans se
+guardan por hilo y no se mezclan entre usuarios.
+"""
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+
+ACTIVO = os.environ.get("CALIDAD_AIRE_DIAGNOSTICO", "") == "1"
+PARAMETRO_URL = "diagnostico"
+
+NIVEL_LOG = os.environ.get("CALIDAD_AIRE_NIVEL_LOG", "INFO").upper()
+
+logger = logging.getLogger("calidad_aire.diagnostico")
+
+
+def _configurar_logger():
+    """Un solo ``StreamHandler`` aunque Streamlit vuelva a importar el módulo."""
+    for manejador in logger.handlers:
+        if getattr(manejador, "diagnostico", False):
+            return manejador
+    manejador = logging.StreamHandler()
+    manejador.diagnostico = True
+    manejador.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+    logger.addHandler(manejador)
+    logger.setLevel(NIVEL_LOG)
+    return manejador
+
+
+manejador = _configurar_logger()
+
+_local = threading.local()
+
+
+def activo():
+    return getattr(_local, "activo", ACTIVO)
+
+
+def _estado():
+    if not hasattr(_local, "spans"):
+        _local.spans = []
+        _local.pila = []
+        _local.cache = [0, 0]
+        _local.seccion = None
+        _local.t0 = time.perf_counter()
+    return _local
+
+
+def iniciar(pagina):
+    """Comienza la medición de una ejecución de ``pagina`` en la sesión actual."""
+    try:
+        import streamlit as st
+        por_url = st.query_params.get(PARAMETRO_URL) == "1"
+    except Exception:  # noqa: BLE001 - fuera de Streamlit no hay parámetros de URL
+        por_url = False
+    _local.activo = ACTIVO or por_url
+    _local.pagina = pagina
+    _local.spans, _local.pila, _local.cache, _local.seccion = [], [], [0, 0], None
+    _local.t0 = time.perf_counter()
+
+
+def contar_cache(acierto):
+    """Lo llama ``CacheLRU`` en cada consulta para atribuirla a los spans abiertos."""
+    if activo():
+        _estado().cache[0 if acierto else 1] += 1
+
+
+def _filas(valores):
+    return sum(len(v) for v in valores if isinstance(v, (pd.DataFrame, pd.Series)))
+
+
+class _Span:
+    def __init__(self, nombre, tipo, filas_entrada=0):
+        self.nombre = nombre
+        self.tipo = tipo
+        self.filas_entrada = filas_entrada
+        self.filas_salida = 0
+
+    def __enter__(self):
+        estado = _estado()
+        self.profundidad = len(estado.pila)
+        estado.pila.append(self)
+        self.cache = list(estado.cache)
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *error):
+        duracion = time.perf_counter() - self.inicio
+        estado = _estado()
+        estado.pila.remove(self)
+        registro = {
+            "pagina": getattr(estado, "pagina", None),
+            "span": self.nombre,
+            "tipo": self.tipo,
+            "profundidad": self.profundidad,
+            "inicio_ms": round((self.inicio - estado.t0) * 1000, 3),
+            "ms": round(duracion * 1000, 3),
+            "filas_entrada": self.filas_entrada,
+            "filas_salida": self.filas_salida,
+            "aciertos_cache": estado.cache[0] - self.cache[0],
+            "fallos_cache": estado.cache[1] - self.cache[1],
+            "error": error[0].__name__ if error[0] is not None else None,
+        }
+        estado.spans.append(registro)
+        logger.info(json.dumps(registro, ensure_ascii=False))
+        return False
+
+
+def span(nombre, tipo="bloque", filas_entrada=0):
+    """Context manager que mide un bloque; sin medición activa no hace nada."""
+    if not activo():
+        return _Nulo()
+    return _Span(nombre, tipo, filas_entrada)
+
+
+class _Nulo:
+    filas_salida = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *error):
+        return False
+
+
+def medido(nombre=None):
+    """Decorador que mide cada llamada como un span ``modulo.funcion``."""
+    def decorador(funcion):
+        etiqueta = nombre or f"{funcion.__module__.rsplit('.', 1)[-1]}.{funcion.__name__}"
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not activo():
+                return funcion(*args, **kwargs)
+            with _Span(etiqueta, "funcion", _filas(list(args) + list(kwargs.values()))) as medicion:
+                resultado = funcion(*args, **kwargs)
+                medicion.filas_salida = _filas([resultado])
+            return resultado
+
+        return envoltura
+    return decorador
+
+
+def seccion(nombre):
+    """Cierra la sección anterior de la página y abre ``nombre``.
+
+    Permite marcar secciones con una sola línea, sin reindentar el código de
+    la página; ``panel()`` cierra la última.
+    """
+    if not activo():
+        return
+    estado = _estado()
+    _cerrar_seccion(estado)
+    estado.seccion = _Span(nombre, "seccion").__enter__()
+
+
+def _cerrar_seccion(estado):
+    if estado.seccion is not None:
+        estado.seccion.__exit__(None, None, None)
+        estado.seccion = None
+
+
+def spans():
+    """Spans registrados en la ejecución actual, en orden de cierre."""
+    return list(_estado().spans) if activo() else []
+
+
+def resumen(registros):
+    """Tabla de spans en orden de inicio, con sangría según anidamiento."""
+    df = pd.DataFrame(registros)
+    if df.empty:
+        return df
+    df = df.sort_values(["inicio_ms", "profundidad"], kind="stable")
+    df.insert(0, "nombre", ["  " * p + s for p, s in zip(df["profundidad"], df["span"])])
+    return df[["nombre", "tipo", "inicio_ms", "ms", "filas_entrada", "filas_salida", "aciertos_cache", "fallos_cache"]]
+
+
+def panel():
+    """Muestra los spans de la ejecución en la barra lateral (sólo con medición activa)."""
+    if not activo():
+        return
+    import streamlit as st
+
+    estado = _estado()
+    _cerrar_seccion(estado)
+    registros = spans()
+    secciones = [r for r in registros if r["tipo"] == "seccion"]
+    with st.sidebar.expander("🩺 Diagnóstico de rendimiento", expanded=True):
+        st.metric("Tiempo medido en secciones", f"{sum(r['ms'] for r in secciones):.0f} ms")
+        st.dataframe(resumen(registros), use_container_width=True, hide_index=True)
+        st.download_button(
+            "⬇️ Spans en JSON",
+            data=json.dumps(registros, ensure_ascii=False, indent=1).encode("utf-8"),
+            file_name="diagnostico.json",
+            mime="application/json",
+        )
@@ -0,0 +1,156 @@
+"""Armonización de los históricos por estación (``data/Crudos/Estacionales``).
+
+Los años 2021 y 2022 vienen en archivos exportados desde R, uno por estación
+y año (``bine2021_corregido.csv``…), con otros nombres de columna
+(``Fecha_Hora``, ``O3_Horario``, ``CO_8H``, ``SO2_24H``, ``PM_2.5``). Este
+módulo reemplaza el paso manual de ``notebooks/01_5_Limpieza2.ipynb``:
+
+1. Cada archivo se lleva al esquema limpio en un proceso aparte
+   (``ProcessPoolExecutor``) y se escribe, ordenado por ``DateTime``, en una
+   parte temporal por año.
+2. Las partes de cada año se mezclan en orden de tiempo (``heapq.merge``,
+   línea por línea, sin cargarlas en memoria) en ``datos_Clean_{anio}.csv``.
+   Las mezclas de años distintos también corren en paralelo.
+
+El resultado queda ordenado por ``(DateTime, Estacion)``, así que cada día
+ocupa un solo rango de bytes en el índice por día. Agregar estaciones o años
+sólo requiere poner sus archivos en la carpeta.
+
+Para regenerar los años desde la raíz del repositorio::
+
+    PYTHONPATH=app python -m utils.estacionales
+"""
+import heapq
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from utils import almacen, esquema
+
+DIR_ESTACIONALES = "data/Crudos/Estacionales"
+DIR_CLEAN = "data/Clean"
+PATRON_ARCHIVO = r"([a-z_]+?)(\d{4})_corregido\.csv"
+
+RENOMBRAR = {
+    'Fecha_Hora': 'DateTime',
+    'O3_Horario': 'O3',
+    'O3_8H': 'O3_8hrs',
+    'CO_8H': 'CO',
+    'SO2_24H': 'SO2',
+    'PM_10': 'PM10',
+    'PM_2.5': 'PM2_5',
+}
+
+_COLUMNA_FECHA = esquema.COLUMNAS.index('DateTime')
+_COLUMNA_ESTACION = esquema.COLUMNAS.index('Estacion')
+
+
+def fuentes(origen=None):
+    """``(ruta, estacion)`` de cada archivo por estación, en orden alfabético."""
+    origen = origen or DIR_ESTACIONALES
+    encontradas = []
+    for nombre in sorted(os.listdir(origen)):
+        coincidencia = re.fullmatch(PATRON_ARCHIVO, nombre)
+        if coincidencia:
+            encontradas.append((os.path.join(origen, nombre), coincidencia.group(1)))
+    return encontradas
+
+
+# ============================
+# Transformación (un archivo)
+# ============================
+
+def armonizar(df, estacion):
+    """Lleva un archivo por estación al esquema limpio, ordenado por ``DateTime``."""
+    df = df.rename(columns=RENOMBRAR)
+    df['DateTime'] = pd.to_datetime(df['DateTime'], errors='coerce')
+    df = df.dropna(subset=['DateTime'])
+    for contaminante in esquema.CONTAMINANTES:
+        if contaminante not in df.columns:
+            df[contaminante] = float('nan')
+    df['Estacion'] = estacion
+    df['Anio'] = df['DateTime'].dt.year
+    df['Mes'] = df['DateTime'].dt.month
+    df['Dia'] = df['DateTime'].dt.day
+    df['Hora'] = df['DateTime'].dt.hour
+    return esquema.aplicar_esquema(df).sort_values('DateTime', kind='stable')
+
+
+def _armonizar_archivo(ruta, estacion, temporal):
+    """Trabajo de un proceso: escribe una parte ordenada por año y devuelve ``{anio: ruta}``."""
+    df = armonizar(pd.read_csv(ruta), estacion)
+    base = os.path.splitext(os.path.basename(ruta))[0]
+    partes = {}
+    for anio, df_anio in df.groupby('Anio', sort=True):
+        parte = os.path.join(temporal, f"{base}-{anio}.csv")
+        df_anio.to_csv(parte, index=False, header=False, date_format=esquema.FORMATO_FECHA)
+        partes[int(anio)] = parte
+    return partes
+
+
+# ============================
+# Mezcla por año
+# ============================
+
+def _clave(linea):
+    campos = linea.split(",")
+    return campos[_COLUMNA_FECHA], campos[_COLUMNA_ESTACION]
+
+
+def _mezclar(partes, destino):
+    """Mezcla en orden de tiempo partes ya ordenadas; devuelve las filas escritas.
+
+    Si dos partes traen la misma ``(Estacion, DateTime)`` se conserva la
+    primera. El destino se reemplaza de forma atómica.
+    """
+    temporal = destino + ".tmp"
+    archivos = [open(parte, encoding="utf-8") for parte in sorted(partes)]
+    filas, anterior = 0, None
+    try:
+        with open(temporal, "w", encoding="utf-8") as salida:
+            salida.write(",".join(esquema.COLUMNAS) + "\n")
+            for linea in heapq.merge(*archivos, key=_clave):
+                clave = _clave(linea)
+                if clave == anterior:
+                    continue
+                salida.write(linea)
+                anterior = clave
+                filas += 1
+    finally:
+        for archivo in archivos:
+            archivo.close()
+    os.replace(temporal, destino)
+    return filas
+
+
+def armonizar_todo(origen=None, destino=None, procesos=None):
+    """Regenera ``datos_Clean_{anio}.csv`` para cada año de los archivos por estación.
+
+    ``procesos`` es el número de procesos (por omisión, uno por núcleo).
+    Devuelve ``{anio: filas}``.
+    """
+    destino = destino or DIR_CLEAN
+    por_anio = {}
+    with tempfile.TemporaryDirectory(dir=destino) as temporal, \
+            ProcessPoolExecutor(max_workers=procesos) as pool:
+        futuros = [pool.submit(_armonizar_archivo, ruta, estacion, temporal)
+                   for ruta, estacion in fuentes(origen)]
+        for futuro in futuros:
+            for anio, parte in futuro.result().items():
+                por_anio.setdefault(anio, []).append(parte)
+
+        mezclas = {
+            anio: pool.submit(_mezclar, partes, os.path.join(destino, f"datos_Clean_{anio}.csv"))
+            for anio, partes in sorted(por_anio.items())
+        }
+        return {anio: futuro.result() for anio, futuro in mezclas.items()}
+
+
+if __name__ == "__main__":
+    for anio, filas in armonizar_todo().items():
+        print(f"✅ {anio}: {filas} filas en {os.path.join(DIR_CLEAN, f'datos_Clean_{anio}.csv')}")
+        if almacen.existe():
+            almacen.ingestar_anio(anio)
@@ -0,0 +1,86 @@
+"""Catálogo único de estaciones de monitoreo.
+
+Lee ``data/estaciones-Puebla_sinaica.csv`` (formato del catálogo de SINAICA:
+``Estaciones``, ``lat``, ``long``, ``nombre``) y lo expone como un
+``Catalogo`` con búsquedas por clave en O(1). Las páginas, el mapa y los
+scripts de descarga toman de aquí las claves, nombres y coordenadas en lugar
+de repetirlas.
+
+La columna opcional ``etiqueta`` es el texto que muestran las páginas (por
+ejemplo con las siglas de la estación); donde falta se usa ``nombre``, que
+es el que aparece en el mapa.
+
+La columna opcional ``red`` indica de qué portal se descargan los datos de
+la estación; los scripts de ``notebooks/scraping`` sólo piden las de
+``RED_PUEBLA``. Si falta, todas las estaciones se consideran de esa red.
+
+El archivo se lee una sola vez por proceso y se vuelve a leer sólo si
+cambia en disco. Otra ruta se puede indicar con ``CALIDAD_AIRE_ESTACIONES``.
+"""
+import functools
+import os
+
+import pandas as pd
+
+from utils.cache import huella_archivos
+
+RUTA_CATALOGO = os.environ.get("CALIDAD_AIRE_ESTACIONES", "data/estaciones-Puebla_sinaica.csv")
+RED_PUEBLA = "Puebla"
+
+
+class Catalogo:
+    """Estaciones indexadas por clave, en el orden del archivo."""
+
+    def __init__(self, df):
+        df = df.reset_index(drop=True)
+        if 'red' not in df.columns:
+            df['red'] = RED_PUEBLA
+        self.tabla = df.set_index('Estaciones')
+        self._nombres = dict(zip(df['Estaciones'], df['nombre']))
+        etiquetas = df['etiqueta'].fillna(df['nombre']) if 'etiqueta' in df.columns else df['nombre']
+        self._etiquetas = dict(zip(df['Estaciones'], etiquetas))
+        self._coordenadas = dict(zip(df['Estaciones'], zip(df['lat'].astype(float), df['long'].astype(float))))
+        self._redes = dict(zip(df['Estaciones'], df['red'].fillna("")))
+
+    def __len__(self):
+        return len(self._nombres)
+
+    def __iter__(self):
+        return iter(self._nombres)
+
+    def __contains__(self, clave):
+        return clave in self._nombres
+
+    def claves(self, red=None):
+        """Claves de las estaciones (sólo las de ``red`` si se indica)."""
+        if red is None:
+            return list(self._nombres)
+        return [clave for clave, r in self._redes.items() if r == red]
+
+    def nombre(self, clave):
+        """Nombre de la estación, o la clave misma si no está en el catálogo."""
+        return self._nombres.get(clave, clave)
+
+    def etiqueta(self, clave):
+        """Texto de la estación en las páginas, o la clave misma si no está en el catálogo."""
+        return self._etiquetas.get(clave, clave)
+
+    def coordenadas(self, clave):
+        """``(lat, long)`` de la estación."""
+        return self._coordenadas[clave]
+
+    def geometria(self, clave):
+        """Punto GeoJSON de la estación."""
+        lat, long = self._coordenadas[clave]
+        return {"type": "Point", "coordinates": [long, lat]}
+
+
+@functools.lru_cache(maxsize=4)
+def _leer(ruta, huella):
+    return Catalogo(pd.read_csv(ruta))
+
+
+def catalogo(ruta=None):
+    """El catálogo de ``ruta`` (por omisión ``RUTA_CATALOGO``), leído una sola vez."""
+    ruta = ruta or RUTA_CATALOGO
+    return _leer(ruta, huella_archivos([ruta]))
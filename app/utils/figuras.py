@@ -0,0 +1,95 @@
+"""Caché de figuras ya rasterizadas.
+
+Dibujar con matplotlib es lo más costoso de cada ejecución de una página, y la
+mayoría de las gráficas se repiten idénticas entre ejecuciones y usuarios
+(por ejemplo, al cambiar de pestaña o mover un control que no las afecta).
+``figura_cacheada`` guarda el PNG de cada gráfica en una ``CacheLRU``
+compartida, con una clave formada por la función, sus argumentos y una huella
+del contenido de los datos que recibe.
+
+El tope de memoria se ajusta con la variable de entorno
+``CALIDAD_AIRE_CACHE_FIGURAS_MB`` (64 por defecto).
+"""
+import functools
+import hashlib
+import io
+import os
+
+import matplotlib.pyplot as plt
+import pandas as pd
+import streamlit as st
+
+from utils import diagnostico
+from utils.cache import MB, CacheLRU
+
+CACHE_FIGURAS = CacheLRU(int(os.environ.get("CALIDAD_AIRE_CACHE_FIGURAS_MB", "64")) * MB)
+
+# Mismas opciones que usa ``st.pyplot`` al rasterizar.
+OPCIONES_PNG = {"bbox_inches": "tight", "dpi": 200, "format": "png"}
+
+
+def configurar_cache_figuras(max_mb):
+    CACHE_FIGURAS.configurar(int(max_mb * MB))
+
+
+def estadisticas_cache_figuras():
+    return CACHE_FIGURAS.estadisticas()
+
+
+def huella_datos(valor):
+    """Valor hashable que identifica el contenido de ``valor``.
+
+    Los ``DataFrame`` y ``Series`` se resumen con un hash de sus filas, columnas
+    y tipos; los objetos con método ``huella()`` (como ``agregados.Cubo``) usan
+    el suyo, y las colecciones se recorren elemento por elemento.
+    """
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        resumen = hashlib.sha1(pd.util.hash_pandas_object(valor, index=True).values.tobytes())
+        if isinstance(valor, pd.DataFrame):
+            resumen.update(repr(list(zip(valor.columns, map(str, valor.dtypes)))).encode("utf-8"))
+        else:
+            resumen.update(repr((valor.name, str(valor.dtype))).encode("utf-8"))
+        return resumen.hexdigest()
+    if hasattr(valor, "huella") and callable(valor.huella):
+        return valor.huella()
+    if isinstance(valor, (list, tuple)):
+        return tuple(huella_datos(v) for v in valor)
+    if isinstance(valor, (set, frozenset)):
+        return tuple(sorted(map(repr, valor)))
+    if isinstance(valor, dict):
+        return tuple(sorted((repr(k), huella_datos(v)) for k, v in valor.items()))
+    return repr(valor)
+
+
+def a_png(fig):
+    """Rasteriza ``fig`` a PNG y la cierra para liberar su memoria."""
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, **OPCIONES_PNG)
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+def figura_cacheada(funcion):
+    """Convierte una función que devuelve una figura en una que la muestra.
+
+    La figura sólo se construye si su PNG no está en ``CACHE_FIGURAS``; en
+    ambos casos se muestra con ``st.image`` al ancho de la columna. La clave se
+    calcula antes de llamar a ``funcion``, así que los argumentos que ésta
+    modifique no alteran la entrada guardada.
+    """
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        clave = (funcion.__module__, funcion.__qualname__, huella_datos(args), huella_datos(kwargs))
+        encontrado, png = CACHE_FIGURAS.obtener(clave)
+        if not encontrado:
+            with diagnostico.span(f"{funcion.__name__}/dibujar"):
+                fig = funcion(*args, **kwargs)
+            with diagnostico.span(f"{funcion.__name__}/png"):
+                png = a_png(fig)
+            CACHE_FIGURAS.guardar(clave, png)
+        st.image(png, use_column_width=True, output_format="PNG")
+        return png
+
+    return diagnostico.medido(f"graficos.{funcion.__name__}")(envoltura)
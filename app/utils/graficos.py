@@ -1,18 +1,23 @@
 import matplotlib.pyplot as plt
 import seaborn as sns
-import streamlit as st
 import numpy as np
 import pandas as pd
+from utils.figuras import figura_cacheada
 from utils.levels_contaminacion import menu_contaminante
+from utils.submuestreo import submuestrear
 
 
 # ============================
 # 🌡️ GRÁFICOS HORARIOS
 # ============================
 
-def concentracion_horaria(df, contaminante):
+@figura_cacheada
+def concentracion_horaria(df, contaminante, cubo=None):
     """Gráfico de líneas por hora y estación"""
-    hourly_avg = df.groupby(['Hora', 'Estacion'])[contaminante].mean().unstack()
+    if cubo is not None:
+        hourly_avg = cubo.perfil_horario(contaminante)
+    else:
+        hourly_avg = df.groupby(['Hora', 'Estacion'], observed=True)[contaminante].mean().unstack()
     fig, ax = plt.subplots(figsize=(12, 6))
     hourly_avg.plot(ax=ax, marker='o', linewidth=2)
     ax.set_title(f"Concentración Horaria Promedio de {contaminante}", fontsize=18, weight='bold')
@@ -24,24 +29,26 @@ def concentracion_horaria(df, contaminante):
     ax.grid(True, linestyle='--', alpha=0.3)
     ax.legend(title="Estación", bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=9, title_fontsize=10)
     fig.tight_layout()
-    st.pyplot(fig)
+    return fig
 
 
+@figura_cacheada
 def concentracion_horaria_heatmap(df, contaminante):
     """Heatmap de concentración por hora y estación"""
-    hourly_avg = df.groupby(['Hora', 'Estacion'])[contaminante].mean().unstack().T
+    hourly_avg = df.groupby(['Hora', 'Estacion'], observed=True)[contaminante].mean().unstack().T
     fig, ax = plt.subplots(figsize=(12, 5))
     sns.heatmap(hourly_avg, cmap='YlOrRd', annot=False, fmt=".2f", cbar_kws={'label': f'{contaminante} (ppm)'})
     ax.set_title(f"Mapa de Calor: {contaminante} por Hora", fontsize=14)
     ax.set_xlabel("Hora del Día")
     ax.set_ylabel("Estación")
-    st.pyplot(fig)
+    return fig
 
 
+@figura_cacheada
 def area_horaria_estacion(df, contaminante):
     """Área apilada por hora para todas las estaciones"""
     df['Hora'] = df['DateTime'].dt.hour
-    resumen = df.groupby(['Hora', 'Estacion'])[contaminante].mean().unstack()
+    resumen = df.groupby(['Hora', 'Estacion'], observed=True)[contaminante].mean().unstack()
     fig, ax = plt.subplots(figsize=(12, 5))
     resumen.plot(kind='area', stacked=True, ax=ax, alpha=0.6)
     ax.set_title(f"Distribución acumulada por hora de {contaminante}")
@@ -50,18 +57,19 @@ def area_horaria_estacion(df, contaminante):
     ax.legend(title='Estación', bbox_to_anchor=(1.02, 1), loc='upper left')
     ax.grid(True, linestyle='--', alpha=0.3)
     plt.tight_layout()
-    st.pyplot(fig)
+    return fig
 
 
 # ============================
 # 📆 GRÁFICOS ANUALES
 # ============================
 
+@figura_cacheada
 def evolucion_promedio(df, contaminante, estaciones_seleccionadas):
     fig, ax = plt.subplots(figsize=(12, 5))
     for estacion in estaciones_seleccionadas:
         df_est = df[df['Estacion'] == estacion]
-        df_est = df_est.groupby('DateTime')[contaminante].mean()
+        df_est = submuestrear(df_est.groupby('DateTime')[contaminante].mean())
         ax.plot(df_est.index, df_est.values, marker='o', label=estacion)
     ax.set_title(f"{contaminante} promedio diario por estación")
     ax.set_xlabel("Fecha")
@@ -69,9 +77,10 @@ def evolucion_promedio(df, contaminante, estaciones_seleccionadas):
     ax.grid(True, linestyle='--', alpha=0.5)
     ax.legend()
     fig.autofmt_xdate()
-    st.pyplot(fig)
+    return fig
 
 
+@figura_cacheada
 def boxplot(df, contaminante, estaciones_seleccionadas):
     df = df[df['Estacion'].isin(estaciones_seleccionadas)].copy()
     df['Mes'] = df['DateTime'].dt.strftime('%b')
@@ -83,12 +92,16 @@ def boxplot(df, contaminante, estaciones_seleccionadas):
     ax.set_title(f"Distribución mensual de {contaminante}")
     ax.set_ylabel(f"{contaminante} (ppm)")
     ax.set_xlabel("Mes")
-    st.pyplot(fig)
+    return fig
 
 
-def barras_promedio(df, contaminante, estaciones_seleccionadas):
-    df['Mes'] = df['DateTime'].dt.month
-    resumen = df[df['Estacion'].isin(estaciones_seleccionadas)].groupby(['Mes', 'Estacion'])[contaminante].mean().unstack()
+@figura_cacheada
+def barras_promedio(df, contaminante, estaciones_seleccionadas, cubo=None):
+    if cubo is not None:
+        resumen = cubo.filtrar(estaciones_seleccionadas).promedio_mensual(contaminante)
+    else:
+        df['Mes'] = df['DateTime'].dt.month
+        resumen = df[df['Estacion'].isin(estaciones_seleccionadas)].groupby(['Mes', 'Estacion'], observed=True)[contaminante].mean().unstack()
     fig, ax = plt.subplots(figsize=(12, 5))
     resumen.plot(kind='bar', ax=ax)
     ax.set_title(f"{contaminante} promedio mensual por estación")
@@ -96,20 +109,26 @@ def barras_promedio(df, contaminante, estaciones_seleccionadas):
     ax.set_ylabel(f"{contaminante} (ppm)")
     ax.grid(True, linestyle='--', alpha=0.4)
     ax.legend(title='Estación')
-    st.pyplot(fig)
+    return fig
 
 
 # ============================
 # 📅 GRÁFICOS MENSUALES
 # ============================
 
-def concentracion_diaria_por_mes(df, contaminante, estaciones_seleccionadas, mes):
-    df_mes = df.copy()
-    df_mes['Dia'] = df_mes['DateTime'].dt.day
+@figura_cacheada
+def concentracion_diaria_por_mes(df, contaminante, estaciones_seleccionadas, mes, cubo=None):
+    if cubo is not None:
+        promedios = cubo.promedio_por_dia_del_mes(contaminante)
+    else:
+        df_mes = df.copy()
+        df_mes['Dia'] = df_mes['DateTime'].dt.day
+        promedios = df_mes.groupby(['Dia', 'Estacion'], observed=True)[contaminante].mean().unstack()
     fig, ax = plt.subplots(figsize=(12, 5))
     for estacion in estaciones_seleccionadas:
-        df_est = df_mes[df_mes['Estacion'] == estacion]
-        promedio_dia = df_est.groupby('Dia')[contaminante].mean()
+        if estacion not in promedios.columns:
+            continue
+        promedio_dia = promedios[estacion].dropna()
         ax.plot(promedio_dia.index, promedio_dia.values, marker='o', label=estacion)
     ax.set_title(f"Concentración diaria de {contaminante} en el mes {mes:02d}")
     ax.set_xlabel("Día del mes")
@@ -117,15 +136,19 @@ def concentracion_diaria_por_mes(df, contaminante, estaciones_seleccionadas, mes
     ax.grid(True, linestyle='--', alpha=0.4)
     ax.legend(title='Estación')
     plt.tight_layout()
-    st.pyplot(fig)
+    return fig
 
 
-def barras_diarias_por_mes(df, contaminante, estaciones_seleccionadas, mes):
-    df_mes = df.copy()
-    df_mes['Dia'] = df_mes['DateTime'].dt.day
-    df_mes = df_mes[df_mes['DateTime'].dt.month == mes]
-    resumen = df_mes[df_mes['Estacion'].isin(estaciones_seleccionadas)] \
-        .groupby(['Dia', 'Estacion'])[contaminante].mean().unstack()
+@figura_cacheada
+def barras_diarias_por_mes(df, contaminante, estaciones_seleccionadas, mes, cubo=None):
+    if cubo is not None:
+        resumen = cubo.filtrar(estaciones_seleccionadas).promedio_por_dia_del_mes(contaminante)
+    else:
+        df_mes = df.copy()
+        df_mes['Dia'] = df_mes['DateTime'].dt.day
+        df_mes = df_mes[df_mes['DateTime'].dt.month == mes]
+        resumen = df_mes[df_mes['Estacion'].isin(estaciones_seleccionadas)] \
+            .groupby(['Dia', 'Estacion'], observed=True)[contaminante].mean().unstack()
     fig, ax = plt.subplots(figsize=(12, 5))
     resumen.plot(kind='bar', ax=ax)
     ax.set_title(f"{contaminante} promedio diario por estación - Mes {mes:02d}")
@@ -134,9 +157,10 @@ def barras_diarias_por_mes(df, contaminante, estaciones_seleccionadas, mes):
     ax.grid(True, linestyle='--', alpha=0.4)
     ax.legend(title='Estación', bbox_to_anchor=(1.02, 1), loc='upper left')
     plt.tight_layout()
-    st.pyplot(fig)
+    return fig
 
 
+@figura_cacheada
 def boxplot_dia_por_estacion(df, contaminante, estaciones_seleccionadas, mes):
     df_mes = df.copy()
     df_mes['Dia'] = df_mes['DateTime'].dt.day
@@ -148,15 +172,19 @@ def boxplot_dia_por_estacion(df, contaminante, estaciones_seleccionadas, mes):
     ax.set_ylabel(f"{contaminante} (ppm)")
     ax.set_xlabel("Día del mes")
     ax.legend(title='Estación', bbox_to_anchor=(1.02, 1), loc='upper left')
-    st.pyplot(fig)
+    return fig
 
 
-def area_apilada_diaria(df, contaminante, estaciones_seleccionadas, mes):
-    df_mes = df.copy()
-    df_mes['Dia'] = df_mes['DateTime'].dt.day
-    df_mes = df_mes[df_mes['DateTime'].dt.month == mes]
-    df_mes = df_mes[df_mes['Estacion'].isin(estaciones_seleccionadas)]
-    resumen = df_mes.groupby(['Dia', 'Estacion'])[contaminante].mean().unstack()
+@figura_cacheada
+def area_apilada_diaria(df, contaminante, estaciones_seleccionadas, mes, cubo=None):
+    if cubo is not None:
+        resumen = cubo.filtrar(estaciones_seleccionadas).promedio_por_dia_del_mes(contaminante)
+    else:
+        df_mes = df.copy()
+        df_mes['Dia'] = df_mes['DateTime'].dt.day
+        df_mes = df_mes[df_mes['DateTime'].dt.month == mes]
+        df_mes = df_mes[df_mes['Estacion'].isin(estaciones_seleccionadas)]
+        resumen = df_mes.groupby(['Dia', 'Estacion'], observed=True)[contaminante].mean().unstack()
     fig, ax = plt.subplots(figsize=(12, 5))
     resumen.plot(kind='area', stacked=True, ax=ax, alpha=0.6)
     ax.set_title(f"Concentración acumulada diaria de {contaminante} por estación - Mes {mes:02d}")
@@ -165,18 +193,23 @@ def area_apilada_diaria(df, contaminante, estaciones_seleccionadas, mes):
     ax.grid(True, linestyle='--', alpha=0.3)
     ax.legend(title='Estación', bbox_to_anchor=(1.02, 1), loc='upper left')
     plt.tight_layout()
-    st.pyplot(fig)
+    return fig
 
 
 # ============================
 # 🔁 COMPARACIÓN ENTRE AÑOS
 # ============================
 
-def comparar_anios_sobre_mes(df1, df2, contaminante, estacion, anio1, anio2):
-    df1['DiaJuliano'] = df1['DateTime'].dt.dayofyear
-    df2['DiaJuliano'] = df2['DateTime'].dt.dayofyear
-    prom1 = df1.groupby('DiaJuliano')[contaminante].mean()
-    prom2 = df2.groupby('DiaJuliano')[contaminante].mean()
+@figura_cacheada
+def comparar_anios_sobre_mes(df1, df2, contaminante, estacion, anio1, anio2, cubos=None):
+    if cubos is not None:
+        prom1, prom2 = (c.promedio_por_dia_del_anio(contaminante, por_estacion=False) for c in cubos)
+    else:
+        df1['DiaJuliano'] = df1['DateTime'].dt.dayofyear
+        df2['DiaJuliano'] = df2['DateTime'].dt.dayofyear
+        prom1 = df1.groupby('DiaJuliano')[contaminante].mean()
+        prom2 = df2.groupby('DiaJuliano')[contaminante].mean()
+    prom1, prom2 = submuestrear(prom1), submuestrear(prom2)
     fig, ax = plt.subplots(figsize=(12, 5))
     ax.plot(prom1.index, prom1.values, label=f"{contaminante} - {anio1}", color='blue')
     ax.plot(prom2.index, prom2.values, label=f"{contaminante} - {anio2}", color='green')
@@ -189,14 +222,18 @@ def comparar_anios_sobre_mes(df1, df2, contaminante, estacion, anio1, anio2):
     ax.grid(True, linestyle='--', alpha=0.4)
     ax.legend()
     plt.tight_layout()
-    st.pyplot(fig)
+    return fig
 
 
-def barras_comparativas_mensuales(df1, df2, contaminante, estacion, anio1, anio2):
-    df1['Mes'] = df1['DateTime'].dt.month
-    df2['Mes'] = df2['DateTime'].dt.month
-    prom1 = df1.groupby('Mes')[contaminante].mean()
-    prom2 = df2.groupby('Mes')[contaminante].mean()
+@figura_cacheada
+def barras_comparativas_mensuales(df1, df2, contaminante, estacion, anio1, anio2, cubos=None):
+    if cubos is not None:
+        prom1, prom2 = (c.promedio_mensual(contaminante, por_estacion=False) for c in cubos)
+    else:
+        df1['Mes'] = df1['DateTime'].dt.month
+        df2['Mes'] = df2['DateTime'].dt.month
+        prom1 = df1.groupby('Mes')[contaminante].mean()
+        prom2 = df2.groupby('Mes')[contaminante].mean()
     df_plot = pd.DataFrame({f'{anio1}': prom1, f'{anio2}': prom2})
     fig, ax = plt.subplots(figsize=(10, 5))
     df_plot.plot(kind='bar', ax=ax)
@@ -208,9 +245,10 @@ def barras_comparativas_mensuales(df1, df2, contaminante, estacion, anio1, anio2
     ax.grid(True, linestyle='--', alpha=0.3)
     ax.legend(title="Año")
     plt.tight_layout()
-    st.pyplot(fig)
+    return fig
 
 
+@figura_cacheada
 def boxplot_comparativo_anual(df1, df2, contaminante, anio1, anio2):
     df1['Año'] = anio1
     df2['Año'] = anio2
@@ -222,4 +260,25 @@ def boxplot_comparativo_anual(df1, df2, contaminante, anio1, anio2):
     ax.set_xlabel("Año")
     ax.grid(True, linestyle='--', alpha=0.3)
     plt.tight_layout()
-    st.pyplot(fig)
+    return fig
+
+
+# ============================
+# 🔮 PRONÓSTICOS
+# ============================
+
+@figura_cacheada
+def pronostico(df, contaminante):
+    """Pronóstico por estación con su intervalo como banda."""
+    fig, ax = plt.subplots(figsize=(12, 5))
+    for estacion, df_est in df.groupby('Estacion', observed=True):
+        linea, = ax.plot(df_est['DateTime'], df_est['pronostico'], linewidth=2, label=estacion)
+        ax.fill_between(df_est['DateTime'], df_est['inferior'], df_est['superior'], color=linea.get_color(), alpha=0.15)
+    ax.set_title(f"Pronóstico de {contaminante} por estación")
+    ax.set_xlabel("Fecha")
+    ax.set_ylabel(f"{contaminante} (ppm)")
+    ax.grid(True, linestyle='--', alpha=0.3)
+    ax.legend(title="Estación", bbox_to_anchor=(1.02, 1), loc='upper left')
+    fig.autofmt_xdate()
+    fig.tight_layout()
+    return fig
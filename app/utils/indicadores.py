@@ -0,0 +1,269 @@
+"""Indicadores normativos con promedios móviles por estación.
+
+La NOM-172-SEMARNAT-2019 no evalúa todos los contaminantes con el valor
+horario: O3 y CO usan el promedio móvil de 8 horas, y SO2, PM10 y PM2.5 el
+de 24 horas. Un promedio sólo es válido si al menos el 75 % de las horas de
+su ventana tiene dato; si no, queda como faltante.
+
+Todo se calcula en una sola pasada vectorizada: las filas se colocan en un
+arreglo ``(hora, estación, contaminante)`` sobre una rejilla horaria
+completa, y cada ventana sale de la diferencia de dos sumas acumuladas
+(de valores y de horas válidas). El costo es lineal en el número de horas,
+sin ``groupby().rolling()`` por estación.
+
+Los resultados de cada año se guardan en ``data/Indicadores/Anio={anio}/``
+y se actualizan de forma incremental: sólo se calculan las horas posteriores
+a la última guardada, usando como contexto las horas previas de la ventana.
+``add_ayer.py`` los actualiza después de cada ingesta; la aplicación sólo
+lee la tabla y, si falta o quedó atrás, calcula en memoria las horas que
+pide sin escribir nada.
+
+Para reconstruir todos los años desde la raíz del repositorio::
+
+    PYTHONPATH=app python -m utils.indicadores
+"""
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils import columnar, data_loader, esquema
+from utils.cache import huella_archivos
+
+DIR_INDICADORES = "data/Indicadores"
+COBERTURA_MINIMA = 0.75
+
+# Contaminante -> horas de la ventana del indicador.
+VENTANAS = {'O3': 8, 'CO': 8, 'SO2': 24, 'PM10': 24, 'PM2_5': 24}
+INDICADORES = {contaminante: f"{contaminante}_{horas}h" for contaminante, horas in VENTANAS.items()}
+VENTANA_MAXIMA = max(VENTANAS.values())
+COLUMNAS = ['Estacion', 'DateTime'] + list(INDICADORES.values())
+
+_HORA = pd.Timedelta(hours=1)
+
+
+def minimo_horas(ventana):
+    """Horas con dato necesarias para que el promedio de ``ventana`` sea válido."""
+    return math.ceil(ventana * COBERTURA_MINIMA)
+
+
+def ruta_indicadores(anio, base=None):
+    return os.path.join(base or DIR_INDICADORES, f"Anio={anio}")
+
+
+# ============================
+# Cálculo vectorizado
+# ============================
+
+def promedios_moviles(valores, ventana, minimo=None):
+    """Promedio de las últimas ``ventana`` filas (la actual incluida) sobre el eje 0.
+
+    ``valores`` es un arreglo con las horas en el primer eje; cualquier otra
+    dimensión (estaciones, contaminantes) se calcula a la vez. Las posiciones
+    con menos de ``minimo`` valores válidos quedan en ``NaN``.
+    """
+    if minimo is None:
+        minimo = minimo_horas(ventana)
+    validos = ~np.isnan(valores)
+    ceros = np.zeros((1,) + valores.shape[1:])
+    suma = np.concatenate([ceros, np.cumsum(np.where(validos, valores, 0.0), axis=0)])
+    conteo = np.concatenate([ceros, np.cumsum(validos, axis=0)])
+
+    fin = np.arange(1, len(valores) + 1)
+    inicio = np.maximum(fin - ventana, 0)
+    suma_ventana = suma[fin] - suma[inicio]
+    conteo_ventana = conteo[fin] - conteo[inicio]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        promedio = suma_ventana / conteo_ventana
+    promedio[conteo_ventana < minimo] = np.nan
+    return promedio
+
+
+def calcular(df):
+    """Indicadores de cada fila de ``df`` (mismo índice y orden).
+
+    ``df`` necesita ``Estacion``, ``DateTime`` y los contaminantes de
+    ``VENTANAS`` que se quieran calcular; los que falten no se devuelven.
+    Las horas ausentes de una estación cuentan como faltantes.
+    """
+    contaminantes = [c for c in VENTANAS if c in df.columns]
+    resultado = df[['Estacion', 'DateTime']].copy()
+    if df.empty:
+        for contaminante in contaminantes:
+            resultado[INDICADORES[contaminante]] = pd.Series(dtype='float32')
+        return resultado
+
+    estaciones = pd.Categorical(df['Estacion'])
+    inicio = df['DateTime'].min()
+    posicion = ((df['DateTime'] - inicio) // _HORA).to_numpy()
+    estacion = estaciones.codes
+
+    rejilla = np.full((posicion.max() + 1, len(estaciones.categories), len(contaminantes)), np.nan)
+    rejilla[posicion, estacion] = df[contaminantes].to_numpy(dtype=float)
+
+    for ventana in sorted(set(VENTANAS[c] for c in contaminantes)):
+        columnas = [i for i, c in enumerate(contaminantes) if VENTANAS[c] == ventana]
+        promedio = promedios_moviles(rejilla[:, :, columnas], ventana)
+        for j, i in enumerate(columnas):
+            resultado[INDICADORES[contaminantes[i]]] = promedio[posicion, estacion, j].astype('float32')
+    return resultado
+
+
+def agregar_indicadores(df):
+    """``df`` con las columnas de indicadores agregadas al final."""
+    indicadores = calcular(df)
+    return df.assign(**{c: indicadores[c] for c in indicadores.columns if c in INDICADORES.values()})
+
+
+def actualizar(nuevas, contexto=None):
+    """Indicadores de las filas ``nuevas`` tomando ``contexto`` como horas previas.
+
+    Devuelve ``(indicadores, contexto)``: el segundo valor son las últimas
+    ``VENTANA_MAXIMA - 1`` horas, listas para la siguiente llamada, así que
+    las horas pueden llegar en tandas sin recalcular lo anterior.
+    """
+    if contexto is not None and not contexto.empty:
+        datos = esquema.concatenar([contexto, nuevas])
+    else:
+        datos = nuevas.reset_index(drop=True)
+    indicadores = calcular(datos).iloc[len(datos) - len(nuevas):].reset_index(drop=True)
+    if datos.empty:
+        return indicadores, datos
+    limite = datos['DateTime'].max() - (VENTANA_MAXIMA - 1) * _HORA
+    return indicadores, datos[datos['DateTime'] > limite].reset_index(drop=True)
+
+
+# ============================
+# Persistencia por año
+# ============================
+
+def _leer_horas(desde, hasta):
+    """Horas limpias entre ``desde`` y ``hasta`` (días incluidos) con los contaminantes de ``VENTANAS``."""
+    return data_loader.cargar_rango(desde, hasta, columnas=list(VENTANAS))
+
+
+def _huella_origen(anio):
+    return [list(h) for h in huella_archivos(data_loader._archivos_anio(anio))]
+
+
+def _leer_persistido(anio):
+    directorio = ruta_indicadores(anio)
+    try:
+        with open(os.path.join(directorio, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        df = pd.read_parquet(os.path.join(directorio, "indicadores.parquet"))
+    except (OSError, ValueError, ImportError):
+        return None, None
+    return df, meta
+
+
+def _persistir(anio, df, meta):
+    """Escribe la tabla y al final ``meta.json``, que la marca como válida."""
+    if not columnar.HAY_PARQUET:
+        return
+    directorio = ruta_indicadores(anio)
+    try:
+        os.makedirs(directorio, exist_ok=True)
+        temporal = os.path.join(directorio, "indicadores.parquet.tmp")
+        df.to_parquet(temporal, index=False)
+        os.replace(temporal, os.path.join(directorio, "indicadores.parquet"))
+        temporal = os.path.join(directorio, "meta.json.tmp")
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(temporal, os.path.join(directorio, "meta.json"))
+    except OSError:
+        pass
+
+
+def construir_indicadores(anio):
+    """Calcula todos los indicadores de ``anio``; las ventanas de enero usan diciembre anterior."""
+    horas = _leer_horas(pd.Timestamp(anio - 1, 12, 31), pd.Timestamp(anio, 12, 31))
+    df = calcular(horas)
+    df = df[df['DateTime'].dt.year == anio].reset_index(drop=True)
+    df = esquema.quitar_estaciones_sin_datos(df)
+    meta = {'marca': str(df['DateTime'].max()), 'huella': _huella_origen(anio)}
+    _persistir(anio, df, meta)
+    return df
+
+
+def actualizar_indicadores(anio):
+    """Devuelve los indicadores de ``anio`` calculando sólo las horas nuevas.
+
+    Si no hay tabla persistida se construye completa. Las filas limpias de un
+    día antes de la marca se leen como contexto de las ventanas, y la lectura
+    termina en el último día con datos, así que una actualización diaria usa
+    el índice por día.
+    """
+    df, meta = _leer_persistido(anio)
+    if df is None:
+        return construir_indicadores(anio)
+
+    huella = _huella_origen(anio)
+    if meta['huella'] == huella:
+        return df
+
+    _, ultimo = data_loader.extension_anio(anio)
+    marca = pd.Timestamp(meta['marca'])
+    if ultimo is None:
+        return construir_indicadores(anio)
+    horas = _leer_horas(marca - pd.Timedelta(days=1), max(ultimo, marca.normalize()))
+    nuevas = horas['DateTime'] > marca
+    if nuevas.any():
+        calculados, _ = actualizar(horas[nuevas], horas[~nuevas])
+        df = esquema.concatenar([df, calculados])
+        marca = calculados['DateTime'].max()
+    _persistir(anio, df, {'marca': str(marca), 'huella': huella})
+    return df
+
+
+def _leer_vigentes(anio):
+    """Tabla persistida de ``anio`` si está al día con sus archivos limpios; si no, ``None``."""
+    df, meta = _leer_persistido(anio)
+    if df is None or meta['huella'] != _huella_origen(anio):
+        return None
+    return df
+
+
+def _calcular_rango(desde, hasta):
+    """Indicadores de ``desde`` a ``hasta`` (exclusivo) con el día previo como contexto."""
+    horas = _leer_horas(desde - pd.Timedelta(days=1), hasta - pd.Timedelta(days=1))
+    df = calcular(horas)
+    return df[(df['DateTime'] >= desde) & (df['DateTime'] < hasta)]
+
+
+def cargar_indicadores(fecha_inicio, fecha_fin, estaciones=None):
+    """Indicadores entre ``fecha_inicio`` y ``fecha_fin`` (ambas incluidas).
+
+    Cada año se toma de la tabla persistida si está al día; la caché de datos
+    la invalida cuando cambian sus archivos limpios. Si la tabla falta o quedó
+    atrás, sólo se calculan las horas pedidas: ni se reconstruye ni se escribe.
+    """
+    inicio = pd.Timestamp(fecha_inicio).normalize()
+    fin = pd.Timestamp(fecha_fin).normalize() + pd.Timedelta(days=1)
+    partes = []
+    for anio in range(inicio.year, fin.year + 1):
+        if pd.Timestamp(anio, 1, 1) >= fin or not data_loader._existe_anio(anio):
+            continue
+        df = data_loader.CACHE_DATOS.obtener_o_cargar(
+            ('indicadores', anio),
+            huella_archivos(data_loader._archivos_anio(anio)),
+            lambda anio=anio: _leer_vigentes(anio),
+            copiar=False,
+        )
+        if df is None:
+            df = _calcular_rango(max(inicio, pd.Timestamp(anio, 1, 1)), min(fin, pd.Timestamp(anio + 1, 1, 1)))
+        mascara = (df['DateTime'] >= inicio) & (df['DateTime'] < fin)
+        if estaciones is not None:
+            mascara &= df['Estacion'].isin(estaciones)
+        partes.append(df[mascara])
+    if not partes:
+        return calcular(esquema.aplicar_esquema(pd.DataFrame(columns=esquema.COLUMNAS)))
+    return esquema.quitar_estaciones_sin_datos(esquema.concatenar(partes))
+
+
+if __name__ == "__main__":
+    for anio in data_loader.anios_disponibles():
+        df = construir_indicadores(anio)
+        print(f"✅ {anio}: {len(df)} horas con indicadores")
@@ -0,0 +1,146 @@
+"""Índice por día de los CSV limpios.
+
+Para cada ``datos_Clean_{anio}.csv`` se guarda junto a él un archivo
+``datos_Clean_{anio}.idx.json`` que asocia cada fecha con los rangos de bytes
+donde están sus filas. Como los CSV están ordenados por estación, un día
+suele ocupar un rango por estación.
+
+El índice también lleva el número de filas, para que los agregados
+persistidos detecten sin leer el archivo si cambió algo más que el final.
+
+El índice se actualiza de forma incremental: si el CSV creció (por ejemplo
+tras agregar el día anterior) sólo se recorren los bytes nuevos; si el
+archivo fue reescrito, se reconstruye completo.
+"""
+import io
+import json
+import os
+import threading
+
+import pandas as pd
+
+from utils import esquema
+
+VERSION = 2
+
+_indices = {}
+_candado = threading.Lock()
+
+
+def ruta_indice(ruta_csv):
+    return os.path.splitext(ruta_csv)[0] + ".idx.json"
+
+
+def _indice_vacio(cabecera):
+    columnas = cabecera.decode("utf-8").rstrip("\r\n").split(",")
+    return {
+        "version": VERSION,
+        "cabecera": cabecera.decode("utf-8"),
+        "columna_fecha": columnas.index("DateTime"),
+        "tamano": len(cabecera),
+        "filas": 0,
+        "ultima_linea": None,
+        "dias": {},
+    }
+
+
+def _recorrer(indice, archivo, inicio):
+    """Agrega al índice las líneas completas a partir del byte ``inicio``."""
+    columna = indice["columna_fecha"]
+    dias = indice["dias"]
+    archivo.seek(inicio)
+    posicion = inicio
+    for linea in archivo:
+        if not linea.endswith(b"\n"):
+            break
+        fin = posicion + len(linea)
+        fecha = linea.split(b",")[columna][:10].decode("ascii")
+        rangos = dias.setdefault(fecha, [])
+        if rangos and rangos[-1][1] == posicion:
+            rangos[-1][1] = fin
+        else:
+            rangos.append([posicion, fin])
+        indice["ultima_linea"] = [posicion, linea.decode("utf-8")]
+        indice["filas"] += 1
+        posicion = fin
+    indice["tamano"] = posicion
+
+
+def _vigente(indice, archivo, tamano):
+    """``True`` si el archivo conserva intacta la parte ya indexada."""
+    if indice.get("version") != VERSION or tamano < indice["tamano"]:
+        return False
+    archivo.seek(0)
+    if archivo.readline().decode("utf-8") != indice["cabecera"]:
+        return False
+    if indice["ultima_linea"] is None:
+        return True
+    posicion, texto = indice["ultima_linea"]
+    archivo.seek(posicion)
+    return archivo.readline().decode("utf-8") == texto
+
+
+def _leer_persistido(ruta):
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _persistir(indice, ruta):
+    """Escribe el índice de forma atómica; si no se puede, se queda en memoria."""
+    temporal = ruta + ".tmp"
+    try:
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(indice, f)
+        os.replace(temporal, ruta)
+    except OSError:
+        pass
+
+
+def actualizar_indice(ruta_csv):
+    """Devuelve el índice de ``ruta_csv`` al día, recorriendo sólo lo nuevo."""
+    with _candado:
+        tamano = os.path.getsize(ruta_csv)
+        indice = _indices.get(ruta_csv) or _leer_persistido(ruta_indice(ruta_csv))
+        with open(ruta_csv, "rb") as archivo:
+            if indice is not None and _vigente(indice, archivo, tamano):
+                if tamano == indice["tamano"]:
+                    _indices[ruta_csv] = indice
+                    return indice
+                inicio = indice["tamano"]
+            else:
+                archivo.seek(0)
+                indice = _indice_vacio(archivo.readline())
+                inicio = indice["tamano"]
+            _recorrer(indice, archivo, inicio)
+        _persistir(indice, ruta_indice(ruta_csv))
+        _indices[ruta_csv] = indice
+        return indice
+
+
+def extension(ruta_csv):
+    """``(filas, último día)`` de ``ruta_csv`` según su índice; ``None`` como día si está vacío."""
+    indice = actualizar_indice(ruta_csv)
+    ultimo = max(indice["dias"]) if indice["dias"] else None
+    return indice["filas"], pd.Timestamp(ultimo) if ultimo else None
+
+
+def leer_dias(ruta_csv, fechas, columnas=None):
+    """Lee sólo las filas de ``fechas`` saltando directo a sus rangos de bytes."""
+    indice = actualizar_indice(ruta_csv)
+    rangos = sorted(
+        rango
+        for fecha in fechas
+        for rango in indice["dias"].get(str(pd.Timestamp(fecha).date()), [])
+    )
+
+    contenido = io.BytesIO()
+    contenido.write(indice["cabecera"].encode("utf-8"))
+    with open(ruta_csv, "rb") as archivo:
+        for inicio, fin in rangos:
+            archivo.seek(inicio)
+            contenido.write(archivo.read(fin - inicio))
+    contenido.seek(0)
+    return esquema.leer_csv(contenido, columnas)
@@ -1,3 +1,6 @@
+import numpy as np
+import pandas as pd
+
 # ==========================
 # Colores asociados por nivel
 # ==========================
@@ -24,7 +27,7 @@ def menu_contaminante(contaminante, valor_ppm):
         'PM2_5': clasificar_pm25
     }
 
-    clasificar = clasificadores.get(contaminante)
+    clasificar = clasificadores.get(contaminante_de_indicador.get(contaminante, contaminante))
     if clasificar:
         categoria, nivel = clasificar(valor_ppm)
         color = colores_por_nivel.get(nivel, "gray")
@@ -107,3 +110,85 @@ def clasificar_pm25(valor):
         return "Muy Mala", 4
     else:
         return "Extremadamente Mala", 5
+
+
+# ==========================
+# Clasificación vectorizada
+# ==========================
+
+# Límite superior (inclusivo) de los niveles 1 a 4 de cada contaminante; todo
+# valor por encima del último límite es nivel 5. Deben coincidir con las
+# funciones clasificar_* de arriba.
+limites_por_contaminante = {
+    'O3': (58, 90, 135, 175),
+    'NO2': (53, 106, 160, 213),
+    'CO': (500, 900, 1200, 1600),
+    'SO2': (35, 75, 185, 304),
+    'PM10': (45, 60, 132, 213),
+    'PM2_5': (15, 25, 79, 130),
+}
+
+# Los promedios móviles de ``utils.indicadores`` se clasifican con los límites
+# de su contaminante.
+contaminante_de_indicador = {
+    'O3_8h': 'O3',
+    'CO_8h': 'CO',
+    'SO2_24h': 'SO2',
+    'PM10_24h': 'PM10',
+    'PM2_5_24h': 'PM2_5',
+}
+limites_por_contaminante.update(
+    {indicador: limites_por_contaminante[c] for indicador, c in contaminante_de_indicador.items()}
+)
+
+categorias_por_nivel = np.array(
+    ["Desconocido", "Buena", "Aceptable", "Mala", "Muy Mala", "Extremadamente Mala"],
+    dtype=object,
+)
+colores_vector = np.array(
+    ["gray"] + [colores_por_nivel[nivel] for nivel in range(1, 6)],
+    dtype=object,
+)
+
+
+def clasificar_niveles(contaminante, valores):
+    """Nivel (1-5) de cada valor en una sola pasada con ``np.searchsorted``.
+
+    Los valores faltantes y los contaminantes desconocidos reciben nivel 0.
+    """
+    valores = np.asarray(valores, dtype=float)
+    limites = limites_por_contaminante.get(contaminante)
+    if limites is None:
+        return np.zeros(valores.shape, dtype=np.int8)
+    niveles = np.searchsorted(limites, valores, side='left').astype(np.int8) + 1
+    niveles[np.isnan(valores)] = 0
+    return niveles
+
+
+def clasificar_vectorizado(contaminante, valores):
+    """Versión vectorizada de ``menu_contaminante``.
+
+    Devuelve tres arreglos (categoría, nivel, color) con la forma de
+    ``valores``. A diferencia de las funciones escalares, un valor faltante se
+    clasifica como ``("Desconocido", 0, "gray")``.
+    """
+    niveles = clasificar_niveles(contaminante, valores)
+    return categorias_por_nivel[niveles], niveles, colores_vector[niveles]
+
+
+def clasificar_tabla(df, contaminantes=None):
+    """Clasifica un ``DataFrame`` ancho con una columna por contaminante.
+
+    Devuelve tres ``DataFrame`` (categorías, niveles, colores) con el mismo
+    índice y las columnas de ``contaminantes`` (por defecto, todas las
+    columnas de ``df`` con límites definidos).
+    """
+    if contaminantes is None:
+        contaminantes = [c for c in df.columns if c in limites_por_contaminante]
+    niveles = pd.DataFrame(
+        {c: clasificar_niveles(c, df[c].to_numpy(dtype=float)) for c in contaminantes},
+        index=df.index,
+    )
+    categorias = pd.DataFrame(categorias_por_nivel[niveles.to_numpy()], index=df.index, columns=contaminantes)
+    colores = pd.DataFrame(colores_vector[niveles.to_numpy()], index=df.index, columns=contaminantes)
+    return categorias, niveles, colores
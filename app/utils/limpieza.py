@@ -0,0 +1,279 @@
+"""Limpieza incremental de los datos crudos (``data/Crudos`` → ``data/Clean``).
+
+Reproduce los pasos de ``notebooks/01_limpieza.ipynb``:
+
+1. ``Fecha`` + ``Hora`` → ``DateTime``.
+2. Renombrar columnas (``O3 8hrs`` → ``O3_8hrs``, ``PM-10`` → ``PM10``…).
+3. Convertir contaminantes a número (``F.O.``, ``Sin dato`` → ``NaN``).
+4. Si el máximo de ``O3`` del archivo es menor que 1 (datos en ppm), pasar
+   O3, O3_8hrs, NO2 y SO2 a ppb (×1000) y CO ×100.
+5. Agregar ``Anio``, ``Mes``, ``Dia`` y ``Hora`` y aplicar el esquema.
+
+En lugar de releer el año completo, cada ``datos_Clean_{anio}.csv`` tiene junto
+a él un estado ``datos_Clean_{anio}.etl.json`` con la posición ya procesada del
+CSV crudo, la última hora limpia de cada estación y la decisión de unidades.
+Una actualización sólo lee los bytes nuevos del crudo, en bloques de tamaño
+fijo, y agrega las filas posteriores a la marca de su estación al final del
+CSV limpio. Si algo falla, el CSV limpio se recorta a su tamaño anterior.
+
+Para actualizar todos los años desde la raíz del repositorio::
+
+    PYTHONPATH=app python -m utils.limpieza
+"""
+import io
+import json
+import os
+import re
+
+import pandas as pd
+
+from utils import esquema
+
+DIR_CRUDOS = "data/Crudos"
+DIR_CLEAN = "data/Clean"
+VERSION = 1
+FILAS_POR_BLOQUE = 50_000
+
+RENOMBRAR = {
+    'O3 8hrs': 'O3_8hrs',
+    'PM-10': 'PM10',
+    'PM-2.5': 'PM2_5',
+}
+GASES_PPB = ['O3', 'O3_8hrs', 'NO2', 'SO2']
+
+
+def ruta_cruda(anio, base=None):
+    return os.path.join(base or DIR_CRUDOS, f"datos_{anio}.csv")
+
+
+def ruta_clean(anio, base=None):
+    return os.path.join(base or DIR_CLEAN, f"datos_Clean_{anio}.csv")
+
+
+def ruta_estado(ruta_csv_clean):
+    return os.path.splitext(ruta_csv_clean)[0] + ".etl.json"
+
+
+# ============================
+# Transformaciones
+# ============================
+
+def limpiar(df, escalar_ppm):
+    """Aplica los pasos del notebook a un bloque de filas crudas."""
+    df = df.copy()
+    df['DateTime'] = pd.to_datetime(df['Fecha'] + ' ' + df['Hora'], format='%Y-%m-%d %H:%M')
+    df = df.drop(columns=['Fecha', 'Hora']).rename(columns=RENOMBRAR)
+    df[esquema.CONTAMINANTES] = df[esquema.CONTAMINANTES].apply(pd.to_numeric, errors='coerce')
+    if escalar_ppm:
+        df[GASES_PPB] *= 1000
+        df['CO'] *= 100
+    df['Anio'] = df['DateTime'].dt.year
+    df['Mes'] = df['DateTime'].dt.month
+    df['Dia'] = df['DateTime'].dt.day
+    df['Hora'] = df['DateTime'].dt.hour
+    return esquema.aplicar_esquema(df)
+
+
+def requiere_escala(o3_maximo):
+    """Heurística del notebook: un máximo de O3 menor que 1 indica ppm."""
+    return bool(pd.notna(o3_maximo) and o3_maximo < 1)
+
+
+# ============================
+# Lectura por bloques del crudo
+# ============================
+
+def _bloques(ruta, inicio, filas_por_bloque):
+    """Genera ``(DataFrame, posición final, última línea)`` con las líneas completas desde ``inicio``.
+
+    Las columnas se leen como texto para que la conversión sea la del notebook.
+    """
+    with open(ruta, "rb") as archivo:
+        cabecera = archivo.readline()
+        posicion = max(inicio, len(cabecera))
+        archivo.seek(posicion)
+        lineas = []
+        for linea in archivo:
+            if not linea.endswith(b"\n"):
+                break
+            lineas.append(linea)
+            posicion += len(linea)
+            if len(lineas) == filas_por_bloque:
+                yield _leer_lineas(cabecera, lineas), posicion, lineas[-1]
+                lineas = []
+        if lineas:
+            yield _leer_lineas(cabecera, lineas), posicion, lineas[-1]
+
+
+def _leer_lineas(cabecera, lineas):
+    return pd.read_csv(io.BytesIO(cabecera + b"".join(lineas)), dtype=str, keep_default_na=False)
+
+
+def _o3_maximo(ruta):
+    maximo = float('nan')
+    for bloque in pd.read_csv(ruta, usecols=['O3'], dtype=str, chunksize=FILAS_POR_BLOQUE):
+        valor = pd.to_numeric(bloque['O3'], errors='coerce').max()
+        if pd.notna(valor):
+            maximo = valor if pd.isna(maximo) else max(maximo, valor)
+    return maximo
+
+
+# ============================
+# Estado incremental
+# ============================
+
+def _leer_estado(ruta):
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            estado = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return estado if estado.get("version") == VERSION else None
+
+
+def _guardar_estado(estado, ruta):
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(estado, f, indent=1)
+    os.replace(temporal, ruta)
+
+
+def _coincide_linea(ruta, linea):
+    """``True`` si ``ruta`` conserva ``linea`` (``[posición, texto]``) en su lugar."""
+    if linea is None:
+        return True
+    posicion, texto = linea
+    with open(ruta, "rb") as archivo:
+        archivo.seek(posicion)
+        return archivo.readline().decode("utf-8") == texto
+
+
+def _ultima_linea(ruta, tamano):
+    """``[posición, texto]`` de la última línea antes del byte ``tamano``."""
+    if tamano == 0:
+        return None
+    with open(ruta, "rb") as archivo:
+        inicio = max(0, tamano - 4096)
+        archivo.seek(inicio)
+        contenido = archivo.read(tamano - inicio)
+    corte = contenido.rfind(b"\n", 0, len(contenido) - 1) + 1
+    return [inicio + corte, contenido[corte:].decode("utf-8")]
+
+
+def _crudo_vigente(estado, ruta_crudo):
+    """``True`` si el crudo conserva intacta la parte ya procesada."""
+    if estado["posicion"] > os.path.getsize(ruta_crudo):
+        return False
+    return _coincide_linea(ruta_crudo, estado["ultima_linea"])
+
+
+def _marcas_clean(ruta_clean):
+    """Última hora limpia de cada estación según el CSV limpio."""
+    if not os.path.exists(ruta_clean):
+        return {}
+    marcas = {}
+    for bloque in pd.read_csv(ruta_clean, usecols=['Estacion', 'DateTime'], parse_dates=['DateTime'],
+                              date_format=esquema.FORMATO_FECHA, chunksize=FILAS_POR_BLOQUE):
+        for estacion, fecha in bloque.groupby('Estacion')['DateTime'].max().items():
+            if estacion not in marcas or fecha > marcas[estacion]:
+                marcas[estacion] = fecha
+    return {estacion: str(fecha) for estacion, fecha in marcas.items()}
+
+
+def _estado_inicial(ruta_crudo, ruta_clean):
+    tamano = os.path.getsize(ruta_clean) if os.path.exists(ruta_clean) else 0
+    return {
+        "version": VERSION,
+        "posicion": 0,
+        "ultima_linea": None,
+        "tamano_clean": tamano,
+        "ultima_linea_clean": _ultima_linea(ruta_clean, tamano),
+        "marcas": _marcas_clean(ruta_clean),
+        "escalar_ppm": requiere_escala(_o3_maximo(ruta_crudo)),
+    }
+
+
+def _preparar_estado(ruta_crudo, ruta_clean):
+    """Estado vigente para ``ruta_clean``, reconstruido si el limpio o el crudo cambiaron."""
+    estado = _leer_estado(ruta_estado(ruta_clean))
+    tamano_clean = os.path.getsize(ruta_clean) if os.path.exists(ruta_clean) else 0
+    if estado is not None and (tamano_clean < estado["tamano_clean"]
+                               or not _coincide_linea(ruta_clean, estado["ultima_linea_clean"])):
+        estado = None  # el limpio se regeneró por otro medio (por ejemplo, el notebook)
+    elif estado is not None and tamano_clean > estado["tamano_clean"]:
+        # Quedaron filas de una actualización interrumpida: se descartan.
+        with open(ruta_clean, "r+b") as f:
+            f.truncate(estado["tamano_clean"])
+    if estado is None:
+        return _estado_inicial(ruta_crudo, ruta_clean)
+    if not _crudo_vigente(estado, ruta_crudo):
+        # El crudo se reescribió: se recorre completo filtrando por las marcas.
+        estado.update(posicion=0, ultima_linea=None)
+    return estado
+
+
+# ============================
+# Actualización
+# ============================
+
+def _filtrar_nuevas(df, marcas):
+    """Filas posteriores a la marca de su estación (todas si la estación es nueva)."""
+    limite = pd.to_datetime(df['Estacion'].astype(str).map({e: pd.Timestamp(f) for e, f in marcas.items()}))
+    return df[limite.isna() | (df['DateTime'] > limite)]
+
+
+def actualizar_anio(anio, crudos=None, clean=None, filas_por_bloque=FILAS_POR_BLOQUE):
+    """Agrega a ``datos_Clean_{anio}.csv`` las filas crudas nuevas; devuelve cuántas."""
+    ruta_crudo, ruta_limpio = ruta_cruda(anio, crudos), ruta_clean(anio, clean)
+    estado = _preparar_estado(ruta_crudo, ruta_limpio)
+    tamano_inicial = estado["tamano_clean"]
+    marcas = dict(estado["marcas"])
+    agregadas = 0
+
+    try:
+        with open(ruta_limpio, "ab") as destino:
+            if destino.tell() == 0:
+                destino.write((",".join(esquema.COLUMNAS) + "\n").encode("utf-8"))
+            for bloque, posicion, ultima in _bloques(ruta_crudo, estado["posicion"], filas_por_bloque):
+                nuevas = _filtrar_nuevas(limpiar(bloque, estado["escalar_ppm"]), marcas)
+                if not nuevas.empty:
+                    destino.write(nuevas.to_csv(index=False, header=False).encode("utf-8"))
+                    for estacion, fecha in nuevas.groupby('Estacion', observed=True)['DateTime'].max().items():
+                        marcas[estacion] = str(fecha)
+                    agregadas += len(nuevas)
+                estado["posicion"] = posicion
+                estado["ultima_linea"] = [posicion - len(ultima), ultima.decode("utf-8")]
+            destino.flush()
+            os.fsync(destino.fileno())
+            estado["tamano_clean"] = destino.tell()
+        estado["ultima_linea_clean"] = _ultima_linea(ruta_limpio, estado["tamano_clean"])
+        estado["marcas"] = marcas
+        _guardar_estado(estado, ruta_estado(ruta_limpio))
+    except BaseException:
+        with open(ruta_limpio, "r+b") as f:
+            f.truncate(tamano_inicial)
+        raise
+    return agregadas
+
+
+def anios_crudos(crudos=None):
+    anios = []
+    for nombre in sorted(os.listdir(crudos or DIR_CRUDOS)):
+        coincidencia = re.fullmatch(r"datos_(\d{4})\.csv", nombre)
+        if coincidencia:
+            anios.append(int(coincidencia.group(1)))
+    return anios
+
+
+if __name__ == "__main__":
+    from utils import almacen, columnar
+
+    for anio in anios_crudos():
+        filas = actualizar_anio(anio)
+        print(f"✅ {anio}: {filas} filas nuevas en {ruta_clean(anio)}")
+        if filas and columnar.existe_anio(anio):
+            columnar.exportar_anio(anio)
+            print(f"✅ {anio}: particiones Parquet regeneradas en {columnar.ruta_anio(anio)}")
+        if filas and almacen.existe():
+            almacen.ingestar_anio(anio)
+            print(f"✅ {anio}: actualizado en {almacen.RUTA_DB}")
@@ -1,91 +1,133 @@
 import folium
+import pandas as pd
 import streamlit as st
+from folium.plugins import FastMarkerCluster
 from streamlit_folium import st_folium
-from utils.levels_contaminacion import menu_contaminante
-import pandas as pd
-
-
-
-# Cargar estaciones (una sola vez al inicio)
-estaciones = pd.read_csv("data/estaciones-Puebla_sinaica.csv")
-
-
-def mapa(df_media, contaminante):
-    # Crear mapa centrado en Puebla
-    m = folium.Map(location=[19.04, -98.2], zoom_start=12, control_scale=True)
-
-    for _, estacion in estaciones.iterrows():
-        lat = estacion['lat']
-        lon = estacion['long']
-        id_estacion = estacion['Estaciones']
-        nombre_estacion = estacion['nombre']
-
-        # Validar existencia del contaminante en la estación
-        if id_estacion not in df_media.index or contaminante not in df_media.columns:
-            continue
-
-        valor_ppm = df_media.loc[id_estacion, contaminante]
-
-        if pd.isna(valor_ppm):
-            calidad, nivel, color = "", "", "gray"
-            popup_html = f"""
-            <div style="font-size: 14px">
-                <b>Estación:</b> {nombre_estacion}<br>
-                <b>Contaminante:</b> {contaminante}<br>
-                <b>Valor:</b> No se obtuvo información<br>
-            </div>
-            """
-
-            # Círculo con color según calidad
-            folium.CircleMarker(
-                location=(lat, lon),
-                radius=25,
-                color=color,
-                fill=True,
-                fill_color=color,
-                fill_opacity=0.8,
-                popup=folium.Popup(popup_html, max_width=300),
-                tooltip=f"{nombre_estacion} - {calidad}"
-            ).add_to(m)
-
-            # Marcador opcional (puedes quitar si ya se entiende con el círculo)
-            folium.Marker(
-                location=(lat, lon),
-                icon=folium.Icon(color="blue", icon="info-sign"),
-                popup=nombre_estacion
-            ).add_to(m)
-            continue
-
-        calidad, nivel, color = menu_contaminante(contaminante, valor_ppm)
-
-        # Texto detallado del popup
-        popup_html = f"""
-        <div style="font-size: 14px">
-            <b>Estación:</b> {nombre_estacion}<br>
-            <b>Contaminante:</b> {contaminante}<br>
-            <b>Valor:</b> {valor_ppm:.3f} ppm<br>
-            <b>Calidad:</b> {calidad} (Nivel {nivel})
-        </div>
-        """
-
-        # Círculo con color según calidad
-        folium.CircleMarker(
-            location=(lat, lon),
-            radius=25,
-            color=color,
-            fill=True,
-            fill_color=color,
-            fill_opacity=0.8,
-            popup=folium.Popup(popup_html, max_width=300),
-            tooltip=f"{nombre_estacion} - {calidad}"
-        ).add_to(m)
-
-        # Marcador opcional (puedes quitar si ya se entiende con el círculo)
-        folium.Marker(
-            location=(lat, lon),
-            icon=folium.Icon(color="blue", icon="info-sign"),
-            popup=nombre_estacion
-        ).add_to(m)
+from utils.diagnostico import medido, span
+from utils.estaciones import catalogo
+from utils.levels_contaminacion import clasificar_vectorizado
+
+CLAVE_MAPA = "mapa_estaciones"
+
+# A partir de cuántas estaciones se agrupan los marcadores. Agrupadas, cada
+# estación viaja como una fila de datos y el navegador crea sólo los
+# marcadores visibles en el encuadre actual.
+UMBRAL_AGRUPAR = 50
+
+# Crea cada marcador a partir de su fila ``[lat, long, color, nombre, valor, calidad]``;
+# la ventana emergente se arma hasta que se abre.
+_CREAR_MARCADOR = """function (fila) {
+    var marcador = L.circleMarker(new L.LatLng(fila[0], fila[1]),
+        {radius: 10, color: fila[2], fillColor: fila[2], fillOpacity: 0.8});
+    marcador.bindTooltip(fila[3] + " - " + fila[5]);
+    marcador.bindPopup(function () {
+        return "<b>" + fila[3] + "</b><br>" + fila[4] + "<br>" + fila[5];
+    });
+    return marcador;
+}"""
+
+
+def mapa_base():
+    """Mapa sin capas de datos (mosaicos y controles).
+
+    Su código Leaflet es idéntico en cada ejecución, así que ``st_folium``
+    conserva el mapa ya dibujado en el navegador y sólo reemplaza la capa de
+    estaciones. No se memoriza el objeto porque ``st_folium`` le agrega la capa.
+    """
+    return folium.Map(location=[19.04, -98.2], zoom_start=12, control_scale=True)
+
+
+def _propiedades(df_media, contaminante):
+    """``(clave, propiedades)`` de cada estación del catálogo presente en ``df_media``."""
+    if contaminante not in df_media.columns:
+        return []
+
+    estaciones = catalogo()
+    ids = [e for e in df_media.index if e in estaciones]
+    valores = df_media.loc[ids, contaminante].to_numpy(dtype=float)
+    calidades, niveles, colores = clasificar_vectorizado(contaminante, valores)
+
+    propiedades = []
+    for id_estacion, valor, calidad, nivel, color in zip(ids, valores, calidades, niveles, colores):
+        sin_dato = pd.isna(valor)
+        nombre = estaciones.nombre(id_estacion)
+        propiedades.append((id_estacion, {
+            "nombre": nombre,
+            "contaminante": contaminante,
+            "valor": "No se obtuvo información" if sin_dato else f"{valor:.3f} ppm",
+            "calidad": "" if sin_dato else f"{calidad} (Nivel {nivel})",
+            "etiqueta": f"{nombre} - {'' if sin_dato else calidad}",
+            "color": "gray" if sin_dato else color,
+        }))
+    return propiedades
+
+
+@medido()
+def capa_estaciones(df_media, contaminante):
+    """``FeatureCollection`` con el valor y la calidad de cada estación."""
+    estaciones = catalogo()
+    features = [
+        {"type": "Feature", "geometry": estaciones.geometria(id_estacion), "properties": propiedades}
+        for id_estacion, propiedades in _propiedades(df_media, contaminante)
+    ]
+    return {"type": "FeatureCollection", "features": features}
+
+
+@medido()
+def filas_agrupadas(df_media, contaminante):
+    """Una fila ``[lat, long, color, nombre, valor, calidad]`` por estación, para ``FastMarkerCluster``."""
+    estaciones = catalogo()
+    return [
+        [*estaciones.coordenadas(id_estacion), p["color"], p["nombre"], p["valor"], p["calidad"]]
+        for id_estacion, p in _propiedades(df_media, contaminante)
+    ]
+
+
+def _estilo(feature):
+    color = feature['properties']['color']
+    return {"color": color, "fillColor": color, "fillOpacity": 0.8}
+
+
+@medido()
+def mapa(df_media, contaminante, agrupar=None):
+    """Dibuja las estaciones coloreadas por calidad del aire.
+
+    Con más de ``UMBRAL_AGRUPAR`` estaciones (o ``agrupar=True``) los
+    marcadores se agrupan con ``FastMarkerCluster``: se envían sólo los datos
+    de cada estación y el navegador dibuja los grupos y los marcadores del
+    encuadre visible.
+    """
+    if agrupar is None:
+        agrupar = len(df_media.index) > UMBRAL_AGRUPAR
+
+    capa = folium.FeatureGroup(name="Estaciones")
+    if agrupar:
+        FastMarkerCluster(
+            filas_agrupadas(df_media, contaminante),
+            callback=_CREAR_MARCADOR,
+            chunkedLoading=True,
+            removeOutsideVisibleBounds=True,
+        ).add_to(capa)
+    else:
+        folium.GeoJson(
+            capa_estaciones(df_media, contaminante),
+            marker=folium.CircleMarker(radius=25, fill=True),
+            style_function=_estilo,
+            popup=folium.GeoJsonPopup(
+                fields=["nombre", "contaminante", "valor", "calidad"],
+                aliases=["Estación:", "Contaminante:", "Valor:", "Calidad:"],
+                max_width=300,
+            ),
+            tooltip=folium.GeoJsonTooltip(fields=["etiqueta"], labels=False),
+        ).add_to(capa)
 
     # Mostrar en Streamlit
-    return st_folium(m, width="100%", height=550)
+    with span("mapa.st_folium"):
+        return st_folium(
+            mapa_base(),
+            key=CLAVE_MAPA,
+            feature_group_to_add=capa,
+            use_container_width=True,
+            height=550,
+            returned_objects=[],
+        )
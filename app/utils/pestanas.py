@@ -0,0 +1,24 @@
+"""Pestañas que sólo ejecutan la vista seleccionada.
+
+``st.tabs`` ejecuta el cuerpo de todas las pestañas en cada interacción
+aunque sólo se vea una. ``pestana_activa`` dibuja en su lugar un selector
+horizontal y devuelve el nombre elegido, para que la página ejecute
+únicamente esa rama::
+
+    vista = pestana_activa(["📈 Línea", "📊 Barras"], "vista_mes")
+    if vista == "📈 Línea":
+        ...
+
+La selección vive en ``st.session_state`` bajo ``clave``, así que se conserva
+entre ejecuciones. Las gráficas ya dibujadas se reutilizan desde la caché de
+``utils.figuras`` al volver a una pestaña.
+"""
+import streamlit as st
+
+
+def pestana_activa(nombres, clave):
+    """Selector horizontal de pestañas; devuelve el nombre seleccionado."""
+    nombres = list(nombres)
+    if st.session_state.get(clave) not in nombres:
+        st.session_state.pop(clave, None)
+    return st.radio("Vista", nombres, horizontal=True, key=clave, label_visibility="collapsed")
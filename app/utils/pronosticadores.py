@@ -0,0 +1,258 @@
+"""Pronosticadores de referencia vectorizados para toda la red.
+
+Todas las series estación × contaminante se colocan en un tensor
+``(hora, estación, contaminante)`` sobre una rejilla horaria completa (como
+en ``utils.indicadores``) y se pronostican a la vez:
+
+* ``ingenuo_estacional``: repite el último día (o semana) observado.
+* ``suavizamiento_estacional``: suavizamiento exponencial con estacionalidad
+  diaria y semanal (Holt-Winters aditivo de doble estacionalidad, sin
+  tendencia). El único bucle de Python recorre las horas; en cada paso se
+  actualizan todas las series y todas las combinaciones de constantes de
+  ``REJILLA_SUAVIZAMIENTO``, y cada serie se queda con la de menor error a un
+  paso.
+* ``ridge_rezagos``: regresión ridge sobre rezagos (1, 2, 3, 24, 48 y 168
+  horas) con un sistema normal por serie, resuelto en lote con
+  ``np.linalg.solve``, y pronóstico recursivo.
+
+Los métodos reciben el tensor con ``NaN`` en las horas sin dato y devuelven
+un arreglo ``(horizonte, estación, contaminante)``. Con menos de un día de
+historia pronostican la media de cada serie. ``pronosticar`` agrega
+un intervalo a partir del error de cada serie en las últimas ``horizonte``
+horas, y ``a_tabla`` lo convierte al esquema de
+``data_loader.COLUMNAS_PRONOSTICOS``. Sirven como referencia rápida y como
+respaldo de los SARIMAX de ``notebooks/modelado``.
+"""
+import itertools
+import warnings
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from utils import esquema
+
+DIA = 24
+SEMANA = 7 * DIA
+REZAGOS = (1, 2, 3, DIA, 2 * DIA, SEMANA)
+COBERTURA_MINIMA = 0.5
+# (alfa, delta, omega): nivel, estacionalidad diaria y semanal.
+REJILLA_SUAVIZAMIENTO = list(itertools.product([0.05, 0.2, 0.5], [0.05, 0.2], [0.0, 0.1]))
+
+_HORA = pd.Timedelta(hours=1)
+
+
+# ============================
+# Tensor de series
+# ============================
+
+def tensor_horario(df, contaminantes=None):
+    """``(valores, horas, estaciones, contaminantes)`` de las filas limpias de ``df``.
+
+    ``valores`` tiene forma ``(hora, estación, contaminante)`` y ``NaN`` en
+    las horas sin dato; ``horas`` es la rejilla horaria completa.
+    """
+    contaminantes = [c for c in (contaminantes or esquema.CONTAMINANTES) if c in df.columns]
+    if df.empty:
+        return np.empty((0, 0, len(contaminantes))), pd.DatetimeIndex([]), [], contaminantes
+    estaciones = pd.Categorical(df['Estacion'].astype(str))
+    inicio = df['DateTime'].min()
+    posicion = ((df['DateTime'] - inicio) // _HORA).to_numpy()
+    valores = np.full((posicion.max() + 1, len(estaciones.categories), len(contaminantes)), np.nan)
+    valores[posicion, estaciones.codes] = df[contaminantes].to_numpy(dtype=float)
+    horas = pd.date_range(inicio, periods=len(valores), freq='h')
+    return valores, horas, list(estaciones.categories), contaminantes
+
+
+def rellenar(valores):
+    """Arrastra el último valor observado sobre el eje 0; lo que queda al inicio toma la media."""
+    faltantes = np.isnan(valores)
+    indice = np.where(~faltantes, np.arange(len(valores)).reshape((-1,) + (1,) * (valores.ndim - 1)), 0)
+    np.maximum.accumulate(indice, axis=0, out=indice)
+    relleno = np.take_along_axis(valores, indice, axis=0)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # series sin ningún dato
+        media = np.nanmean(valores, axis=0)
+    relleno = np.where(np.isnan(relleno), np.nan_to_num(media), relleno)
+    return relleno
+
+
+def _media(valores, horizonte):
+    """Pronóstico plano con la media de cada serie, para historias demasiado cortas."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # series sin ningún dato
+        media = np.nan_to_num(np.nanmean(valores, axis=0))
+    return np.repeat(media[None], horizonte, axis=0)
+
+
+def _plano(valores):
+    """``(hora, serie)``: las dimensiones de estación y contaminante se aplanan."""
+    return valores.reshape(len(valores), -1)
+
+
+# ============================
+# Métodos
+# ============================
+
+def ingenuo_estacional(valores, horizonte, periodo=DIA):
+    """Cada hora futura repite la misma hora del último ``periodo`` observado."""
+    if len(valores) < periodo:
+        return _media(valores, horizonte)
+    relleno = rellenar(valores)
+    fase = np.arange(horizonte) % periodo
+    return relleno[len(relleno) - periodo + fase]
+
+
+def suavizamiento_estacional(valores, horizonte, rejilla=None, periodos=(DIA, SEMANA)):
+    """Holt-Winters aditivo con estacionalidad diaria y semanal, para todas las series a la vez.
+
+    Las horas sin dato no corrigen el estado. La estacionalidad semanal se usa
+    sólo si hay al menos dos semanas de historia.
+    """
+    dia, semana = periodos
+    if len(valores) < dia:
+        return _media(valores, horizonte)
+    rejilla = np.asarray(rejilla if rejilla is not None else REJILLA_SUAVIZAMIENTO, dtype=float)
+    forma = valores.shape[1:]
+    y = _plano(valores)
+    t, n = y.shape
+    usar_semana = t >= 2 * semana
+    alfa, delta, omega = rejilla[:, 0], rejilla[:, 1], rejilla[:, 2] * usar_semana
+
+    # Estado inicial con el primer ciclo: nivel medio y desviaciones por hora.
+    relleno = rellenar(valores).reshape(t, n)
+    ciclo = semana if usar_semana else dia
+    nivel = relleno[:ciclo].mean(axis=0)
+    diaria = relleno[:ciclo].reshape(-1, dia, n).mean(axis=0) - nivel
+    semanal = np.zeros((semana, n))
+    if usar_semana:
+        semanal = relleno[:semana] - nivel - np.tile(diaria, (semana // dia, 1))
+
+    k = len(rejilla)
+    nivel = np.repeat(nivel[:, None], k, axis=1)
+    diaria = np.repeat(diaria[:, :, None], k, axis=2)
+    semanal = np.repeat(semanal[:, :, None], k, axis=2)
+    sse = np.zeros((n, k))
+    for i in range(t):
+        d, w = i % dia, i % semana
+        ajuste = nivel + diaria[d] + semanal[w]
+        error = y[i][:, None] - ajuste
+        observado = ~np.isnan(error)
+        error = np.where(observado, error, 0.0)
+        sse += error ** 2
+        nivel = nivel + alfa * error
+        diaria[d] += delta * (1 - alfa) * error
+        semanal[w] += omega * (1 - alfa) * error
+
+    mejor = np.argmin(sse, axis=1)
+    serie = np.arange(n)
+    futuro = np.arange(t, t + horizonte)
+    pronostico = nivel[serie, mejor] + diaria[futuro % dia][:, serie, mejor] + semanal[futuro % semana][:, serie, mejor]
+    return pronostico.reshape((horizonte,) + forma)
+
+
+def _rezagos(relleno, fin, rezagos):
+    """Matriz ``(serie, fila, 1 + rezagos)`` con intercepto para las horas ``fin``."""
+    columnas = [np.ones((len(fin), relleno.shape[1]))] + [relleno[fin - r] for r in rezagos]
+    return np.stack(columnas, axis=-1).transpose(1, 0, 2)
+
+
+def ridge_rezagos(valores, horizonte, rezagos=REZAGOS, penalizacion=0.01):
+    """Ridge sobre rezagos con un sistema normal por serie, resuelto en lote; pronóstico recursivo.
+
+    ``penalizacion`` es el castigo por fila de entrenamiento. El intercepto
+    apenas se castiga, lo justo para que una serie sin datos no deje el
+    sistema singular (su pronóstico queda en la media).
+    """
+    if len(valores) < DIA:
+        return _media(valores, horizonte)
+    rezagos = [r for r in rezagos if r < len(valores)]
+    forma = valores.shape[1:]
+    y = _plano(valores)
+    relleno = _plano(rellenar(valores))
+    t, n = y.shape
+    maximo = max(rezagos)
+
+    # Centrado por serie para que el intercepto no dependa de la escala.
+    media = relleno.mean(axis=0)
+    relleno = relleno - media
+    filas = np.arange(maximo, t)
+    x = _rezagos(relleno, filas, rezagos)                      # (n, filas, p)
+    objetivo = (y[filas] - media).T                            # (n, filas)
+    peso = (~np.isnan(objetivo)).astype(float)
+    objetivo = np.nan_to_num(objetivo)
+
+    p = x.shape[-1]
+    castigo = penalizacion * len(filas) * np.eye(p)
+    castigo[0, 0] = 1e-9
+    ponderada = x * peso[..., None]
+    xtx = np.matmul(ponderada.transpose(0, 2, 1), x) + castigo
+    xty = np.matmul(ponderada.transpose(0, 2, 1), objetivo[..., None])[..., 0]
+    coeficientes = np.linalg.solve(xtx, xty[..., None])[..., 0]  # (n, p)
+
+    historia = np.concatenate([relleno, np.zeros((horizonte, n))])
+    posiciones = np.asarray(rezagos)
+    for h in range(t, t + horizonte):
+        historia[h] = coeficientes[:, 0] + np.einsum('rn,nr->n', historia[h - posiciones], coeficientes[:, 1:])
+    return (historia[t:] + media).reshape((horizonte,) + forma)
+
+
+METODOS = {
+    'ingenuo_estacional': ingenuo_estacional,
+    'suavizamiento': suavizamiento_estacional,
+    'ridge': ridge_rezagos,
+}
+
+
+# ============================
+# Pronóstico con intervalo
+# ============================
+
+def pronosticar(valores, horizonte, metodo='suavizamiento', nivel=0.9, **opciones):
+    """``(pronóstico, inferior, superior)``, cada uno ``(horizonte, estación, contaminante)``.
+
+    El ancho del intervalo sale del error cuadrático medio de cada serie al
+    pronosticar sus últimas ``horizonte`` horas con el mismo método; las
+    concentraciones se recortan en cero.
+    """
+    funcion = METODOS[metodo]
+    pronostico = funcion(valores, horizonte, **opciones)
+    if len(valores) > 2 * horizonte:
+        prueba = funcion(valores[:-horizonte], horizonte, **opciones)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            rmse = np.sqrt(np.nanmean((valores[-horizonte:] - prueba) ** 2, axis=0))
+    else:
+        rmse = np.full(valores.shape[1:], np.nan)
+    # Sin error medible se usa la dispersión de la serie.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        rmse = np.where(np.isnan(rmse), np.nan_to_num(np.nanstd(valores, axis=0)), rmse)
+    margen = NormalDist().inv_cdf(0.5 + nivel / 2) * rmse
+    return (np.clip(pronostico, 0, None), np.clip(pronostico - margen, 0, None),
+            np.clip(pronostico + margen, 0, None))
+
+
+def a_tabla(pronostico, inferior, superior, valores, horas, estaciones, contaminantes, modelo,
+            cobertura_minima=COBERTURA_MINIMA):
+    """Filas con el esquema de ``data_loader.COLUMNAS_PRONOSTICOS``.
+
+    Se omiten las series con menos de ``cobertura_minima`` horas observadas.
+    """
+    horizonte = len(pronostico)
+    origen = horas[-1]
+    cobertura = (~np.isnan(valores)).mean(axis=0)
+    e, c = np.nonzero(cobertura >= cobertura_minima)
+    fechas = pd.date_range(origen + _HORA, periods=horizonte, freq='h')
+    df = pd.DataFrame({
+        'Estacion': np.repeat(np.asarray(estaciones, dtype=object)[e], horizonte),
+        'Contaminante': np.repeat(np.asarray(contaminantes, dtype=object)[c], horizonte),
+        'DateTime': np.tile(fechas, len(e)),
+        'horizonte': np.tile(np.arange(1, horizonte + 1, dtype='int16'), len(e)),
+        'pronostico': pronostico[:, e, c].T.ravel().astype('float32'),
+        'inferior': inferior[:, e, c].T.ravel().astype('float32'),
+        'superior': superior[:, e, c].T.ravel().astype('float32'),
+        'modelo': modelo,
+        'origen': origen,
+    })
+    return df.astype({'Estacion': 'category', 'Contaminante': 'category', 'modelo': 'category'})
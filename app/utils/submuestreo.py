@@ -0,0 +1,100 @@
+"""Submuestreo de series de tiempo largas para graficar.
+
+Una gráfica de 12 pulgadas no puede mostrar más de unos cientos de puntos
+distintos por línea, pero un año de datos horarios tiene 8,760. ``submuestrear``
+reduce cada serie a un presupuesto de puntos fijo, de modo que el costo de
+dibujo no depende del rango de fechas elegido:
+
+* ``"minmax"`` (por defecto) conserva en cada intervalo el mínimo y el máximo,
+  así que ningún pico ni excedencia desaparece de la gráfica.
+* ``"lttb"`` (*Largest-Triangle-Three-Buckets*) elige en cada intervalo el
+  punto que forma el triángulo de mayor área con sus vecinos; conserva mejor
+  la forma visual, aunque puede omitir algún pico aislado.
+
+El presupuesto por serie se ajusta con la variable de entorno
+``CALIDAD_AIRE_PUNTOS_SERIE`` (1000 por defecto).
+"""
+import os
+
+import numpy as np
+
+PUNTOS_POR_SERIE = int(os.environ.get("CALIDAD_AIRE_PUNTOS_SERIE", "1000"))
+
+
+def _como_numero(x):
+    """Eje x como ``float64`` (las fechas pasan a nanosegundos)."""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').astype('int64').astype('float64')
+    return x.astype('float64')
+
+
+def indices_minmax(y, puntos):
+    """Posiciones del mínimo y máximo de cada intervalo, en orden.
+
+    Se usan ``(puntos - 2) // 2`` intervalos de igual número de muestras, más
+    el primer y el último punto. Los intervalos sin datos válidos conservan una
+    muestra ``NaN`` para que la línea siga mostrando el hueco.
+    """
+    y = np.asarray(y, dtype='float64')
+    n = len(y)
+    if n <= puntos:
+        return np.arange(n)
+    indices = [0, n - 1]
+    for intervalo in np.array_split(np.arange(n), max((puntos - 2) // 2, 1)):
+        valores = y[intervalo]
+        validos = ~np.isnan(valores)
+        if not validos.any():
+            indices.append(intervalo[0])
+            continue
+        indices.append(intervalo[np.nanargmin(valores)])
+        indices.append(intervalo[np.nanargmax(valores)])
+    return np.unique(indices)
+
+
+def indices_lttb(x, y, puntos):
+    """Posiciones elegidas por *Largest-Triangle-Three-Buckets*.
+
+    Se conservan siempre el primer y el último punto; los ``NaN`` se omiten.
+    """
+    x = _como_numero(x)
+    y = np.asarray(y, dtype='float64')
+    posiciones = np.flatnonzero(~np.isnan(y))
+    n = len(posiciones)
+    if n <= puntos or puntos < 3:
+        return posiciones
+    x, y = x[posiciones], y[posiciones]
+
+    limites = np.linspace(1, n - 1, puntos - 1).astype(int)
+    elegidos = np.empty(puntos, dtype=int)
+    elegidos[0], elegidos[-1] = 0, n - 1
+    anterior = 0
+    for i in range(puntos - 2):
+        inicio, fin = limites[i], limites[i + 1]
+        # Promedio del intervalo siguiente (o el último punto).
+        siguiente = slice(fin, limites[i + 2]) if i + 2 < len(limites) else slice(n - 1, n)
+        x_sig, y_sig = x[siguiente].mean(), y[siguiente].mean()
+        areas = np.abs(
+            (x[anterior] - x_sig) * (y[inicio:fin] - y[anterior])
+            - (x[anterior] - x[inicio:fin]) * (y_sig - y[anterior])
+        )
+        anterior = inicio + int(np.argmax(areas))
+        elegidos[i + 1] = anterior
+    return posiciones[elegidos]
+
+
+def submuestrear(serie, puntos=None, metodo="minmax"):
+    """Reduce una ``Series`` indexada por el eje x a lo sumo a ``puntos`` valores.
+
+    Si la serie ya cabe en el presupuesto se devuelve sin cambios.
+    """
+    puntos = puntos or PUNTOS_POR_SERIE
+    if len(serie) <= puntos:
+        return serie
+    if metodo == "minmax":
+        indices = indices_minmax(serie.to_numpy(dtype='float64', na_value=np.nan), puntos)
+    elif metodo == "lttb":
+        indices = indices_lttb(serie.index, serie.to_numpy(dtype='float64', na_value=np.nan), puntos)
+    else:
+        raise ValueError(f"Método de submuestreo desconocido: {metodo}")
+    return serie.iloc[indices]
@@ -0,0 +1,55 @@
+"""Compara dos archivos de resultados de ``ejecutar.py``.
+
+Empareja los casos por ``(caso, estaciones, anios)`` y muestra la razón
+``nuevo / base`` de la mediana; las razones por encima de ``--umbral`` se
+marcan como regresiones y hacen que el proceso termine con código 1.
+
+Uso::
+
+    python benchmarks/comparar.py base.json nuevo.json --umbral 1.2
+"""
+import argparse
+import json
+import sys
+
+
+def _indexar(ruta):
+    with open(ruta, encoding="utf-8") as f:
+        datos = json.load(f)
+    return datos, {(r['caso'], r['estaciones'], r['anios']): r for r in datos['resultados']}
+
+
+def comparar(base, nuevo, umbral=1.2):
+    """Filas ``(clave, mediana base, mediana nueva, razón)`` de los casos comunes y las regresiones."""
+    filas, regresiones = [], []
+    for clave, resultado in nuevo.items():
+        if clave not in base:
+            continue
+        razon = resultado['mediana_s'] / base[clave]['mediana_s'] if base[clave]['mediana_s'] else float('inf')
+        filas.append((clave, base[clave]['mediana_s'], resultado['mediana_s'], razon))
+        if razon > umbral:
+            regresiones.append(clave)
+    return filas, regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara dos corridas de benchmarks.")
+    parser.add_argument('base')
+    parser.add_argument('nuevo')
+    parser.add_argument('--umbral', type=float, default=1.2, help="Razón a partir de la cual hay regresión")
+    args = parser.parse_args()
+
+    datos_base, base = _indexar(args.base)
+    datos_nuevo, nuevo = _indexar(args.nuevo)
+    print(f"Base: {datos_base['commit']}  Nuevo: {datos_nuevo['commit']}\n")
+    filas, regresiones = comparar(base, nuevo, args.umbral)
+    for (caso, estaciones, anios), antes, despues, razon in filas:
+        marca = "⚠️" if (caso, estaciones, anios) in regresiones else "  "
+        print(f"{marca} {caso:<45} {estaciones:>4}×{anios:<2} {antes * 1000:10.2f} → {despues * 1000:10.2f} ms  ×{razon:.2f}")
+    if regresiones:
+        print(f"\n⚠️ {len(regresiones)} regresiones por encima de ×{args.umbral}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+"""Micro-benchmarks de cargadores, gráficas, clasificación, mapa y pronosticadores.
+
+Para cada escenario (``N`` estaciones × ``M`` años) se generan datos
+sintéticos en un directorio temporal con ``sinteticos.py``, se redirigen a
+él todos los directorios de datos de ``app/utils`` y se mide cada caso
+``--repeticiones`` veces con ``time.perf_counter``. Los resultados se
+escriben en JSON junto con el commit, para compararlos con ``comparar.py``.
+
+Uso, desde la raíz del repositorio::
+
+    python benchmarks/ejecutar.py --estaciones 5 20 --anios 1 3
+    python benchmarks/comparar.py benchmarks/resultados/<base>.json benchmarks/resultados/<nuevo>.json
+"""
+import argparse
+import inspect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(RAIZ, "app"))
+os.chdir(RAIZ)  # utils.mapa lee data/estaciones-Puebla_sinaica.csv con ruta relativa
+
+import folium  # noqa: E402
+from folium.plugins import FastMarkerCluster  # noqa: E402
+
+import sinteticos  # noqa: E402
+from utils import agregados, alertas, almacen, columnar, data_loader, figuras, graficos, indicadores, mapa  # noqa: E402
+from utils import pronosticadores  # noqa: E402
+from utils import estaciones as registro  # noqa: E402
+from utils.levels_contaminacion import clasificar_vectorizado, menu_contaminante  # noqa: E402
+
+DIR_RESULTADOS = os.path.join(RAIZ, "benchmarks", "resultados")
+CONTAMINANTE = 'PM10'
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def medir(funcion, repeticiones, preparar=None):
+    """Tiempos (s) de ``repeticiones`` llamadas; ``preparar`` corre antes de cada una sin medirse."""
+    tiempos = []
+    for _ in range(repeticiones):
+        if preparar is not None:
+            preparar()
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+        if isinstance(resultado, plt.Figure):
+            plt.close(resultado)
+    return tiempos
+
+
+def redirigir_datos(directorio):
+    """Apunta los directorios de datos de ``app/utils`` a ``directorio``."""
+    data_loader.DIR_CLEAN = os.path.join(directorio, "Clean")
+    columnar.DIR_COLUMNAR = os.path.join(directorio, "Columnar")
+    almacen.RUTA_DB = os.path.join(directorio, "calidad_aire.sqlite")
+    agregados.DIR_AGREGADOS = os.path.join(directorio, "Agregados")
+    indicadores.DIR_INDICADORES = os.path.join(directorio, "Indicadores")
+    alertas.DIR_ALERTAS = os.path.join(directorio, "Alertas")
+    registro.RUTA_CATALOGO = os.path.join(directorio, "estaciones.csv")
+    data_loader.CACHE_DATOS.limpiar()
+
+
+def _figura(funcion, *args):
+    """Construye la figura y la rasteriza a PNG, sin la caché de PNG ni Streamlit.
+
+    Es el trabajo de un fallo de ``CACHE_FIGURAS``: dibujar y ``savefig``.
+    """
+    return lambda: figuras.a_png(
+        inspect.unwrap(funcion)(*[a.copy() if isinstance(a, pd.DataFrame) else a for a in args]))
+
+
+def casos(estaciones):
+    """``(nombre, funcion, preparar)`` de cada caso sobre los datos ya generados."""
+    frio = data_loader.CACHE_DATOS.limpiar
+    anios = data_loader.anios_disponibles()
+    ultimo = anios[-1]
+
+    yield "cargar_datos_por_anio/frio", lambda: data_loader.cargar_datos_por_anio(ultimo), frio
+    yield "cargar_datos_por_anio/cache", lambda: data_loader.cargar_datos_por_anio(ultimo), None
+    yield "cargar_datos_dia_anterior/frio", data_loader.cargar_datos_dia_anterior, frio
+    yield "cargar_datos_dia_anterior/cache", data_loader.cargar_datos_dia_anterior, None
+    yield "cargar_rango/anios_completos/frio", lambda: data_loader.cargar_rango(
+        f"{anios[0]}-01-01", f"{ultimo}-12-31", columnas=[CONTAMINANTE]), frio
+
+    df_anio = data_loader.cargar_datos_por_anio(ultimo)
+    df_dia = data_loader.cargar_datos_dia_anterior()
+    df_mes = df_anio[df_anio['Mes'] == 1]
+    seleccion = list(estaciones)
+    cubo = agregados.cargar_cubo([ultimo])
+
+    yield "graficos/concentracion_horaria", _figura(graficos.concentracion_horaria, df_dia, CONTAMINANTE), None
+    yield "graficos/concentracion_horaria_heatmap", _figura(
+        graficos.concentracion_horaria_heatmap, df_dia, CONTAMINANTE), None
+    yield "graficos/area_horaria_estacion", _figura(graficos.area_horaria_estacion, df_dia, CONTAMINANTE), None
+    yield "graficos/evolucion_promedio", _figura(graficos.evolucion_promedio, df_anio, CONTAMINANTE, seleccion), None
+    yield "graficos/boxplot", _figura(graficos.boxplot, df_anio, CONTAMINANTE, seleccion), None
+    yield "graficos/barras_promedio/filas", _figura(
+        graficos.barras_promedio, df_anio, CONTAMINANTE, seleccion), None
+    yield "graficos/barras_promedio/cubo", _figura(
+        graficos.barras_promedio, df_anio, CONTAMINANTE, seleccion, cubo), None
+    yield "graficos/concentracion_diaria_por_mes/filas", _figura(
+        graficos.concentracion_diaria_por_mes, df_mes, CONTAMINANTE, seleccion, 1), None
+    yield "graficos/concentracion_diaria_por_mes/cubo", _figura(
+        graficos.concentracion_diaria_por_mes, df_mes, CONTAMINANTE, seleccion, 1,
+        cubo.filtrar(None, f"{ultimo}-01-01", f"{ultimo}-01-31")), None
+
+    valores = df_anio[CONTAMINANTE].dropna().to_numpy(dtype=float)
+    yield "clasificacion/menu_contaminante", lambda: [menu_contaminante(CONTAMINANTE, v) for v in valores], None
+    yield "clasificacion/vectorizada", lambda: clasificar_vectorizado(CONTAMINANTE, valores), None
+    yield "indicadores/calcular", lambda: indicadores.calcular(df_anio), None
+
+    media = df_dia.groupby('Estacion', observed=True)[list(sinteticos.ESCALAS)].mean()
+
+    def construir_mapa():
+        capa = folium.GeoJson(mapa.capa_estaciones(media, CONTAMINANTE), style_function=mapa._estilo,
+                              marker=folium.CircleMarker(radius=25))
+        base = mapa.mapa_base()
+        capa.add_to(base)
+        return base.get_root().render()
+
+    def construir_mapa_agrupado():
+        base = mapa.mapa_base()
+        FastMarkerCluster(mapa.filas_agrupadas(media, CONTAMINANTE), callback=mapa._CREAR_MARCADOR).add_to(base)
+        return base.get_root().render()
+
+    yield "mapa/capa_y_render", construir_mapa, None
+    yield "mapa/agrupado_y_render", construir_mapa_agrupado, None
+
+    # Últimos 60 días de toda la red, pronosticados a 7 días.
+    recientes = df_anio[df_anio['DateTime'] >= df_anio['DateTime'].max() - pd.Timedelta(days=60)]
+    tensor = pronosticadores.tensor_horario(recientes)[0]
+    for metodo in pronosticadores.METODOS:
+        yield f"pronosticadores/{metodo}", lambda metodo=metodo: pronosticadores.pronosticar(tensor, 168, metodo), None
+
+
+def ejecutar_escenario(estaciones, anios, repeticiones):
+    with tempfile.TemporaryDirectory() as directorio:
+        filas = sinteticos.generar_clean(os.path.join(directorio, "Clean"), estaciones, anios)
+        redirigir_datos(directorio)
+        sinteticos.estaciones_sinteticas(estaciones).to_csv(registro.RUTA_CATALOGO, index=False)
+
+        resultados = []
+        for nombre, funcion, preparar in casos(sinteticos.nombres_estaciones(estaciones)):
+            tiempos = medir(funcion, repeticiones, preparar)
+            resultados.append({
+                'caso': nombre,
+                'estaciones': estaciones,
+                'anios': anios,
+                'filas': sum(filas.values()),
+                'repeticiones': repeticiones,
+                'min_s': min(tiempos),
+                'mediana_s': statistics.median(tiempos),
+                'media_s': statistics.fmean(tiempos),
+            })
+            print(f"  {nombre:<45} {min(tiempos) * 1000:10.2f} ms")
+        data_loader.CACHE_DATOS.limpiar()
+        return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks con datos sintéticos.")
+    parser.add_argument('--estaciones', type=int, nargs='+', default=[5, 20])
+    parser.add_argument('--anios', type=int, nargs='+', default=[1, 3])
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--salida', help="JSON de resultados (por omisión, benchmarks/resultados/<commit>.json)")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    commit = _commit()
+    resultados = []
+    for estaciones in args.estaciones:
+        for anios in args.anios:
+            print(f"🚀 {estaciones} estaciones × {anios} años")
+            resultados += ejecutar_escenario(estaciones, anios, args.repeticiones)
+
+    salida = args.salida or os.path.join(DIR_RESULTADOS, f"{commit or 'sin_commit'}.json")
+    if os.path.dirname(salida):
+        os.makedirs(os.path.dirname(salida), exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump({
+            'commit': commit,
+            'fecha': datetime.now().isoformat(timespec="seconds"),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'plataforma': platform.platform(),
+            'resultados': resultados,
+        }, f, indent=1, ensure_ascii=False)
+    print(f"\n✅ Resultados en {salida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Generador de datos sintéticos con el esquema limpio.
+
+Escribe ``datos_Clean_{anio}.csv`` para ``N`` estaciones × ``M`` años, con
+las mismas columnas, tipos y orden (por estación) que ``data/Clean``. Los
+valores siguen un ciclo diario por contaminante con ruido y ~5 % de
+faltantes. El último año termina en ``fin`` (por omisión, hoy), así que
+``cargar_datos_dia_anterior`` encuentra el día de ayer.
+
+Uso::
+
+    python benchmarks/sinteticos.py --estaciones 20 --anios 3 --destino /tmp/Clean
+"""
+import argparse
+import os
+import sys
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+from utils import esquema  # noqa: E402
+
+# Nivel medio de cada contaminante en las unidades de data/Clean.
+ESCALAS = {'O3': 30.0, 'O3_8hrs': 30.0, 'NO2': 20.0, 'CO': 80.0, 'SO2': 5.0, 'PM10': 50.0, 'PM2_5': 20.0}
+FRACCION_FALTANTES = 0.05
+CENTRO = (19.04, -98.2)
+
+
+def nombres_estaciones(n):
+    return [f"est{i:03d}" for i in range(1, n + 1)]
+
+
+def estaciones_sinteticas(n, semilla=0):
+    """Catálogo con el formato de ``data/estaciones-Puebla_sinaica.csv``."""
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        'Estaciones': nombres_estaciones(n),
+        'nombre': [f"Estación sintética {i}" for i in range(1, n + 1)],
+        'lat': CENTRO[0] + rng.uniform(-0.08, 0.08, n),
+        'long': CENTRO[1] + rng.uniform(-0.08, 0.08, n),
+    })
+
+
+def generar_anio(anio, estaciones, fin=None, semilla=0):
+    """``DataFrame`` del esquema limpio de ``anio``, ordenado por estación y hora."""
+    horas = pd.date_range(pd.Timestamp(anio, 1, 1), pd.Timestamp(anio + 1, 1, 1), inclusive='left', freq='h')
+    if fin is not None:
+        horas = horas[horas < pd.Timestamp(fin)]
+    rng = np.random.default_rng([semilla, anio])
+    n = len(horas) * len(estaciones)
+
+    fase = np.tile(2 * np.pi * (horas.hour.to_numpy() - 14) / 24, len(estaciones))
+    datos = {}
+    for contaminante, escala in ESCALAS.items():
+        valores = escala * (1 + 0.5 * np.cos(fase)) * rng.gamma(4.0, 0.25, n)
+        valores[rng.random(n) < FRACCION_FALTANTES] = np.nan
+        datos[contaminante] = np.round(valores, 2)
+    df = pd.DataFrame(datos)
+    df['Estacion'] = np.repeat(estaciones, len(horas))
+    df['DateTime'] = np.tile(horas.to_numpy(), len(estaciones))
+    df['Anio'] = df['DateTime'].dt.year
+    df['Mes'] = df['DateTime'].dt.month
+    df['Dia'] = df['DateTime'].dt.day
+    df['Hora'] = df['DateTime'].dt.hour
+    return esquema.aplicar_esquema(df)
+
+
+def generar_clean(destino, estaciones=5, anios=1, fin=None, semilla=0):
+    """Escribe los CSV limpios en ``destino``; devuelve ``{anio: filas}``."""
+    fin = pd.Timestamp(fin or date.today()).normalize()
+    os.makedirs(destino, exist_ok=True)
+    nombres = nombres_estaciones(estaciones)
+    filas = {}
+    for anio in range(fin.year - anios + 1, fin.year + 1):
+        df = generar_anio(anio, nombres, fin, semilla)
+        if df.empty:
+            continue
+        df.to_csv(os.path.join(destino, f"datos_Clean_{anio}.csv"), index=False,
+                  date_format=esquema.FORMATO_FECHA)
+        filas[anio] = len(df)
+    return filas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera datos limpios sintéticos.")
+    parser.add_argument('--estaciones', type=int, default=5)
+    parser.add_argument('--anios', type=int, default=1)
+    parser.add_argument('--destino', required=True)
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args()
+    for anio, filas in generar_clean(args.destino, args.estaciones, args.anios, semilla=args.semilla).items():
+        print(f"✅ {anio}: {filas} filas en {args.destino}")
+
+
+if __name__ == '__main__':
+    main()
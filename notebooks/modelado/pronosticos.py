@@ -0,0 +1,227 @@
+"""Pronósticos por lotes de las próximas 24 horas y 7 días.
+
+Para cada serie estación × contaminante ajusta el SARIMAX elegido por
+``seleccion_sarimax.py`` (o ``ORDEN_POR_OMISION`` si la serie aún no tiene
+búsqueda) sobre los últimos ``DIAS_AJUSTE`` días y pronostica ``HORIZONTE``
+horas con su intervalo de ``NIVEL_INTERVALO``. Los ajustes corren en un pool
+de procesos y el resultado se escribe en un solo artefacto,
+``data/Pronosticos/pronosticos.parquet``, que la app lee con
+``data_loader.cargar_pronosticos`` sin ajustar nada.
+
+Las series cuyo SARIMAX no converge (o todas, si statsmodels no está
+instalado) toman el pronóstico de ``RESPALDO``, uno de los métodos
+vectorizados de ``utils.pronosticadores``; con ``--modelo`` se puede generar
+toda la red con uno de ellos en menos de un segundo.
+
+Se ejecuta después de cada ingesta (``add_ayer.py`` lo llama al final) o a
+mano desde la raíz del repositorio::
+
+    python notebooks/modelado/pronosticos.py --procesos 8
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import seleccion_sarimax  # noqa: E402
+from utils import columnar, data_loader, pronosticadores  # noqa: E402
+
+HORIZONTE = 7 * 24
+NIVEL_INTERVALO = 0.9
+ORDEN_POR_OMISION = ((1, 0, 1), (0, 1, 1, seleccion_sarimax.PERIODO))
+LIMITE_AJUSTE = 120
+RESPALDO = 'suavizamiento'
+
+
+def ordenes_elegidas(tabla, series):
+    """``{serie: (orden, estacional)}`` con el mejor orden guardado de cada serie.
+
+    Si la versión actual de la serie no tiene búsqueda se usa la de la última
+    búsqueda registrada para ella; si nunca se buscó, ``ORDEN_POR_OMISION``.
+    """
+    elegidos = seleccion_sarimax.mejores(tabla)
+    ordenes = {}
+    for (estacion, contaminante), serie in series.items():
+        propias = tabla[(tabla['Estacion'] == estacion) & (tabla['Contaminante'] == contaminante)]
+        candidatos = elegidos[(elegidos['Estacion'] == estacion) & (elegidos['Contaminante'] == contaminante)]
+        version = seleccion_sarimax.version_serie(serie)
+        if version not in set(candidatos['version']) and not propias.empty:
+            version = propias['version'].iloc[-1]
+        fila = candidatos[candidatos['version'] == version]
+        if fila.empty:
+            ordenes[(estacion, contaminante)] = ORDEN_POR_OMISION
+        else:
+            ordenes[(estacion, contaminante)] = (
+                tuple(int(x) for x in fila['orden'].iloc[0].split(",")),
+                tuple(int(x) for x in fila['estacional'].iloc[0].split(",")),
+            )
+    return ordenes
+
+
+def pronosticar(valores, orden, estacional, horizonte=HORIZONTE, nivel=NIVEL_INTERVALO, limite=LIMITE_AJUSTE):
+    """``(pronóstico, inferior, superior)`` de ``horizonte`` horas, o ``None`` si el ajuste falla."""
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+    inicio = time.perf_counter()
+
+    def vigilar(_):
+        if limite is not None and time.perf_counter() - inicio > limite:
+            raise seleccion_sarimax.TiempoAgotado
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            ajuste = SARIMAX(valores, order=orden, seasonal_order=estacional).fit(disp=False, callback=vigilar)
+            prediccion = ajuste.get_forecast(horizonte)
+            intervalo = np.asarray(prediccion.conf_int(alpha=1 - nivel))
+    except Exception:  # noqa: BLE001 - la serie se intenta con el orden por omisión
+        return None
+    media = np.asarray(prediccion.predicted_mean)
+    if not np.isfinite(media).all():
+        return None
+    # Las concentraciones no son negativas.
+    return np.clip(media, 0, None), np.clip(intervalo[:, 0], 0, None), np.clip(intervalo[:, 1], 0, None)
+
+
+def _pronosticar_tarea(tarea):
+    valores, ordenes, horizonte, limite = tarea
+    for orden, estacional in ordenes:
+        resultado = pronosticar(valores, orden, estacional, horizonte, limite=limite)
+        if resultado is not None:
+            return (orden, estacional), resultado
+    return None, None
+
+
+def _modelo(orden, estacional):
+    return f"SARIMAX({','.join(map(str, orden))})x({','.join(map(str, estacional))})"
+
+
+def pronosticar_series(series, ordenes, horizonte=HORIZONTE, procesos=None, limite=LIMITE_AJUSTE):
+    """Tabla con el esquema ``data_loader.COLUMNAS_PRONOSTICOS`` para todas las ``series``."""
+    claves = list(series)
+    tareas = [
+        (series[clave].to_numpy(dtype='float64'),
+         list(dict.fromkeys([ordenes.get(clave, ORDEN_POR_OMISION), ORDEN_POR_OMISION])), horizonte, limite)
+        for clave in claves
+    ]
+    if procesos == 1:
+        resultados = list(map(_pronosticar_tarea, tareas))
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            resultados = list(pool.map(_pronosticar_tarea, tareas))
+
+    partes = []
+    for (estacion, contaminante), (elegido, resultado) in zip(claves, resultados):
+        if resultado is None:
+            continue
+        origen = series[(estacion, contaminante)].index[-1]
+        media, inferior, superior = resultado
+        partes.append(pd.DataFrame({
+            'Estacion': estacion,
+            'Contaminante': contaminante,
+            'DateTime': pd.date_range(origen + pd.Timedelta(hours=1), periods=horizonte, freq='h'),
+            'horizonte': np.arange(1, horizonte + 1, dtype='int16'),
+            'pronostico': media.astype('float32'),
+            'inferior': inferior.astype('float32'),
+            'superior': superior.astype('float32'),
+            'modelo': _modelo(*elegido),
+            'origen': origen,
+        }))
+    if not partes:
+        return pd.DataFrame(columns=data_loader.COLUMNAS_PRONOSTICOS)
+    df = pd.concat(partes, ignore_index=True)
+    return df.astype({'Estacion': 'category', 'Contaminante': 'category', 'modelo': 'category'})
+
+
+def guardar(df, base=None):
+    """Escribe el artefacto y ``meta.json`` de forma atómica."""
+    if not columnar.HAY_PARQUET:
+        raise RuntimeError("Se necesita pyarrow para escribir los pronósticos")
+    ruta = data_loader.ruta_pronosticos(base)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = ruta + ".tmp"
+    df.to_parquet(temporal, index=False)
+    os.replace(temporal, ruta)
+    meta = {
+        'generado': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'series': int(df[['Estacion', 'Contaminante']].drop_duplicates().shape[0]) if not df.empty else 0,
+        'origen': str(df['origen'].max()) if not df.empty else None,
+    }
+    temporal = os.path.join(os.path.dirname(ruta), "meta.json.tmp")
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(temporal, os.path.join(os.path.dirname(ruta), "meta.json"))
+
+
+def pronosticar_red(horas, horizonte=HORIZONTE, metodo=RESPALDO):
+    """Pronóstico de referencia de todas las series de ``horas`` a la vez."""
+    valores, rejilla, estaciones, contaminantes = pronosticadores.tensor_horario(horas)
+    if not len(valores):
+        return pd.DataFrame(columns=data_loader.COLUMNAS_PRONOSTICOS)
+    resultado = pronosticadores.pronosticar(valores, horizonte, metodo, nivel=NIVEL_INTERVALO)
+    return pronosticadores.a_tabla(*resultado, valores, rejilla, estaciones, contaminantes, metodo)
+
+
+def completar(df, respaldo):
+    """``df`` más las series de ``respaldo`` que no aparecen en él."""
+    if df.empty:
+        return respaldo
+    presentes = pd.MultiIndex.from_frame(df[['Estacion', 'Contaminante']].astype(str).drop_duplicates())
+    claves = pd.MultiIndex.from_frame(respaldo[['Estacion', 'Contaminante']].astype(str))
+    faltantes = respaldo[~claves.isin(presentes)]
+    if faltantes.empty:
+        return df
+    df = pd.concat([df.astype({c: str for c in ('Estacion', 'Contaminante', 'modelo')}),
+                    faltantes.astype({c: str for c in ('Estacion', 'Contaminante', 'modelo')})],
+                   ignore_index=True)
+    return df.astype({'Estacion': 'category', 'Contaminante': 'category', 'modelo': 'category'})
+
+
+def generar(dias=seleccion_sarimax.DIAS_AJUSTE, horizonte=HORIZONTE, procesos=None, limite=LIMITE_AJUSTE,
+            modelo='sarimax'):
+    """Pronostica todas las series con los datos limpios actuales y guarda el artefacto.
+
+    ``modelo`` es ``'sarimax'`` o uno de ``pronosticadores.METODOS``.
+    """
+    if not columnar.HAY_PARQUET:
+        raise RuntimeError("Se necesita pyarrow para escribir los pronósticos")
+    horas = seleccion_sarimax.cargar_horas(dias)
+    if modelo == 'sarimax' and importlib.util.find_spec('statsmodels') is None:
+        print(f"⚠️ statsmodels no está instalado; se usa el método '{RESPALDO}'")
+        modelo = RESPALDO
+    respaldo = pronosticar_red(horas, horizonte, modelo if modelo != 'sarimax' else RESPALDO)
+    if modelo == 'sarimax':
+        series = seleccion_sarimax.series_horarias(horas)
+        ordenes = ordenes_elegidas(seleccion_sarimax.leer_tabla(), series)
+        df = completar(pronosticar_series(series, ordenes, horizonte, procesos, limite), respaldo)
+    else:
+        df = respaldo
+    guardar(df)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pronósticos por lotes para todas las series.")
+    parser.add_argument('--dias', type=int, default=seleccion_sarimax.DIAS_AJUSTE, help="Días de historia por serie")
+    parser.add_argument('--horizonte', type=int, default=HORIZONTE, help="Horas a pronosticar")
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--limite', type=float, default=LIMITE_AJUSTE, help="Segundos máximos por ajuste")
+    parser.add_argument('--modelo', choices=['sarimax', *pronosticadores.METODOS], default='sarimax',
+                        help="SARIMAX por serie o un método de referencia para toda la red")
+    args = parser.parse_args()
+
+    df = generar(args.dias, args.horizonte, args.procesos, args.limite, args.modelo)
+    series = df[['Estacion', 'Contaminante']].drop_duplicates().shape[0] if not df.empty else 0
+    print(f"✅ {series} series pronosticadas en {data_loader.ruta_pronosticos()}")
+
+
+if __name__ == '__main__':
+    main()
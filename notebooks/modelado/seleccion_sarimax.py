@@ -0,0 +1,284 @@
+"""Selección de órdenes SARIMAX en paralelo para todas las series.
+
+Generaliza la búsqueda en rejilla de ``04_series_temporales.ipynb``
+(``(p,d,q) × (P,D,Q,24)`` elegida por AIC) a cada par estación ×
+contaminante, y la reparte entre un pool de procesos:
+
+* Las combinaciones de cada serie se evalúan por *niveles* de complejidad
+  (``p + q + P + Q``), de la más simple a la más compleja. Los ajustes de un
+  nivel de todas las series se envían juntos al pool.
+* Parada temprana: si ``paciencia`` niveles seguidos no mejoran el mejor AIC
+  de la serie en más de ``tolerancia``, la serie deja de buscar. Además,
+  cada ajuste se limita a ``max_iteraciones`` del optimizador y a
+  ``limite`` segundos (se corta desde el *callback* del optimizador).
+* Cada ajuste terminado se guarda en ``data/Modelos/sarimax.csv`` con su
+  AIC y sus parámetros, bajo la clave ``(Estacion, Contaminante, version,
+  orden, estacional)``, donde ``version`` es una huella de los valores de la
+  serie. Al repetir la búsqueda con los mismos datos no se reajusta nada: la
+  parada temprana se reproduce con los resultados guardados.
+
+La tabla se reescribe de forma atómica al terminar cada nivel, así que una
+búsqueda interrumpida conserva lo ya ajustado. ``mejores()`` devuelve el
+modelo elegido para cada serie.
+
+Uso, desde la raíz del repositorio::
+
+    python notebooks/modelado/seleccion_sarimax.py --dias 60 --procesos 8 --limite 120
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'app'))
+from utils import data_loader, esquema  # noqa: E402
+
+RUTA_TABLA = "data/Modelos/sarimax.csv"
+PERIODO = 24
+DIAS_AJUSTE = 60
+COBERTURA_MINIMA = 0.5
+COLUMNAS = ['Estacion', 'Contaminante', 'version', 'orden', 'estacional', 'nivel', 'estado', 'aic',
+            'iteraciones', 'segundos', 'parametros']
+CLAVE = ['Estacion', 'Contaminante', 'version', 'orden', 'estacional']
+
+
+def rejilla(p=range(3), d=range(3), q=range(3), P=range(2), D=range(2), Q=range(2), periodo=PERIODO):
+    """Combinaciones ``(orden, estacional)`` de la rejilla del notebook."""
+    return [
+        (orden, estacional + (periodo,))
+        for orden in itertools.product(p, d, q)
+        for estacional in itertools.product(P, D, Q)
+    ]
+
+
+def nivel(orden, estacional):
+    """Complejidad de una combinación: número de coeficientes AR y MA."""
+    return orden[0] + orden[2] + estacional[0] + estacional[2]
+
+
+# ============================
+# Series
+# ============================
+
+def series_horarias(df, contaminantes=None, cobertura_minima=COBERTURA_MINIMA):
+    """``{(estacion, contaminante): Series}`` sobre una rejilla horaria completa.
+
+    Las horas sin dato quedan como ``NaN`` (SARIMAX las trata como faltantes);
+    se descartan las series con menos de ``cobertura_minima`` horas válidas.
+    """
+    contaminantes = contaminantes or esquema.CONTAMINANTES
+    if df.empty:
+        return {}
+    horas = pd.date_range(df['DateTime'].min(), df['DateTime'].max(), freq='h')
+    series = {}
+    for estacion, grupo in df.groupby('Estacion', observed=True):
+        grupo = grupo.drop_duplicates('DateTime').set_index('DateTime').reindex(horas)
+        for contaminante in contaminantes:
+            serie = grupo[contaminante].astype(float)
+            if serie.notna().mean() >= cobertura_minima:
+                series[(str(estacion), contaminante)] = serie.rename(contaminante)
+    return series
+
+
+def cargar_horas(dias=DIAS_AJUSTE, contaminantes=None):
+    """Filas limpias de los últimos ``dias`` días con datos."""
+    columnas = contaminantes or esquema.CONTAMINANTES
+    anios = data_loader.anios_disponibles()
+    if not anios:
+        return data_loader.cargar_rango(pd.Timestamp.today(), pd.Timestamp.today(), columnas=columnas)
+    df = data_loader.cargar_rango(pd.Timestamp(anios[0], 1, 1), pd.Timestamp(anios[-1], 12, 31), columnas=columnas)
+    if df.empty:
+        return df
+    inicio = df['DateTime'].max().normalize() - pd.Timedelta(days=dias - 1)
+    return df[df['DateTime'] >= inicio].reset_index(drop=True)
+
+
+def cargar_series(dias=DIAS_AJUSTE, contaminantes=None):
+    """Series horarias de los últimos ``dias`` días con datos limpios."""
+    return series_horarias(cargar_horas(dias, contaminantes), contaminantes)
+
+
+def version_serie(serie):
+    """Huella corta de las fechas y valores de la serie."""
+    h = hashlib.sha1()
+    h.update(serie.index.asi8.tobytes())
+    h.update(np.ascontiguousarray(serie.to_numpy(dtype='float64')).tobytes())
+    return h.hexdigest()[:12]
+
+
+# ============================
+# Ajuste (en los procesos del pool)
+# ============================
+
+class TiempoAgotado(Exception):
+    pass
+
+
+def ajustar(valores, orden, estacional, limite=None, max_iteraciones=50):
+    """Ajusta un SARIMAX; devuelve estado, AIC, iteraciones, segundos y parámetros."""
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+    inicio = time.perf_counter()
+
+    def vigilar(_):
+        if limite is not None and time.perf_counter() - inicio > limite:
+            raise TiempoAgotado
+
+    resultado = {'estado': 'ok', 'aic': np.nan, 'iteraciones': 0, 'parametros': None}
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            ajuste = SARIMAX(valores, order=orden, seasonal_order=estacional).fit(
+                disp=False, maxiter=max_iteraciones, callback=vigilar)
+        resultado['aic'] = float(ajuste.aic)
+        resultado['iteraciones'] = int(ajuste.mle_retvals.get('iterations', 0))
+        resultado['parametros'] = json.dumps(dict(zip(ajuste.model.param_names, map(float, ajuste.params))))
+        if not ajuste.mle_retvals.get('converged', True):
+            resultado['estado'] = 'sin_convergencia'
+        if not np.isfinite(resultado['aic']):
+            resultado['estado'] = 'error'
+    except TiempoAgotado:
+        resultado['estado'] = 'tiempo'
+    except Exception:  # noqa: BLE001 - como en el notebook, una combinación que falla se omite
+        resultado['estado'] = 'error'
+    resultado['segundos'] = time.perf_counter() - inicio
+    return resultado
+
+
+def _ajustar_tarea(tarea):
+    valores, orden, estacional, limite, max_iteraciones = tarea
+    return ajustar(valores, orden, estacional, limite, max_iteraciones)
+
+
+# ============================
+# Tabla persistida
+# ============================
+
+def leer_tabla(ruta=None):
+    try:
+        tabla = pd.read_csv(ruta or RUTA_TABLA, dtype={'version': str})
+    except (OSError, ValueError):
+        return pd.DataFrame(columns=COLUMNAS)
+    return tabla[COLUMNAS]
+
+
+def guardar_tabla(tabla, ruta=None):
+    ruta = ruta or RUTA_TABLA
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    temporal = ruta + ".tmp"
+    tabla.to_csv(temporal, index=False)
+    os.replace(temporal, ruta)
+
+
+def _texto(tupla):
+    return ",".join(map(str, tupla))
+
+
+def mejores(tabla):
+    """Combinación de menor AIC de cada serie y versión (sólo ajustes válidos)."""
+    validos = tabla[tabla['estado'].isin(['ok', 'sin_convergencia']) & tabla['aic'].notna()]
+    indice = validos.groupby(['Estacion', 'Contaminante', 'version'])['aic'].idxmin()
+    return validos.loc[indice].reset_index(drop=True)
+
+
+# ============================
+# Búsqueda
+# ============================
+
+def buscar(series, combinaciones=None, procesos=None, limite=None, max_iteraciones=50,
+           paciencia=2, tolerancia=2.0, ruta=None):
+    """Busca el mejor orden de cada serie de ``series`` (``{(estacion, contaminante): Series}``).
+
+    Devuelve la tabla completa de ajustes (nuevos y ya guardados). Con
+    ``procesos=1`` los ajustes corren en el proceso actual.
+    """
+    combinaciones = combinaciones if combinaciones is not None else rejilla()
+    por_nivel = {}
+    for orden, estacional in combinaciones:
+        por_nivel.setdefault(nivel(orden, estacional), []).append((orden, estacional))
+
+    tabla = leer_tabla(ruta)
+    hechas = {tuple(fila) for fila in tabla[CLAVE].astype(str).itertuples(index=False)}
+    pendientes = {
+        clave: {'serie': serie, 'version': version_serie(serie), 'mejor': np.inf, 'sin_mejora': 0}
+        for clave, serie in series.items()
+    }
+
+    pool = ProcessPoolExecutor(max_workers=procesos) if procesos != 1 else None
+    try:
+        for n in sorted(por_nivel):
+            if not pendientes:
+                break
+            tareas, filas = [], []
+            for (estacion, contaminante), estado in pendientes.items():
+                valores = estado['serie'].to_numpy(dtype='float64')
+                for orden, estacional in por_nivel[n]:
+                    clave = (estacion, contaminante, estado['version'], _texto(orden), _texto(estacional))
+                    if clave in hechas:
+                        continue
+                    filas.append(dict(zip(CLAVE, clave), nivel=n))
+                    tareas.append((valores, orden, estacional, limite, max_iteraciones))
+
+            mapear = pool.map if pool is not None else map
+            nuevas = [dict(fila, **resultado) for fila, resultado in zip(filas, mapear(_ajustar_tarea, tareas))]
+            if nuevas:
+                nuevas = pd.DataFrame(nuevas, columns=COLUMNAS)
+                tabla = pd.concat([tabla, nuevas], ignore_index=True) if not tabla.empty else nuevas
+                hechas.update(tuple(fila) for fila in nuevas[CLAVE].astype(str).itertuples(index=False))
+                guardar_tabla(tabla, ruta)
+
+            _parada_temprana(pendientes, tabla, n, paciencia, tolerancia)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return tabla.reset_index(drop=True)
+
+
+def _parada_temprana(pendientes, tabla, n, paciencia, tolerancia):
+    """Actualiza el mejor AIC de cada serie tras el nivel ``n`` y retira las que ya no mejoran."""
+    del_nivel = tabla[(tabla['nivel'] == n) & tabla['aic'].notna()]
+    minimos = del_nivel.groupby(['Estacion', 'Contaminante', 'version'])['aic'].min()
+    for clave in list(pendientes):
+        estado = pendientes[clave]
+        aic = minimos.get((clave[0], clave[1], estado['version']), np.inf)
+        if aic < estado['mejor'] - tolerancia:
+            estado['sin_mejora'] = 0
+        else:
+            estado['sin_mejora'] += 1
+        estado['mejor'] = min(estado['mejor'], aic)
+        if estado['sin_mejora'] >= paciencia:
+            del pendientes[clave]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Búsqueda de órdenes SARIMAX para todas las series.")
+    parser.add_argument('--dias', type=int, default=DIAS_AJUSTE, help="Días de historia por serie")
+    parser.add_argument('--contaminantes', nargs='+', default=None)
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--limite', type=float, default=120, help="Segundos máximos por ajuste")
+    parser.add_argument('--max-iteraciones', type=int, default=50)
+    parser.add_argument('--paciencia', type=int, default=2)
+    parser.add_argument('--tolerancia', type=float, default=2.0, help="Mejora mínima de AIC por nivel")
+    args = parser.parse_args()
+
+    series = cargar_series(args.dias, args.contaminantes)
+    print(f"🚀 {len(series)} series, {len(rejilla())} combinaciones como máximo por serie")
+    tabla = buscar(series, procesos=args.procesos, limite=args.limite, max_iteraciones=args.max_iteraciones,
+                   paciencia=args.paciencia, tolerancia=args.tolerancia)
+    elegidos = mejores(tabla)
+    for _, fila in elegidos.iterrows():
+        print(f"✅ {fila['Estacion']:<8} {fila['Contaminante']:<6} ({fila['orden']})×({fila['estacional']}) "
+              f"AIC={fila['aic']:.1f}")
+    print(f"✅ {len(tabla)} ajustes en {RUTA_TABLA}")
+
+
+if __name__ == '__main__':
+    main()
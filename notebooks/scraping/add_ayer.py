@@ -4,12 +4,22 @@ from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor
 import time
 import os
+import sys
+
+sys.path.insert(0, 'app')
+sys.path.insert(0, 'notebooks/modelado')
+from utils import agregados, alertas, almacen, columnar, indicadores
+from utils.estaciones import RED_PUEBLA, catalogo
+from utils.limpieza import actualizar_anio
 
 # Configuración
 URL = 'https://calidaddelaire.puebla.gob.mx/views/reportes_monitoreo.php'
-ESTACIONES = ['santa', 'bine', 'ninfas', 'utp', 'vel']
+ESTACIONES = catalogo().claves(RED_PUEBLA)
 COLUMNS = ['Fecha', 'Hora', 'O3', 'O3 8hrs', 'NO2', 'CO', 'SO2', 'PM-10', 'PM-2.5', 'Estacion']
 OUTPUT_CSV = 'datos_2025.csv'
+# Procesos y segundos máximos por ajuste SARIMAX al pronosticar tras la ingesta
+PROCESOS_PRONOSTICO = os.cpu_count()
+LIMITE_PRONOSTICO = 30
 
 # Solo el día de ayer
 ayer = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
@@ -83,6 +93,42 @@ def main():
         existe = os.path.exists(f'data/Crudos/{OUTPUT_CSV}')
         df.to_csv(f'data/Crudos/{OUTPUT_CSV}', mode='a', index=False, header=False)
         print(f"\n✅ Día agregado a 'data/Crudos/{OUTPUT_CSV}' con {len(df)} nuevas filas.")
+
+        # Limpiar sólo las filas nuevas y agregarlas a data/Clean
+        anio = int(OUTPUT_CSV.split('_')[1].split('.')[0])
+        filas = actualizar_anio(anio)
+        print(f"✅ {filas} filas limpias agregadas a 'data/Clean/datos_Clean_{anio}.csv'.")
+
+        # Las particiones Parquet tienen prioridad al leer: se regeneran si existen
+        if columnar.existe_anio(anio):
+            columnar.exportar_anio(anio)
+            print(f"✅ Particiones Parquet de {anio} regeneradas en '{columnar.ruta_anio(anio)}'.")
+
+        # Upsert por (Estacion, DateTime): repetir el día no duplica filas en la base
+        if almacen.existe():
+            almacen.ingestar_anio(anio)
+            print(f"✅ Año {anio} actualizado en '{almacen.RUTA_DB}'.")
+
+        # Indicadores normativos de las horas nuevas; la página sólo lee la tabla
+        tabla = indicadores.actualizar_indicadores(anio)
+        print(f"✅ {len(tabla)} horas con indicadores en '{indicadores.ruta_indicadores(anio)}'.")
+
+        # Cubo de agregados con las horas nuevas; las páginas sólo lo leen
+        granos = agregados.actualizar_cubo(anio)
+        print(f"✅ {len(granos['dia'])} filas en el grano diario de '{agregados.ruta_cubo(anio)}'.")
+
+        # Evaluar alertas sólo con las horas nuevas; la página lee la lista lista
+        eventos = alertas.actualizar_alertas()
+        print(f"✅ {len(eventos)} eventos de alerta en '{alertas.ruta_estado()}'.")
+
+        # Pronósticos por lotes: la app sólo lee el artefacto. Un fallo aquí no
+        # debe tumbar la ingesta, que ya quedó escrita.
+        try:
+            import pronosticos
+            df_pronosticos = pronosticos.generar(procesos=PROCESOS_PRONOSTICO, limite=LIMITE_PRONOSTICO)
+            print(f"✅ {len(df_pronosticos)} horas pronosticadas.")
+        except Exception as e:  # noqa: BLE001
+            print(f"⚠️ No se generaron pronósticos: {type(e).__name__}: {e}")
     else:
         print("\n⚠️ No se recuperaron datos.")
 
@@ -0,0 +1,227 @@
+"""Backfill reanudable del historial IAS.
+
+Recibe un rango de fechas y una lista de estaciones, y descarga cada unidad
+``(fecha, estacion)`` con ``cliente_http``. Cada unidad terminada se agrega de
+inmediato al CSV de salida, y su estado queda en un manifiesto JSON junto a él
+(``<salida>.manifiesto.json``):
+
+* ``completada``: las 24 horas se escribieron en el CSV.
+* ``parcial``: el sitio respondió con menos de 24 horas; no se escribe nada.
+* ``fallida``: error de red o del servidor tras agotar los reintentos.
+
+Al volver a ejecutar el mismo comando sólo se descargan las unidades que no
+están completadas. El manifiesto guarda además el tamaño del CSV tras la
+última unidad registrada; si el proceso se interrumpe a media escritura, el
+CSV se recorta a ese tamaño al reanudar, así que nunca quedan filas
+duplicadas ni a medias. Si la salida ya existe sin manifiesto (por ejemplo,
+``data/Crudos/datos_2024.csv``), el manifiesto nuevo marca como completadas
+las unidades ``(Fecha, Estacion)`` que ya tiene el archivo.
+
+Depende de ``cliente_http``, que aún es experimental (ver su docstring), así
+que pide ``--experimental``.
+
+Uso::
+
+    python notebooks/scraping/backfill.py 2024-01-01 2024-12-31 --salida data/Crudos/datos_2024.csv --experimental
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from cliente_http import (COLUMNS, ESTACIONES, ClienteHistorial, celdas_tabla, exigir_confirmacion, filas_validas,
+                          rango_fechas)
+import planificador
+
+VERSION = 1
+CONCURRENCIA = 8
+REINTENTOS = 3
+ESPERA_REINTENTO = 5  # segundos; se duplica en cada reintento
+ARRENDAMIENTO = 120
+
+
+class DiaIncompleto(Exception):
+    def __init__(self, filas):
+        super().__init__(f"{filas} registros encontrados (esperados: 24)")
+        self.filas = filas
+
+
+def ruta_manifiesto(salida):
+    return salida + ".manifiesto.json"
+
+
+def clave(fecha, estacion):
+    return f"{fecha}|{estacion}"
+
+
+class Manifiesto:
+    """Estado por unidad y tamaño confirmado del CSV, persistido de forma atómica."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.datos = {"version": VERSION, "tamano_salida": 0, "unidades": {}}
+        self.nuevo = False
+        try:
+            with open(ruta, encoding="utf-8") as f:
+                self.datos = json.load(f)
+        except FileNotFoundError:
+            self.nuevo = True
+
+    @property
+    def unidades(self):
+        return self.datos["unidades"]
+
+    def pendientes(self, fechas, estaciones):
+        return [
+            (fecha, estacion)
+            for estacion in estaciones
+            for fecha in fechas
+            if self.unidades.get(clave(fecha, estacion), {}).get("estado") != "completada"
+        ]
+
+    def sembrar(self, salida):
+        """Marca como completadas las unidades que ya están en ``salida``; devuelve cuántas."""
+        existentes = pd.read_csv(salida, usecols=['Fecha', 'Estacion'], dtype=str)
+        actualizado = datetime.now().isoformat(timespec="seconds")
+        conteo = existentes.groupby(['Fecha', 'Estacion']).size()
+        for (fecha, estacion), filas in conteo.items():
+            self.unidades[clave(fecha, estacion)] = {
+                "estado": "completada",
+                "filas": int(filas),
+                "ejecuciones": 0,
+                "error": None,
+                "actualizado": actualizado,
+            }
+        return len(conteo)
+
+    def registrar(self, fecha, estacion, estado, filas=0, error=None, tamano_salida=None):
+        anterior = self.unidades.get(clave(fecha, estacion), {})
+        self.unidades[clave(fecha, estacion)] = {
+            "estado": estado,
+            "filas": filas,
+            "ejecuciones": anterior.get("ejecuciones", 0) + 1,
+            "error": error,
+            "actualizado": datetime.now().isoformat(timespec="seconds"),
+        }
+        if tamano_salida is not None:
+            self.datos["tamano_salida"] = tamano_salida
+        self.guardar()
+
+    def guardar(self):
+        temporal = self.ruta + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(self.datos, f, indent=1, ensure_ascii=False)
+        os.replace(temporal, self.ruta)
+
+    def resumen(self):
+        conteo = {}
+        for unidad in self.unidades.values():
+            conteo[unidad["estado"]] = conteo.get(unidad["estado"], 0) + 1
+        return conteo
+
+
+class SalidaCSV:
+    """CSV de salida al que se agregan días completos y se sincronizan a disco.
+
+    Un CSV existente sin manifiesto (por ejemplo, uno de ``data/Crudos``) se
+    conserva y se le agregan filas al final; ``Manifiesto.sembrar`` evita
+    volver a descargar lo que ya contiene.
+    """
+
+    def __init__(self, ruta, tamano_confirmado):
+        self.ruta = ruta
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        if not os.path.exists(ruta):
+            with open(ruta, "w", encoding="utf-8", newline="") as f:
+                csv.writer(f, lineterminator="\n").writerow(COLUMNS)
+        elif tamano_confirmado and os.path.getsize(ruta) > tamano_confirmado:
+            # Filas escritas tras el último registro del manifiesto: se descartan.
+            with open(ruta, "r+b") as f:
+                f.truncate(tamano_confirmado)
+        self.tamano = os.path.getsize(ruta)
+
+    def agregar(self, filas):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(filas)
+        with open(self.ruta, "ab") as f:
+            f.write(buffer.getvalue().encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+            self.tamano = f.tell()
+        return self.tamano
+
+
+async def _procesar(cliente, unidad):
+    fecha, estacion = unidad
+    html = await cliente.descargar_html(fecha, estacion)
+    filas = filas_validas(celdas_tabla(html), fecha, estacion)
+    if len(filas) != 24:
+        raise DiaIncompleto(len(filas))
+    return filas
+
+
+async def backfill(fechas, estaciones, salida, concurrencia=CONCURRENCIA, reintentos=REINTENTOS,
+                   espera=ESPERA_REINTENTO, **opciones_cliente):
+    """Descarga las unidades pendientes y devuelve el resumen del manifiesto."""
+    manifiesto = Manifiesto(ruta_manifiesto(salida))
+    if manifiesto.nuevo and os.path.exists(salida):
+        # Sin esto, cada unidad ya descargada se volvería a agregar al final.
+        print(f"📋 {manifiesto.sembrar(salida)} unidades ya presentes en '{salida}'")
+    archivo = SalidaCSV(salida, manifiesto.datos["tamano_salida"])
+    if manifiesto.datos["tamano_salida"] == 0:
+        manifiesto.datos["tamano_salida"] = archivo.tamano
+        manifiesto.guardar()
+
+    pendientes = manifiesto.pendientes(fechas, estaciones)
+    print(f"🚀 {len(pendientes)} unidades pendientes de {len(fechas) * len(estaciones)}")
+
+    def al_terminar(unidad, filas, error):
+        fecha, estacion = unidad
+        if error is None:
+            tamano = archivo.agregar(filas)
+            manifiesto.registrar(fecha, estacion, "completada", len(filas), tamano_salida=tamano)
+            print(f"✅ {fecha} - {estacion} ({len(filas)} filas)")
+        elif isinstance(error, DiaIncompleto):
+            manifiesto.registrar(fecha, estacion, "parcial", error.filas, str(error))
+            print(f"❌ {fecha} - {estacion}: {error}")
+        else:
+            manifiesto.registrar(fecha, estacion, "fallida", 0, f"{type(error).__name__}: {error}")
+            print(f"🛑 Error en {fecha} - {estacion}: {error}")
+
+    async with ClienteHistorial(concurrencia=concurrencia, **opciones_cliente) as cliente:
+        await planificador.ejecutar(
+            pendientes, [cliente] * concurrencia, _procesar,
+            arrendamiento=ARRENDAMIENTO, max_intentos=reintentos, espera=espera, al_terminar=al_terminar,
+        )
+    return manifiesto.resumen()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill reanudable del historial IAS.")
+    parser.add_argument('inicio', help="Fecha inicial (AAAA-MM-DD)")
+    parser.add_argument('fin', help="Fecha final, inclusiva (AAAA-MM-DD)")
+    parser.add_argument('--estaciones', nargs='+', default=ESTACIONES)
+    parser.add_argument('--salida', required=True, help="CSV de salida (se reanuda si ya existe)")
+    parser.add_argument('--concurrencia', type=int, default=CONCURRENCIA)
+    parser.add_argument('--reintentos', type=int, default=REINTENTOS, help="Intentos por unidad en cada ejecución")
+    parser.add_argument('--espera', type=float, default=ESPERA_REINTENTO, help="Espera base entre intentos (s)")
+    parser.add_argument('--experimental', action='store_true', help="Usar el cliente HTTP sin confirmar")
+    args = parser.parse_args()
+    exigir_confirmacion(args.experimental)
+
+    resumen = asyncio.run(backfill(
+        rango_fechas(args.inicio, args.fin), args.estaciones, args.salida,
+        concurrencia=args.concurrencia, reintentos=args.reintentos, espera=args.espera,
+    ))
+    print(f"\n📋 Manifiesto: {resumen}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,285 @@
+"""Descarga del historial IAS por HTTP, sin navegador.
+
+En lugar de abrir Chromium y llenar el modal ``#modal_historialIAS``, este
+cliente envía directamente la petición que hace el botón
+``#btnHistorial_IAS`` y lee la tabla de la respuesta con ``html.parser``.
+Las filas resultantes son idénticas a las de ``extraer_datos`` en los
+scripts de Playwright (misma regla de 8/7 celdas y de 24 horas por día).
+
+Las peticiones comparten un ``httpx.AsyncClient`` (conexiones reutilizadas),
+con un límite de peticiones simultáneas, un límite de peticiones por segundo
+y reintentos con espera exponencial ante errores de red, 429 y 5xx.
+
+EXPERIMENTAL: ``URL_HISTORIAL``, ``METODO_HISTORIAL`` y ``CAMPOS_FORMULARIO``
+reproducen el formulario de la página, pero no se han confirmado contra el
+sitio en vivo (pestaña *Red* de las herramientas del navegador al pulsar
+"Consultar"), y la respuesta de ``tests/fixtures/historial_ias.html`` está
+armada a mano con el marcado que leen los scripts de Playwright. Mientras
+``EXPERIMENTAL`` sea verdadero, este script y ``backfill.py`` piden
+``--experimental``; la descarga por omisión sigue siendo con Playwright
+(``scraping_paralelo.py``, ``scraping.py`` y ``add_ayer.py``). Al confirmar
+la petición, grabar una respuesta real en el fixture y poner
+``EXPERIMENTAL = False``.
+
+Uso::
+
+    python notebooks/scraping/cliente_http.py 2025-01-01 2025-05-27 --salida data/Crudos/datos_2025.csv --experimental
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from html.parser import HTMLParser
+
+import httpx
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'app'))
+from utils.estaciones import RED_PUEBLA, catalogo  # noqa: E402
+
+# Configuración
+URL_HISTORIAL = os.environ.get(
+    'CALIDAD_AIRE_URL_HISTORIAL',
+    'https://calidaddelaire.puebla.gob.mx/views/reportes_monitoreo.php',
+)
+METODO_HISTORIAL = 'POST'
+# Nombre de cada campo del formulario de #btnHistorial_IAS en la petición.
+CAMPOS_FORMULARIO = {
+    'filtro': 'his_filtro_IAS',
+    'fecha': 'his_fecha_IAS',
+    'estacion': 'his_estacion_IAS',
+}
+VALOR_FILTRO = '1'  # #his_filtro_IAS1: historial por día
+# La petición de arriba aún no se confirma contra el sitio en vivo.
+EXPERIMENTAL = True
+ESTACIONES = catalogo().claves(RED_PUEBLA)
+COLUMNS = ['Fecha', 'Hora', 'O3', 'O3 8hrs', 'NO2', 'CO', 'SO2', 'PM-10', 'PM-2.5', 'Estacion']
+
+CONCURRENCIA = 8
+PETICIONES_POR_SEGUNDO = 10
+REINTENTOS = 4
+ESPERA_BASE = 0.5  # segundos; se duplica en cada reintento
+TIMEOUT = 30
+
+
+class _TablaHistorial(HTMLParser):
+    """Texto de las celdas ``td`` de ``table.table.table-bordered tbody tr``."""
+
+    def __init__(self):
+        super().__init__()
+        self.filas = []
+        self._tablas = []  # pila: True si la tabla es .table.table-bordered
+        self._en_tbody = False
+        self._fila = None
+        self._celda = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            clases = (dict(attrs).get('class') or '').split()
+            self._tablas.append('table' in clases and 'table-bordered' in clases)
+        elif tag == 'tbody' and self._tablas and self._tablas[-1]:
+            self._en_tbody = True
+        elif tag == 'tr' and self._en_tbody:
+            self._fila = []
+        elif tag == 'td' and self._fila is not None:
+            self._celda = []
+
+    def handle_endtag(self, tag):
+        if tag == 'td' and self._celda is not None:
+            # Como inner_text(): espacios colapsados y sin bordes.
+            self._fila.append(' '.join(''.join(self._celda).split()))
+            self._celda = None
+        elif tag == 'tr' and self._fila is not None:
+            self.filas.append(self._fila)
+            self._fila = None
+        elif tag == 'tbody':
+            self._en_tbody = False
+        elif tag == 'table' and self._tablas:
+            self._tablas.pop()
+
+    def handle_data(self, data):
+        if self._celda is not None:
+            self._celda.append(data)
+
+
+def filas_validas(filas_celdas, fecha, estacion):
+    """Filas de 8 celdas, o de 7 sin ``O3 8hrs``, con fecha y estación agregadas."""
+    data = []
+    for celdas in filas_celdas:
+        celdas = list(celdas)
+        if len(celdas) == 8:
+            data.append([fecha] + celdas + [estacion])
+        elif len(celdas) == 7:
+            celdas.insert(2, "NA")  # Insertar O3 8hrs = NA
+            data.append([fecha] + celdas + [estacion])
+    return data
+
+
+def armar_filas(filas_celdas, fecha, estacion):
+    """Regla de ``extraer_datos``: sólo se aceptan días con exactamente 24 filas."""
+    data = filas_validas(filas_celdas, fecha, estacion)
+    if len(data) != 24:
+        print(f"⚠️ {fecha} - {estacion}: {len(data)} registros encontrados (esperados: 24)")
+        return []
+    return data
+
+
+def celdas_tabla(html):
+    """Texto de las celdas de cada fila de la tabla del historial."""
+    parser = _TablaHistorial()
+    parser.feed(html)
+    parser.close()
+    return parser.filas
+
+
+def extraer_filas(html, fecha, estacion):
+    """Filas de un día a partir del HTML de la respuesta."""
+    return armar_filas(celdas_tabla(html), fecha, estacion)
+
+
+class _LimiteTasa:
+    """Espacia el inicio de las peticiones para no superar ``por_segundo``."""
+
+    def __init__(self, por_segundo):
+        self._intervalo = 1 / por_segundo if por_segundo else 0
+        self._siguiente = 0.0
+        self._candado = asyncio.Lock()
+
+    async def esperar(self):
+        if not self._intervalo:
+            return
+        async with self._candado:
+            ahora = time.monotonic()
+            espera = self._siguiente - ahora
+            self._siguiente = max(ahora, self._siguiente) + self._intervalo
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+
+class ClienteHistorial:
+    """Cliente asíncrono del historial IAS.
+
+    Se usa como contexto asíncrono para abrir y cerrar el pool de conexiones::
+
+        async with ClienteHistorial() as cliente:
+            filas = await cliente.descargar_todo(fechas, ESTACIONES)
+    """
+
+    def __init__(self, url=None, concurrencia=CONCURRENCIA, por_segundo=PETICIONES_POR_SEGUNDO,
+                 reintentos=REINTENTOS, espera_base=ESPERA_BASE, timeout=TIMEOUT):
+        self.url = url or URL_HISTORIAL
+        self.reintentos = reintentos
+        self.espera_base = espera_base
+        self._semaforo = asyncio.Semaphore(concurrencia)
+        self._tasa = _LimiteTasa(por_segundo)
+        self._cliente = httpx.AsyncClient(
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=concurrencia, max_keepalive_connections=concurrencia),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._cliente.aclose()
+
+    def _formulario(self, fecha, estacion):
+        return {
+            CAMPOS_FORMULARIO['filtro']: VALOR_FILTRO,
+            CAMPOS_FORMULARIO['fecha']: fecha,
+            CAMPOS_FORMULARIO['estacion']: estacion,
+        }
+
+    async def _pedir(self, fecha, estacion):
+        formulario = self._formulario(fecha, estacion)
+        for intento in range(self.reintentos + 1):
+            await self._tasa.esperar()
+            try:
+                if METODO_HISTORIAL == 'GET':
+                    respuesta = await self._cliente.get(self.url, params=formulario)
+                else:
+                    respuesta = await self._cliente.post(self.url, data=formulario)
+                if respuesta.status_code != 429 and respuesta.status_code < 500:
+                    respuesta.raise_for_status()
+                    return respuesta.text
+                error = httpx.HTTPStatusError(
+                    f"HTTP {respuesta.status_code}", request=respuesta.request, response=respuesta
+                )
+            except httpx.TransportError as e:
+                error = e
+            if intento < self.reintentos:
+                await asyncio.sleep(self.espera_base * 2 ** intento)
+        raise error
+
+    async def descargar_html(self, fecha, estacion):
+        async with self._semaforo:
+            return await self._pedir(fecha, estacion)
+
+    async def descargar(self, fecha, estacion):
+        """Filas de un (fecha, estación); lista vacía si el día está incompleto."""
+        return extraer_filas(await self.descargar_html(fecha, estacion), fecha, estacion)
+
+    async def _descargar_reportando(self, fecha, estacion):
+        try:
+            registros = await self.descargar(fecha, estacion)
+        except httpx.HTTPError as e:
+            print(f"🛑 Error en {fecha} - {estacion}: {e}")
+            return []
+        if registros:
+            print(f"✅ {fecha} - {estacion} ({len(registros)} filas)")
+        else:
+            print(f"❌ {fecha} - {estacion}: Datos incompletos o vacíos")
+        return registros
+
+    async def descargar_todo(self, fechas, estaciones=ESTACIONES):
+        """Todas las filas, ordenadas por estación y fecha como en los scripts originales."""
+        pares = [(fecha, estacion) for estacion in estaciones for fecha in fechas]
+        resultados = await asyncio.gather(*(self._descargar_reportando(f, e) for f, e in pares))
+        return [fila for registros in resultados for fila in registros]
+
+
+def rango_fechas(inicio, fin):
+    inicio, fin = datetime.strptime(inicio, '%Y-%m-%d'), datetime.strptime(fin, '%Y-%m-%d')
+    return [(inicio + timedelta(days=i)).strftime('%Y-%m-%d') for i in range((fin - inicio).days + 1)]
+
+
+async def descargar(fechas, estaciones=ESTACIONES, **opciones):
+    async with ClienteHistorial(**opciones) as cliente:
+        return await cliente.descargar_todo(fechas, estaciones)
+
+
+def exigir_confirmacion(experimental):
+    """Detiene un script de línea de comandos si el cliente sigue siendo experimental y no se pidió."""
+    if EXPERIMENTAL and not experimental:
+        raise SystemExit(
+            "⚠️ El cliente HTTP es experimental: la petición al historial IAS no se ha confirmado contra "
+            "el sitio. Usa scraping_paralelo.py (Playwright) o agrega --experimental."
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Descarga el historial IAS por HTTP (experimental).")
+    parser.add_argument('inicio', help="Fecha inicial (AAAA-MM-DD)")
+    parser.add_argument('fin', help="Fecha final, inclusiva (AAAA-MM-DD)")
+    parser.add_argument('--estaciones', nargs='+', default=ESTACIONES)
+    parser.add_argument('--salida', required=True, help="CSV de salida")
+    parser.add_argument('--concurrencia', type=int, default=CONCURRENCIA)
+    parser.add_argument('--por-segundo', type=float, default=PETICIONES_POR_SEGUNDO)
+    parser.add_argument('--experimental', action='store_true', help="Usar la petición HTTP sin confirmar")
+    args = parser.parse_args()
+    exigir_confirmacion(args.experimental)
+
+    all_data = asyncio.run(descargar(
+        rango_fechas(args.inicio, args.fin), args.estaciones,
+        concurrencia=args.concurrencia, por_segundo=args.por_segundo,
+    ))
+    df = pd.DataFrame(all_data, columns=COLUMNS)
+    df.to_csv(args.salida, index=False)
+    print(f"\n✅ Archivo completo guardado: '{args.salida}' con {len(df)} filas.")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,10 +3,14 @@ import pandas as pd
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor
 import time
+import sys
+
+sys.path.insert(0, 'app')
+from utils.estaciones import RED_PUEBLA, catalogo
 
 # Configuración
 URL = 'https://calidaddelaire.puebla.gob.mx/views/reportes_monitoreo.php'
-ESTACIONES = ['santa', 'bine', 'ninfas', 'utp', 'vel']
+ESTACIONES = catalogo().claves(RED_PUEBLA)
 COLUMNS = ['Fecha', 'Hora', 'O3', 'O3 8hrs', 'NO2', 'CO', 'SO2', 'PM-10', 'PM-2.5', 'Estacion']
 OUTPUT_CSV = 'data/Crudos/datos_2025.csv'
 
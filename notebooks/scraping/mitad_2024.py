@@ -3,10 +3,14 @@ import pandas as pd
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor
 import time
+import sys
+
+sys.path.insert(0, 'app')
+from utils.estaciones import RED_PUEBLA, catalogo
 
 # Configuración
 URL = 'https://calidaddelaire.puebla.gob.mx/views/reportes_monitoreo.php'
-ESTACIONES = ['santa', 'bine', 'ninfas', 'utp', 'vel']
+ESTACIONES = catalogo().claves(RED_PUEBLA)
 COLUMNS = ['Fecha', 'Hora', 'O3', 'O3 8hrs', 'NO2', 'CO', 'SO2', 'PM-10', 'PM-2.5', 'Estacion']
 OUTPUT_CSV = 'datos_mitad_2024.csv'
 FECHAS = ['2024-07-21', '2024-07-22', '2024-07-23', '2024-07-24', '2024-07-25', '2024-07-26', '2024-07-27',
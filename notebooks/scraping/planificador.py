@@ -0,0 +1,113 @@
+"""Reparto de unidades de trabajo entre un pool de trabajadores asíncronos.
+
+Cada unidad (por ejemplo, un par ``(fecha, estacion)``) entra en una cola
+compartida; cada trabajador toma la siguiente unidad libre en cuanto termina
+la anterior, así que el rendimiento crece con el número de trabajadores y
+se adapta a la latencia real de cada petición.
+
+Cada unidad se toma con un *arrendamiento*: si el trabajador no la termina
+en ``arrendamiento`` segundos se cancela, vuelve a la cola para que otro
+trabajador la tome y el recurso atascado se reinicia con ``reiniciar``. Una
+unidad que falla vuelve a la cola tras ``espera * 2 ** (intento - 1)``
+segundos, y si agota ``max_intentos`` queda registrada como fallida.
+
+El planificador no sabe nada del navegador: ``procesar(recurso, unidad)``
+y ``reiniciar(recurso)`` son corrutinas que recibe como argumentos.
+"""
+import asyncio
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Resultado:
+    completadas: dict = field(default_factory=dict)  # unidad -> valor devuelto
+    fallidas: dict = field(default_factory=dict)  # unidad -> última excepción
+    intentos: dict = field(default_factory=dict)  # unidad -> intentos usados
+
+
+async def ejecutar(unidades, recursos, procesar, reiniciar=None, arrendamiento=60,
+                   max_intentos=3, espera=0, al_terminar=None):
+    """Procesa ``unidades`` con un trabajador por cada elemento de ``recursos``.
+
+    ``al_terminar(unidad, valor, error)`` se llama al cerrar cada unidad, con
+    ``error=None`` si se completó; sirve para guardar avances sobre la marcha.
+    Si lanza una excepción (por ejemplo, un ``OSError`` al escribir), se
+    cancelan los trabajadores y ``ejecutar`` la vuelve a lanzar; las unidades
+    que no se cerraron quedan pendientes para la siguiente ejecución.
+    """
+    cola = asyncio.Queue()
+    resultado = Resultado()
+    reintentos_pendientes = set()
+    detenido = asyncio.Event()
+    errores_al_terminar = []
+    for unidad in unidades:
+        cola.put_nowait((unidad, 1))
+
+    def cerrar(unidad, intento, valor=None, error=None):
+        resultado.intentos[unidad] = intento
+        if error is None:
+            resultado.completadas[unidad] = valor
+        else:
+            resultado.fallidas[unidad] = error
+        if al_terminar is not None:
+            try:
+                al_terminar(unidad, valor, error)
+            except Exception as e:  # noqa: BLE001 - se relanza desde ejecutar
+                errores_al_terminar.append(e)
+                detenido.set()
+
+    async def reencolar(unidad, intento, demora):
+        await asyncio.sleep(demora)
+        cola.put_nowait((unidad, intento))
+
+    def programar_reintento(unidad, intento):
+        demora = espera * 2 ** (intento - 2)
+        if demora <= 0:
+            cola.put_nowait((unidad, intento))
+            return
+        tarea = asyncio.create_task(reencolar(unidad, intento, demora))
+        reintentos_pendientes.add(tarea)
+        tarea.add_done_callback(reintentos_pendientes.discard)
+
+    async def trabajador(recurso):
+        while True:
+            unidad, intento = await cola.get()
+            try:
+                valor = await asyncio.wait_for(procesar(recurso, unidad), arrendamiento)
+            except Exception as e:  # noqa: BLE001 - cualquier fallo se reintenta
+                if isinstance(e, asyncio.TimeoutError):
+                    e = TimeoutError(f"arrendamiento de {arrendamiento}s vencido")
+                if intento < max_intentos:
+                    programar_reintento(unidad, intento + 1)
+                    # Cede el turno para que un trabajador libre la tome antes
+                    # de que éste, recién fallado, vuelva a la cola.
+                    await asyncio.sleep(0)
+                else:
+                    cerrar(unidad, intento, error=e)
+                if reiniciar is not None:
+                    try:
+                        await reiniciar(recurso)
+                    except Exception as error_reinicio:  # noqa: BLE001
+                        print(f"🛑 No se pudo reiniciar el trabajador: {error_reinicio}")
+            else:
+                cerrar(unidad, intento, valor)
+            finally:
+                cola.task_done()
+
+    async def vaciar_cola():
+        await cola.join()
+        while reintentos_pendientes:
+            await asyncio.gather(*reintentos_pendientes)
+            await cola.join()
+
+    tareas = [asyncio.create_task(trabajador(recurso)) for recurso in recursos]
+    esperas = [asyncio.create_task(vaciar_cola()), asyncio.create_task(detenido.wait())]
+    try:
+        await asyncio.wait(esperas, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for tarea in [*esperas, *reintentos_pendientes, *tareas]:
+            tarea.cancel()
+        await asyncio.gather(*esperas, *tareas, return_exceptions=True)
+    if errores_al_terminar:
+        raise errores_al_terminar[0]
+    return resultado
@@ -0,0 +1,116 @@
+"""Scraping con Playwright repartido por (fecha, estación) entre varias páginas.
+
+A diferencia de ``scraping.py`` (un navegador por estación que recorre sus
+fechas en serie con ``time.sleep(1.5)``), aquí un solo Chromium abre
+``contextos`` contextos con ``paginas`` páginas cada uno, y cada página es un
+trabajador de ``planificador.ejecutar``. En lugar de una espera fija, cada
+consulta vacía ``#div_historial_IAS`` y espera a que el servidor lo vuelva a
+llenar, así que el ritmo lo marca la latencia real del sitio.
+
+Uso::
+
+    python notebooks/scraping/scraping_paralelo.py 2024-01-01 2024-12-31 --salida datos_2024.csv
+"""
+import argparse
+import asyncio
+
+import pandas as pd
+from playwright.async_api import async_playwright
+
+from cliente_http import COLUMNS, ESTACIONES, armar_filas, rango_fechas
+import planificador
+
+URL = 'https://calidaddelaire.puebla.gob.mx/views/reportes_monitoreo.php'
+CONTEXTOS = 2
+PAGINAS_POR_CONTEXTO = 4
+ARRENDAMIENTO = 45  # segundos por (fecha, estación) antes de reasignarla
+MAX_INTENTOS = 3
+
+# Verdadero cuando el contenedor del historial volvió a tener contenido.
+_TABLA_LISTA = """
+() => {
+    const div = document.querySelector('#div_historial_IAS');
+    return div !== null && div.innerHTML.trim().length > 0;
+}
+"""
+_VACIAR_TABLA = """
+() => {
+    const div = document.querySelector('#div_historial_IAS');
+    if (div !== null) div.innerHTML = '';
+}
+"""
+_CELDAS = """
+filas => filas.map(fila => Array.from(fila.querySelectorAll('td')).map(td => td.innerText))
+"""
+
+
+async def abrir_modal(page):
+    await page.goto(URL)
+    await page.click('#nv_IAS')
+    await page.wait_for_selector('[data-bs-target="#modal_historialIAS"]')
+    await page.click('[data-bs-target="#modal_historialIAS"]')
+
+
+async def consultar(page, unidad):
+    """Filas de un (fecha, estación), esperando a que la tabla se actualice."""
+    fecha, estacion = unidad
+    await page.evaluate(_VACIAR_TABLA)
+    await page.check('#his_filtro_IAS1')
+    await page.fill('#his_fecha_IAS', fecha)
+    await page.select_option('#his_estacion_IAS', estacion)
+    await page.click('#btnHistorial_IAS')
+    await page.wait_for_function(_TABLA_LISTA)
+    celdas = await page.eval_on_selector_all('table.table.table-bordered tbody tr', _CELDAS)
+    registros = armar_filas(celdas, fecha, estacion)
+    if not registros:
+        raise ValueError("Datos incompletos o vacíos")
+    return registros
+
+
+async def main_async(fechas, estaciones, contextos, paginas, salida):
+    unidades = [(fecha, estacion) for estacion in estaciones for fecha in fechas]
+
+    def reportar(unidad, registros, error):
+        fecha, estacion = unidad
+        if error is None:
+            print(f"✅ {fecha} - {estacion} ({len(registros)} filas)")
+        else:
+            print(f"❌ {fecha} - {estacion}: {error}")
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        pool = []
+        for _ in range(contextos):
+            contexto = await browser.new_context()
+            for _ in range(paginas):
+                pool.append(await contexto.new_page())
+        await asyncio.gather(*(abrir_modal(page) for page in pool))
+
+        resultado = await planificador.ejecutar(
+            unidades, pool, consultar, reiniciar=abrir_modal,
+            arrendamiento=ARRENDAMIENTO, max_intentos=MAX_INTENTOS, al_terminar=reportar,
+        )
+        await browser.close()
+
+    all_data = [fila for unidad in unidades for fila in resultado.completadas.get(unidad, [])]
+    df = pd.DataFrame(all_data, columns=COLUMNS)
+    df.to_csv(salida, index=False)
+    print(f"\n✅ Archivo completo guardado: '{salida}' con {len(df)} filas "
+          f"({len(resultado.fallidas)} consultas fallidas).")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraping del historial IAS con varias páginas de Playwright.")
+    parser.add_argument('inicio', help="Fecha inicial (AAAA-MM-DD)")
+    parser.add_argument('fin', help="Fecha final, inclusiva (AAAA-MM-DD)")
+    parser.add_argument('--estaciones', nargs='+', default=ESTACIONES)
+    parser.add_argument('--contextos', type=int, default=CONTEXTOS)
+    parser.add_argument('--paginas', type=int, default=PAGINAS_POR_CONTEXTO)
+    parser.add_argument('--salida', required=True, help="CSV de salida")
+    args = parser.parse_args()
+    asyncio.run(main_async(rango_fechas(args.inicio, args.fin), args.estaciones,
+                           args.contextos, args.paginas, args.salida))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import agregados, almacen, columnar, data_loader
+from test_data_loader import _datos_clean, requiere_parquet
+
+
+@pytest.fixture
+def dirs(tmp_path, monkeypatch):
+    clean = tmp_path / "Clean"
+    clean.mkdir()
+    _datos_clean(2024).to_csv(clean / "datos_Clean_2024.csv", index=False)
+    monkeypatch.setattr(data_loader, "DIR_CLEAN", str(clean))
+    monkeypatch.setattr(columnar, "DIR_COLUMNAR", str(tmp_path / "Columnar"))
+    monkeypatch.setattr(agregados, "DIR_AGREGADOS", str(tmp_path / "Agregados"))
+    monkeypatch.setattr(almacen, "RUTA_DB", str(tmp_path / "calidad_aire.sqlite"))
+    data_loader.CACHE_DATOS.limpiar()
+    yield clean
+    data_loader.CACHE_DATOS.limpiar()
+
+
+def test_promedios_coinciden_con_filas(dirs):
+    df = data_loader.cargar_datos_por_anio(2024)
+    cubo = agregados.cargar_cubo([2024])
+
+    esperado = df.groupby([df['DateTime'].dt.month, 'Estacion'], observed=True)['NO2'].mean().unstack()
+    obtenido = cubo.promedio_mensual('NO2')
+    np.testing.assert_allclose(obtenido.values, esperado.values, rtol=1e-6)
+
+    esperado = df.groupby(['Hora', 'Estacion'], observed=True)['PM10'].mean().unstack()
+    np.testing.assert_allclose(cubo.perfil_horario('PM10').values, esperado.values, rtol=1e-6)
+
+    esperado = df.groupby([df['DateTime'].dt.day, 'Estacion'], observed=True)['O3'].mean().unstack()
+    np.testing.assert_allclose(cubo.promedio_por_dia_del_mes('O3').values, esperado.values, rtol=1e-6)
+
+
+def test_resumen_con_recorte(dirs):
+    df = data_loader.cargar_datos_por_anio(2024)
+    inicio, fin = datetime.date(2024, 1, 5), datetime.date(2024, 1, 20)
+    recorte = df[(df['DateTime'].dt.date >= inicio) & (df['DateTime'].dt.date <= fin) & (df['Estacion'] == 'bine')]
+
+    cubo = agregados.cargar_cubo([2024]).filtrar(['bine'], inicio, fin)
+    resumen = cubo.resumen('PM10')
+
+    assert not cubo.exacto
+    assert resumen['promedio'] == pytest.approx(recorte['PM10'].mean(), rel=1e-6)
+    assert resumen['maximo'] == recorte['PM10'].max()
+    assert resumen['minimo'] == recorte['PM10'].min()
+    assert resumen['estacion_maximo'] == 'bine'
+    assert inicio <= resumen['fecha_maximo'] <= fin
+
+
+def test_contaminante_sin_datos(dirs):
+    cubo = agregados.cargar_cubo([2024])
+    assert cubo.resumen('O3_8hrs') is None
+    assert agregados.cargar_cubo([1990]).vacio()
+
+
+def test_cargar_cubo_no_escribe(dirs):
+    cubo = agregados.cargar_cubo([2024])
+    assert not os.path.exists(agregados.ruta_cubo(2024))
+    assert cubo.promedio_mensual('NO2').notna().any().any()
+
+
+@requiere_parquet
+def test_actualizacion_incremental_equivale_a_reconstruir(dirs):
+    ruta = dirs / "datos_Clean_2024.csv"
+    completo = _datos_clean(2024, dias=41)
+    completo[completo['DateTime'] < pd.Timestamp("2024-02-10")].to_csv(ruta, index=False)
+    agregados.construir_cubo(2024)
+
+    completo.to_csv(ruta, index=False)
+    data_loader.CACHE_DATOS.limpiar()
+    incremental = agregados.actualizar_cubo(2024)
+    reconstruido = agregados.construir_cubo(2024)
+
+    for grano, claves in agregados.GRANOS.items():
+        orden = claves + ['Estacion', 'Contaminante']
+        a = incremental[grano].sort_values(orden).reset_index(drop=True)
+        b = reconstruido[grano].sort_values(orden).reset_index(drop=True)
+        pd.testing.assert_frame_equal(a, b, check_dtype=False, check_categorical=False)
+
+
+def _iguales(a, b):
+    for grano, claves in agregados.GRANOS.items():
+        orden = claves + ['Estacion', 'Contaminante']
+        pd.testing.assert_frame_equal(a[grano].sort_values(orden).reset_index(drop=True),
+                                      b[grano].sort_values(orden).reset_index(drop=True),
+                                      check_dtype=False, check_categorical=False)
+
+
+@requiere_parquet
+def test_actualizacion_diaria_no_lee_el_anio(dirs, monkeypatch):
+    ruta = dirs / "datos_Clean_2024.csv"
+    agregados.construir_cubo(2024)
+    _datos_clean(2024, dias=41).tail(24).to_csv(ruta, mode="a", header=False, index=False)
+    data_loader.CACHE_DATOS.limpiar()
+
+    def anio_completo(*args, **kwargs):
+        raise AssertionError("se leyó el año completo")
+
+    with monkeypatch.context() as parche:
+        parche.setattr(data_loader, "_leer_csv_sin_cache", anio_completo)
+        incremental = agregados.actualizar_cubo(2024)
+    _iguales(incremental, agregados.agregar_filas(data_loader.cargar_datos_por_anio(2024)))
+
+
+@requiere_parquet
+def test_dias_anteriores_a_la_marca_reconstruyen(dirs):
+    ruta = dirs / "datos_Clean_2024.csv"
+    completo = _datos_clean(2024)
+    hueco = completo['DateTime'].dt.date == datetime.date(2024, 1, 10)
+    completo[~hueco].to_csv(ruta, index=False)
+    agregados.construir_cubo(2024)
+
+    completo[hueco].to_csv(ruta, mode="a", header=False, index=False)  # relleno posterior
+    data_loader.CACHE_DATOS.limpiar()
+    _iguales(agregados.actualizar_cubo(2024), agregados.agregar_filas(data_loader.cargar_datos_por_anio(2024)))
@@ -0,0 +1,101 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+import pandas as pd
+import pytest
+
+from utils import alertas, almacen, columnar, data_loader, esquema
+from utils.levels_contaminacion import clasificar_niveles
+from test_data_loader import _datos_clean
+
+
+def _con_episodios(df):
+    """Días con PM10 y SO2 altos en algunas estaciones para que haya alertas."""
+    df = df.copy()
+    dia = df['DateTime'].dt.day
+    df.loc[(dia % 5 == 0) & (df['Estacion'] == 'santa'), 'PM10'] += 150
+    df.loc[(dia % 7 == 0) & (df['Estacion'] == 'bine'), 'SO2'] = 250.0
+    return esquema.aplicar_esquema(df)
+
+
+@pytest.fixture
+def dirs(tmp_path, monkeypatch):
+    clean = tmp_path / "Clean"
+    clean.mkdir()
+    monkeypatch.setattr(data_loader, "DIR_CLEAN", str(clean))
+    monkeypatch.setattr(columnar, "DIR_COLUMNAR", str(tmp_path / "Columnar"))
+    monkeypatch.setattr(almacen, "RUTA_DB", str(tmp_path / "calidad_aire.sqlite"))
+    monkeypatch.setattr(alertas, "DIR_ALERTAS", str(tmp_path / "Alertas"))
+    data_loader.CACHE_DATOS.limpiar()
+    yield clean
+    data_loader.CACHE_DATOS.limpiar()
+
+
+def test_promedio_diario_como_la_pagina():
+    df = _con_episodios(_datos_clean(2024, dias=20))
+    eventos = alertas.procesar(df, alertas.estado_vacio())['eventos']
+
+    promedios = df.groupby([df['DateTime'].dt.normalize(), 'Estacion'], observed=True)['PM10'].mean()
+    esperado = promedios[clasificar_niveles('PM10', promedios) >= 4]
+    obtenido = eventos[eventos['Medida'] == 'PM10']
+    assert len(esperado) > 0
+    assert [(f, e) for f, e in esperado.index] == list(zip(obtenido['Fecha'], obtenido['Estacion']))
+    assert {'SO2', 'SO2_24h', 'PM10_24h'} <= set(eventos['Medida'])
+
+
+def test_tandas_con_estado_persistido_equivalen_a_una_pasada(tmp_path):
+    df = _con_episodios(_datos_clean(2024, dias=20))
+    completo = alertas.procesar(df, alertas.estado_vacio())
+
+    base = str(tmp_path / "Alertas")
+    cortes = pd.to_datetime(["2024-01-03 07:00", "2024-01-03 19:00", "2024-01-11 00:00", "2024-01-21 00:00"])
+    inicio = df['DateTime'].min()
+    for fin in cortes:
+        tanda = df[(df['DateTime'] >= inicio) & (df['DateTime'] < fin)]
+        alertas.guardar_estado(alertas.procesar(tanda, alertas.leer_estado(base)), base)
+        inicio = fin
+
+    estado = alertas.leer_estado(base)
+    assert estado['marca'] == completo['marca']
+    pd.testing.assert_frame_equal(estado['eventos'], completo['eventos'])
+
+
+def test_actualizar_solo_lee_horas_nuevas(dirs, monkeypatch):
+    ruta = dirs / "datos_Clean_2024.csv"
+    completo = _con_episodios(_datos_clean(2024, dias=20))
+    completo[completo['DateTime'] < pd.Timestamp("2024-01-12 05:00")].to_csv(ruta, index=False)
+    alertas.actualizar_alertas()
+
+    completo.to_csv(ruta, index=False)
+    procesadas = []
+    procesar = alertas.procesar
+    monkeypatch.setattr(alertas, "procesar", lambda nuevas, estado: procesadas.append(len(nuevas)) or procesar(nuevas, estado))
+    alertas.actualizar_alertas()
+    eventos = alertas.cargar_eventos("2024-01-01", "2024-01-31")
+
+    assert procesadas == [(completo['DateTime'] >= pd.Timestamp("2024-01-12 05:00")).sum()]
+    pd.testing.assert_frame_equal(eventos, alertas.reconstruir_alertas())
+    assert len(alertas.cargar_eventos("2024-01-15", "2024-01-15")) == (eventos['Fecha'] == "2024-01-15").sum()
+
+
+def test_la_pagina_solo_lee_el_estado(dirs):
+    _con_episodios(_datos_clean(2024, dias=20)).to_csv(dirs / "datos_Clean_2024.csv", index=False)
+    assert alertas.cargar_eventos().empty
+    assert not os.path.exists(alertas.ruta_estado())
+
+    eventos = alertas.actualizar_alertas()
+    assert not eventos.empty
+    pd.testing.assert_frame_equal(alertas.cargar_eventos(), eventos)
+
+
+def test_dias_anteriores_a_la_marca_reconstruyen(dirs):
+    ruta = dirs / "datos_Clean_2024.csv"
+    completo = _con_episodios(_datos_clean(2024, dias=20))
+    hueco = completo['DateTime'].dt.day == 10
+    completo[~hueco].to_csv(ruta, index=False)
+    alertas.actualizar_alertas()
+
+    completo[hueco].to_csv(ruta, mode="a", header=False, index=False)  # relleno posterior
+    data_loader.CACHE_DATOS.limpiar()
+    eventos = alertas.actualizar_alertas()
+    assert (eventos['Fecha'] == "2024-01-10").any()
+    pd.testing.assert_frame_equal(eventos, alertas.reconstruir_alertas())
@@ -0,0 +1,104 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+import pandas as pd
+import pytest
+
+from utils import almacen, columnar, data_loader, esquema
+
+
+def _datos_clean(anio, estaciones=("santa", "bine"), dias=40):
+    horas = pd.date_range(f"{anio}-01-01", periods=dias * 24, freq="h")
+    partes = []
+    for i, estacion in enumerate(estaciones):
+        df = pd.DataFrame({
+            'O3': [float((h + i) % 90) for h in range(len(horas))],
+            'O3_8hrs': float('nan'),
+            'NO2': [float((h * 3 + i) % 120) for h in range(len(horas))],
+            'CO': 300.0,
+            'SO2': 5.0,
+            'PM10': [float((h * 7 + i) % 200) for h in range(len(horas))],
+            'PM2_5': 20.0,
+            'Estacion': estacion,
+            'DateTime': horas,
+        })
+        df['Anio'] = df['DateTime'].dt.year
+        df['Mes'] = df['DateTime'].dt.month
+        df['Dia'] = df['DateTime'].dt.day
+        df['Hora'] = df['DateTime'].dt.hour
+        partes.append(df)
+    return esquema.aplicar_esquema(pd.concat(partes, ignore_index=True))
+
+
+@pytest.fixture
+def base(tmp_path, monkeypatch):
+    clean = tmp_path / "Clean"
+    clean.mkdir()
+    _datos_clean(2024).to_csv(clean / "datos_Clean_2024.csv", index=False)
+    ruta = str(tmp_path / "calidad_aire.sqlite")
+    monkeypatch.setattr(data_loader, "DIR_CLEAN", str(clean))
+    monkeypatch.setattr(columnar, "DIR_COLUMNAR", str(tmp_path / "Columnar"))
+    monkeypatch.setattr(almacen, "RUTA_DB", ruta)
+    return clean, ruta
+
+
+def _ordenar(df):
+    return df.sort_values(['Estacion', 'DateTime']).reset_index(drop=True)
+
+
+def test_reingesta_es_idempotente(base):
+    clean, ruta = base
+    assert almacen.ingestar_anio(2024, str(clean)) == 2 * 40 * 24
+    almacen.ingestar_anio(2024, str(clean))
+
+    # Un día repetido con valores corregidos reemplaza las filas existentes.
+    dia = _datos_clean(2024, estaciones=("santa",), dias=1).assign(PM10=999.0)
+    almacen.upsert(pd.concat([dia, dia]))
+
+    df = almacen.consultar()
+    assert len(df) == 2 * 40 * 24
+    assert not df.duplicated(['Estacion', 'DateTime']).any()
+    santa = df[df['Estacion'] == 'santa']
+    assert (santa['PM10'].head(24) == 999.0).all()
+    assert santa['O3_8hrs'].isna().all()
+
+
+def test_consulta_equivale_al_csv(base):
+    clean, _ = base
+    esperado = data_loader.cargar_rango("2024-01-05", "2024-01-20", estaciones=['bine'], columnas=['NO2'])
+    almacen.ingestar_anio(2024, str(clean))
+    data_loader.CACHE_DATOS.limpiar()
+
+    obtenido = data_loader.cargar_rango("2024-01-05", "2024-01-20", estaciones=['bine'], columnas=['NO2'])
+    assert list(obtenido.columns) == ['NO2', 'Estacion', 'DateTime']
+    pd.testing.assert_frame_equal(_ordenar(obtenido), _ordenar(esperado))
+    for columna, tipo in esquema.TIPOS.items():
+        if columna in obtenido:
+            assert str(obtenido[columna].dtype) == tipo, columna
+
+
+def test_filtros_usan_indices(base):
+    clean, ruta = base
+    almacen.ingestar_anio(2024, str(clean))
+
+    assert "PRIMARY KEY" in almacen.plan_consulta(estaciones=['santa'], desde="2024-01-05", hasta="2024-01-06")[0]
+    assert "idx_mediciones_fecha" in almacen.plan_consulta(desde="2024-01-05", hasta="2024-01-06")[0]
+    assert "idx_mediciones_mes" in almacen.plan_consulta(anio=2024, mes=2)[0]
+    assert len(almacen.consultar(anio=2024, mes=2)) == 2 * 9 * 24
+    assert data_loader.anios_disponibles() == [2024]
+
+
+def test_base_anterior_al_csv_no_se_usa(base):
+    clean, _ = base
+    almacen.ingestar_anio(2024, str(clean))
+    assert almacen.vigente(2024, str(clean))
+
+    _datos_clean(2024, estaciones=("santa",), dias=41).tail(24).to_csv(
+        clean / "datos_Clean_2024.csv", mode="a", header=False, index=False)
+    data_loader.CACHE_DATOS.limpiar()
+    assert not almacen.vigente(2024, str(clean))
+    assert len(data_loader.cargar_datos_por_anio(2024)) == 2 * 40 * 24 + 24
+    assert data_loader.extension_anio(2024)[0] == 2 * 40 * 24 + 24
+
+    almacen.ingestar_anio(2024, str(clean))
+    assert almacen.vigente(2024, str(clean))
+    assert len(almacen.consultar(anio=2024)) == 2 * 40 * 24 + 24
@@ -0,0 +1,113 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "notebooks", "scraping")))
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("httpx")
+import backfill
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "historial_ias.html")
+FECHAS = ["2025-03-01", "2025-03-02", "2025-03-03"]
+
+
+@pytest.fixture
+def servidor():
+    """Sitio local: responde el historial grabado, salvo las estaciones marcadas."""
+    with open(FIXTURE, encoding="utf-8") as f:
+        completo = f.read()
+    incompleto = "\n".join(l for l in completo.splitlines() if "23:00" not in l)
+    estado = {'peticiones': [], 'comportamiento': {}}
+
+    class Manejador(BaseHTTPRequestHandler):
+        def do_POST(self):
+            cuerpo = self.rfile.read(int(self.headers['Content-Length'])).decode("utf-8")
+            formulario = {k: v[0] for k, v in parse_qs(cuerpo).items()}
+            estado['peticiones'].append((formulario['his_fecha_IAS'], formulario['his_estacion_IAS']))
+            modo = estado['comportamiento'].get(formulario['his_estacion_IAS'], 'ok')
+            if modo == 'error':
+                self.send_response(500)
+                self.end_headers()
+                return
+            html = (completo if modo == 'ok' else incompleto).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(html)))
+            self.end_headers()
+            self.wfile.write(html)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}/historial", estado
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _correr(url, salida, estaciones):
+    return asyncio.run(backfill.backfill(
+        FECHAS, estaciones, str(salida), concurrencia=3, reintentos=2, espera=0,
+        url=url, por_segundo=0, espera_base=0,
+    ))
+
+
+def test_reanuda_solo_lo_pendiente(servidor, tmp_path):
+    url, estado = servidor
+    salida = tmp_path / "datos.csv"
+    estado['comportamiento'] = {'bine': 'incompleto', 'vel': 'error'}
+
+    resumen = _correr(url, salida, ["santa", "bine", "vel"])
+    assert resumen == {'completada': 3, 'parcial': 3, 'fallida': 3}
+    df = pd.read_csv(salida)
+    assert len(df) == 3 * 24 and set(df['Estacion']) == {'santa'}
+    assert list(df.columns) == backfill.COLUMNS
+
+    manifiesto = json.loads((tmp_path / "datos.csv.manifiesto.json").read_text(encoding="utf-8"))
+    assert manifiesto['unidades']['2025-03-01|bine']['filas'] == 23
+    assert manifiesto['unidades']['2025-03-02|vel']['ejecuciones'] == 1
+
+    # Interrupción a media escritura: bytes sin confirmar al final del CSV.
+    with open(salida, "a", encoding="utf-8") as f:
+        f.write("2025-03-04,00:00,1,2")
+
+    estado['comportamiento'] = {}
+    estado['peticiones'].clear()
+    resumen = _correr(url, salida, ["santa", "bine", "vel"])
+
+    assert resumen == {'completada': 9}
+    assert sorted(estado['peticiones']) == sorted((f, e) for f in FECHAS for e in ["bine", "vel"])
+    df = pd.read_csv(salida)
+    assert len(df) == 9 * 24
+    assert not df.duplicated(['Fecha', 'Hora', 'Estacion']).any()
+
+
+def test_conserva_csv_existente(servidor, tmp_path):
+    url, _ = servidor
+    salida = tmp_path / "datos.csv"
+    salida.write_text(",".join(backfill.COLUMNS) + "\n2025-01-01,00:00,1,2,3,4,5,6,7,santa\n", encoding="utf-8")
+
+    _correr(url, salida, ["santa"])
+    df = pd.read_csv(salida)
+    assert len(df) == 1 + 3 * 24
+    assert df.iloc[0]['Fecha'] == "2025-01-01"
+
+
+def test_csv_existente_sin_manifiesto_no_duplica(servidor, tmp_path):
+    url, estado = servidor
+    salida = tmp_path / "datos_2025.csv"
+    _correr(url, salida, ["santa", "bine"])
+    os.remove(tmp_path / "datos_2025.csv.manifiesto.json")
+
+    estado['peticiones'].clear()
+    resumen = _correr(url, salida, ["santa", "bine", "vel"])
+    assert resumen == {'completada': 9}
+    assert sorted(estado['peticiones']) == sorted((f, "vel") for f in FECHAS)
+    df = pd.read_csv(salida)
+    assert len(df) == 9 * 24
+    assert not df.duplicated(['Fecha', 'Hora', 'Estacion']).any()
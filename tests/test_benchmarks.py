@@ -0,0 +1,28 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "benchmarks")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+import pandas as pd
+
+import comparar
+import sinteticos
+from utils import esquema
+
+
+def test_generador_respeta_el_esquema(tmp_path):
+    filas = sinteticos.generar_clean(str(tmp_path), estaciones=7, anios=2, fin="2025-03-02")
+    assert filas == {2024: 7 * 366 * 24, 2025: 7 * 60 * 24}
+
+    df = esquema.leer_csv(str(tmp_path / "datos_Clean_2025.csv"))
+    assert list(df.columns) == esquema.COLUMNAS
+    assert sorted(df['Estacion'].cat.categories) == sinteticos.nombres_estaciones(7)
+    assert df['DateTime'].max() == pd.Timestamp("2025-03-01 23:00")
+    assert not df.duplicated(['Estacion', 'DateTime']).any()
+    assert 0 < df['PM10'].isna().mean() < 0.1
+
+
+def test_comparar_marca_regresiones():
+    base = {('caso', 5, 1): {'mediana_s': 0.10}, ('otro', 5, 1): {'mediana_s': 0.10}}
+    nuevo = {('caso', 5, 1): {'mediana_s': 0.11}, ('otro', 5, 1): {'mediana_s': 0.20}, ('nuevo', 5, 1): {'mediana_s': 1}}
+    filas, regresiones = comparar.comparar(base, nuevo, umbral=1.2)
+    assert len(filas) == 2
+    assert regresiones == [('otro', 5, 1)]
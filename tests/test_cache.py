@@ -0,0 +1,64 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+import pandas as pd
+
+from utils.cache import CacheLRU, huella_archivos
+
+
+def test_acierto_y_fallo():
+    cache = CacheLRU(max_bytes=100, tamano=len)
+    assert cache.obtener("a") == (False, None)
+    cache.guardar("a", b"1234")
+    assert cache.obtener("a") == (True, b"1234")
+
+    estadisticas = cache.estadisticas()
+    assert (estadisticas['aciertos'], estadisticas['fallos']) == (1, 1)
+    assert estadisticas['bytes'] == 4
+
+
+def test_desalojo_lru_por_bytes():
+    cache = CacheLRU(max_bytes=10, tamano=len)
+    cache.guardar("a", b"aaaa")
+    cache.guardar("b", b"bbbb")
+    cache.obtener("a")  # "b" pasa a ser la menos reciente
+    cache.guardar("c", b"cccc")
+
+    assert cache.obtener("b")[0] is False
+    assert cache.obtener("a")[0] is True
+    assert cache.obtener("c")[0] is True
+    assert cache.estadisticas()['desalojos'] == 1
+
+
+def test_valor_mayor_que_el_tope_no_se_guarda():
+    cache = CacheLRU(max_bytes=3, tamano=len)
+    cache.guardar("a", b"demasiado")
+    assert cache.estadisticas()['entradas'] == 0
+
+
+def test_invalidacion_por_cambio_de_archivo(tmp_path):
+    ruta = tmp_path / "datos.csv"
+    ruta.write_text("a\n1\n")
+    cache = CacheLRU(max_bytes=10_000)
+    cargas = []
+
+    def cargar():
+        cargas.append(1)
+        return pd.read_csv(ruta)
+
+    cache.obtener_o_cargar("k", huella_archivos([ruta]), cargar)
+    cache.obtener_o_cargar("k", huella_archivos([ruta]), cargar)
+    assert len(cargas) == 1
+
+    with open(ruta, "a") as f:
+        f.write("2\n")
+    df = cache.obtener_o_cargar("k", huella_archivos([ruta]), cargar)
+    assert len(cargas) == 2
+    assert len(df) == 2
+    assert cache.estadisticas()['invalidaciones'] == 1
+
+
+def test_obtener_o_cargar_entrega_copias():
+    cache = CacheLRU(max_bytes=10_000)
+    df = cache.obtener_o_cargar("k", None, lambda: pd.DataFrame({'x': [1, 2]}))
+    df['x'] = 0
+    assert cache.obtener_o_cargar("k", None, lambda: None)['x'].tolist() == [1, 2]
@@ -0,0 +1,108 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "notebooks", "scraping")))
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+import cliente_http
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "historial_ias.html")
+
+
+def _respuesta_grabada():
+    with open(FIXTURE, encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture
+def servidor():
+    """Servidor local que responde con el historial grabado y registra las peticiones."""
+    html = _respuesta_grabada().encode("utf-8")
+    estado = {'peticiones': [], 'fallos_pendientes': 0}
+
+    class Manejador(BaseHTTPRequestHandler):
+        def do_POST(self):
+            cuerpo = self.rfile.read(int(self.headers['Content-Length'])).decode("utf-8")
+            estado['peticiones'].append({k: v[0] for k, v in parse_qs(cuerpo).items()})
+            if estado['fallos_pendientes']:
+                estado['fallos_pendientes'] -= 1
+                self.send_response(503)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(html)))
+            self.end_headers()
+            self.wfile.write(html)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+    hilo = threading.Thread(target=httpd.serve_forever, daemon=True)
+    hilo.start()
+    yield f"http://127.0.0.1:{httpd.server_port}/historial", estado
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_extraer_filas_misma_regla_que_playwright():
+    filas = cliente_http.extraer_filas(_respuesta_grabada(), "2025-03-01", "santa")
+
+    assert len(filas) == 24
+    assert filas[0] == ["2025-03-01", "00:00", "20", "30", "15", "0.55", "0.003", "40", "10", "santa"]
+    # Fila de 7 celdas: se inserta O3 8hrs = NA
+    assert filas[5] == ["2025-03-01", "05:00", "31", "NA", "18", "0.62", "0.004", "27", "12", "santa"]
+    assert filas[7][-2] == "F.O."
+    assert all(len(f) == len(cliente_http.COLUMNS) for f in filas)
+
+
+def test_dia_incompleto_se_descarta():
+    incompleto = "\n".join(l for l in _respuesta_grabada().splitlines() if "23:00" not in l)
+    assert cliente_http.extraer_filas(incompleto, "2025-03-01", "santa") == []
+
+
+def test_descarga_concurrente(servidor):
+    url, estado = servidor
+    fechas = ["2025-03-01", "2025-03-02"]
+    filas = asyncio.run(cliente_http.descargar(fechas, ["santa", "bine"], url=url, por_segundo=0))
+
+    assert len(filas) == 4 * 24
+    assert [(f[0], f[-1]) for f in filas[::24]] == [
+        ("2025-03-01", "santa"), ("2025-03-02", "santa"), ("2025-03-01", "bine"), ("2025-03-02", "bine"),
+    ]
+    assert {(p['his_fecha_IAS'], p['his_estacion_IAS']) for p in estado['peticiones']} == {
+        (f, e) for f in fechas for e in ["santa", "bine"]
+    }
+
+
+def test_reintenta_errores_del_servidor(servidor):
+    url, estado = servidor
+    estado['fallos_pendientes'] = 2
+    filas = asyncio.run(cliente_http.descargar(["2025-03-01"], ["vel"], url=url, por_segundo=0, espera_base=0))
+    assert len(filas) == 24
+    assert len(estado['peticiones']) == 3
+
+
+def test_agota_reintentos(servidor):
+    url, estado = servidor
+    estado['fallos_pendientes'] = 10
+
+    async def pedir():
+        async with cliente_http.ClienteHistorial(url=url, por_segundo=0, reintentos=1, espera_base=0) as cliente:
+            return await cliente.descargar("2025-03-01", "vel")
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(pedir())
+    assert len(estado['peticiones']) == 2
+
+
+def test_cli_experimental_pide_confirmacion(monkeypatch, tmp_path):
+    monkeypatch.setattr(sys, "argv", ["cliente_http.py", "2025-03-01", "2025-03-01", "--salida", str(tmp_path / "x.csv")])
+    with pytest.raises(SystemExit, match="experimental"):
+        cliente_http.main()
+    assert not (tmp_path / "x.csv").exists()
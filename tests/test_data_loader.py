@@ -0,0 +1,164 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+import pandas as pd
+import pytest
+
+from utils import almacen, columnar, data_loader, esquema
+
+requiere_parquet = pytest.mark.skipif(not columnar.HAY_PARQUET, reason="pyarrow no instalado")
+
+
+def _datos_clean(anio, estaciones=("santa", "bine"), dias=40):
+    horas = pd.date_range(f"{anio}-01-01", periods=dias * 24, freq="h")
+    partes = []
+    for i, estacion in enumerate(estaciones):
+        df = pd.DataFrame({
+            'O3': [float((h + i) % 90) for h in range(len(horas))],
+            'O3_8hrs': float('nan'),
+            'NO2': [float((h * 3 + i) % 120) for h in range(len(horas))],
+            'CO': 300.0,
+            'SO2': 5.0,
+            'PM10': [float((h * 7 + i) % 200) for h in range(len(horas))],
+            'PM2_5': 20.0,
+            'Estacion': estacion,
+            'DateTime': horas,
+        })
+        df['Anio'] = df['DateTime'].dt.year
+        df['Mes'] = df['DateTime'].dt.month
+        df['Dia'] = df['DateTime'].dt.day
+        df['Hora'] = df['DateTime'].dt.hour
+        partes.append(df)
+    return pd.concat(partes, ignore_index=True)
+
+
+@pytest.fixture
+def dirs(tmp_path, monkeypatch):
+    clean = tmp_path / "Clean"
+    clean.mkdir()
+    _datos_clean(2024).to_csv(clean / "datos_Clean_2024.csv", index=False)
+    monkeypatch.setattr(data_loader, "DIR_CLEAN", str(clean))
+    monkeypatch.setattr(columnar, "DIR_COLUMNAR", str(tmp_path / "Columnar"))
+    monkeypatch.setattr(almacen, "RUTA_DB", str(tmp_path / "calidad_aire.sqlite"))
+    return clean, tmp_path / "Columnar"
+
+
+def _ordenar(df):
+    return df.sort_values(['Estacion', 'DateTime']).reset_index(drop=True)
+
+
+def test_respaldo_csv_sin_particiones(dirs):
+    df = data_loader.cargar_datos_por_anio(2024)
+    assert len(df) == 2 * 40 * 24
+    assert pd.api.types.is_datetime64_any_dtype(df['DateTime'])
+
+
+@requiere_parquet
+def test_parquet_equivale_a_csv(dirs):
+    clean, destino = dirs
+    esperado = data_loader.cargar_datos_por_anio(2024)
+    columnar.exportar_anio(2024, str(clean), str(destino))
+    assert columnar.existe_anio(2024, str(destino))
+
+    obtenido = data_loader.cargar_datos_por_anio(2024)
+    pd.testing.assert_frame_equal(_ordenar(obtenido), _ordenar(esperado), check_dtype=False)
+
+
+@pytest.mark.parametrize("exportar", [False, pytest.param(True, marks=requiere_parquet)])
+def test_proyeccion_y_estaciones(dirs, exportar):
+    clean, destino = dirs
+    if exportar:
+        columnar.exportar_anio(2024, str(clean), str(destino))
+
+    df = data_loader.cargar_datos_por_anio(2024, columnas=['PM10'], estaciones=['bine'])
+    assert set(df.columns) == {'PM10', 'Estacion', 'DateTime'}
+    assert set(df['Estacion']) == {'bine'}
+    assert len(df) == 40 * 24
+
+
+@requiere_parquet
+def test_particiones_anteriores_al_csv_se_ignoran(dirs):
+    clean, destino = dirs
+    columnar.exportar_anio(2024, str(clean), str(destino))
+    data_loader.CACHE_DATOS.limpiar()
+
+    ruta = clean / "datos_Clean_2024.csv"
+    _datos_clean(2024, estaciones=("santa",), dias=41).tail(24).to_csv(ruta, mode="a", header=False, index=False)
+    posterior = os.path.getmtime(columnar.ruta_particion(2024, "santa", str(destino))) + 10
+    os.utime(ruta, (posterior, posterior))
+    assert not columnar.vigente(2024, str(clean), str(destino))
+    assert len(data_loader.cargar_datos_por_anio(2024)) == 2 * 40 * 24 + 24
+
+    columnar.exportar_anio(2024, str(clean), str(destino))
+    for estacion in columnar.estaciones_disponibles(2024, str(destino)):
+        os.utime(columnar.ruta_particion(2024, estacion, str(destino)), (posterior, posterior))
+    assert columnar.vigente(2024, str(clean), str(destino))
+    assert len(data_loader.cargar_datos_por_anio(2024)) == 2 * 40 * 24 + 24
+
+
+@requiere_parquet
+def test_filtro_de_fechas_en_parquet(dirs):
+    clean, destino = dirs
+    columnar.exportar_anio(2024, str(clean), str(destino))
+
+    df = columnar.leer_anio(2024, desde="2024-01-10", hasta="2024-01-11", base=str(destino))
+    assert len(df) == 2 * 24
+    assert df['DateTime'].dt.date.nunique() == 1
+
+
+def test_cache_compartida_se_invalida_al_agregar_un_dia(dirs):
+    clean, _ = dirs
+    data_loader.CACHE_DATOS.limpiar()
+    antes = data_loader.estadisticas_cache()
+
+    data_loader.cargar_datos_por_anio(2024)
+    data_loader.cargar_datos_por_anio(2024)
+    despues = data_loader.estadisticas_cache()
+    assert despues['aciertos'] - antes['aciertos'] == 1
+
+    nuevo = _datos_clean(2024, estaciones=("santa",), dias=41).tail(24)
+    nuevo.to_csv(clean / "datos_Clean_2024.csv", mode="a", header=False, index=False)
+    df = data_loader.cargar_datos_por_anio(2024)
+    assert len(df) == 2 * 40 * 24 + 24
+    assert data_loader.estadisticas_cache()['invalidaciones'] > antes['invalidaciones']
+
+
+def test_anio_completo_se_guarda_una_sola_vez(dirs):
+    data_loader.CACHE_DATOS.limpiar()
+    data_loader.cargar_datos_por_anio(2024)
+    data_loader.cargar_rango("2024-01-01", "2024-02-09")
+    claves = [clave[0] for clave in data_loader.CACHE_DATOS._entradas]
+    assert 'csv' not in claves
+    assert claves.count('anio') == 2  # el año completo y el rango recortado
+
+
+def test_cargar_rango_cruza_anios(dirs):
+    clean, _ = dirs
+    _datos_clean(2025).to_csv(clean / "datos_Clean_2025.csv", index=False)
+
+    df = data_loader.cargar_rango("2024-02-08", "2025-01-02", estaciones=['santa'], columnas=['O3'])
+    assert set(df.columns) == {'O3', 'Estacion', 'DateTime'}
+    assert len(df) == 4 * 24
+    assert df['DateTime'].min() == pd.Timestamp("2024-02-08")
+    assert df['DateTime'].max() == pd.Timestamp("2025-01-02 23:00")
+
+
+def test_cargar_rango_sin_archivos_devuelve_vacio(dirs):
+    df = data_loader.cargar_rango("2030-01-01", "2030-01-07", columnas=['O3'])
+    assert df.empty
+    assert pd.api.types.is_datetime64_any_dtype(df['DateTime'])
+    assert data_loader.anios_disponibles() == [2024]
+
+
+@pytest.mark.parametrize("exportar", [False, pytest.param(True, marks=requiere_parquet)])
+def test_tipos_compactos_del_esquema(dirs, exportar):
+    clean, destino = dirs
+    _datos_clean(2025).to_csv(clean / "datos_Clean_2025.csv", index=False)
+    if exportar:
+        columnar.exportar_anio(2024, str(clean), str(destino))
+        columnar.exportar_anio(2025, str(clean), str(destino))
+
+    df = data_loader.cargar_rango("2024-01-01", "2025-12-31")
+    for columna, tipo in esquema.TIPOS.items():
+        assert str(df[columna].dtype) == tipo, columna
+    assert pd.api.types.is_datetime64_any_dtype(df['DateTime'])
+    assert sorted(df['Estacion'].cat.categories) == ['bine', 'santa']
@@ -0,0 +1,110 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+import io
+import json
+import logging
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import pandas as pd
+import pytest
+
+from utils import diagnostico, figuras
+from utils.cache import CacheLRU
+
+
+@pytest.fixture
+def medicion():
+    diagnostico.iniciar("prueba")
+    diagnostico._local.activo = True
+    figuras.CACHE_FIGURAS.limpiar()
+    yield
+    diagnostico._local.activo = False
+    figuras.CACHE_FIGURAS.limpiar()
+
+
+def test_desactivado_no_registra_nada():
+    diagnostico.iniciar("prueba")
+    diagnostico._local.activo = False
+
+    @diagnostico.medido()
+    def suma(df):
+        return df.sum()
+
+    assert suma(pd.DataFrame({'a': [1, 2]}))['a'] == 3
+    with diagnostico.span("bloque"):
+        diagnostico.seccion("seccion")
+    assert diagnostico.spans() == []
+
+
+def test_spans_anidados_con_filas_y_cache(medicion):
+    cache = CacheLRU(max_bytes=10, tamano=lambda valor: 1)
+
+    @diagnostico.medido("prueba.cargar")
+    def cargar(n):
+        return cache.obtener_o_cargar(('filas', n), None, lambda: pd.DataFrame({'a': range(n)}))
+
+    @diagnostico.medido()
+    def filtrar(df):
+        return df[df['a'] % 2 == 0]
+
+    diagnostico.seccion("Carga")
+    df = cargar(10)
+    cargar(10)
+    diagnostico.seccion("Filtro")
+    filtrar(df)
+    diagnostico._cerrar_seccion(diagnostico._estado())
+
+    registros = {r['span']: r for r in diagnostico.spans() if r['span'] != "prueba.cargar"}
+    cargas = [r for r in diagnostico.spans() if r['span'] == "prueba.cargar"]
+    assert [(r['fallos_cache'], r['aciertos_cache'], r['filas_salida']) for r in cargas] == [(1, 0, 10), (0, 1, 10)]
+    assert all(r['profundidad'] == 1 for r in cargas)
+    assert registros["Carga"]['tipo'] == "seccion"
+    assert (registros["Carga"]['aciertos_cache'], registros["Carga"]['fallos_cache']) == (1, 1)
+    assert registros["test_diagnostico.filtrar"]['filas_entrada'] == 10
+    assert registros["test_diagnostico.filtrar"]['filas_salida'] == 5
+
+    tabla = diagnostico.resumen(diagnostico.spans())
+    assert list(tabla['nombre'])[:2] == ["Carga", "  prueba.cargar"]
+
+
+def test_figura_cacheada_mide_dibujo_y_png(medicion):
+    @figuras.figura_cacheada
+    def grafica(df):
+        fig, ax = plt.subplots()
+        df['a'].plot(ax=ax)
+        return fig
+
+    df = pd.DataFrame({'a': [1.0, 2.0, 3.0]})
+    grafica(df)
+    grafica(df)
+    nombres = [r['span'] for r in diagnostico.spans()]
+    assert nombres == ["grafica/dibujar", "grafica/png", "graficos.grafica", "graficos.grafica"]
+    assert diagnostico.spans()[-1]['aciertos_cache'] == 1
+
+
+def test_log_json_y_error(medicion, caplog):
+    caplog.set_level(logging.INFO, logger="calidad_aire.diagnostico")
+    with pytest.raises(ValueError):
+        with diagnostico.span("falla"):
+            raise ValueError("x")
+
+    registro = json.loads(caplog.records[-1].getMessage())
+    assert registro['span'] == "falla"
+    assert registro['pagina'] == "prueba"
+    assert registro['error'] == "ValueError"
+
+
+def test_log_llega_al_manejador_sin_forzar_nivel(medicion):
+    salida = io.StringIO()
+    anterior = diagnostico.manejador.setStream(salida)
+    try:
+        with diagnostico.span("visible"):
+            pass
+    finally:
+        diagnostico.manejador.setStream(anterior)
+
+    assert json.loads(salida.getvalue().split(" calidad_aire.diagnostico ")[-1])['span'] == "visible"
+    diagnostico._configurar_logger()
+    assert diagnostico.logger.handlers.count(diagnostico.manejador) == 1
@@ -0,0 +1,76 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import esquema, estacionales
+
+COLUMNAS_R = ["Fecha_Hora", "O3_Horario", "O3_8H", "NO2", "CO_8H", "SO2_24H", "PM_10", "PM_2.5"]
+
+
+def _archivo_r(ruta, inicio, horas, semilla, sin=()):
+    """Archivo con el formato de ``write.csv`` de R: índice sin nombre y ``NA``."""
+    generador = np.random.default_rng(semilla)
+    df = pd.DataFrame({"Fecha_Hora": pd.date_range(inicio, periods=horas, freq="h")})
+    for columna in COLUMNAS_R[1:]:
+        if columna not in sin:
+            df[columna] = generador.integers(0, 200, horas).astype(float)
+            df.loc[df.index % 7 == 0, columna] = np.nan
+    df.index += 1
+    df.to_csv(ruta, na_rep="NA")
+
+
+def _notebook(origen, nombres):
+    """Los pasos de notebooks/01_5_Limpieza2.ipynb, tal cual."""
+    dfs = []
+    for path in nombres:
+        df = pd.read_csv(os.path.join(origen, path))
+        df.rename(columns=estacionales.RENOMBRAR, inplace=True)
+        df['DateTime'] = pd.to_datetime(df['DateTime'], errors='coerce')
+        df['Anio'] = df['DateTime'].dt.year
+        df['Mes'] = df['DateTime'].dt.month
+        df['Dia'] = df['DateTime'].dt.day
+        df['Hora'] = df['DateTime'].dt.hour
+        df['Estacion'] = path.split("20")[0]
+        for col in esquema.COLUMNAS:
+            if col not in df.columns:
+                df[col] = np.nan
+        dfs.append(df[esquema.COLUMNAS])
+    return esquema.aplicar_esquema(pd.concat(dfs, ignore_index=True))
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    origen, destino = tmp_path / "Estacionales", tmp_path / "Clean"
+    origen.mkdir()
+    destino.mkdir()
+    return str(origen), str(destino)
+
+
+def _ordenar(df):
+    return df.sort_values(['Estacion', 'DateTime']).reset_index(drop=True)
+
+
+def test_equivale_al_notebook_y_queda_en_orden_de_tiempo(dirs):
+    origen, destino = dirs
+    nombres = ["bine2022_corregido.csv", "santa2022_corregido.csv", "vel2022_corregido.csv"]
+    for i, nombre in enumerate(nombres):
+        _archivo_r(os.path.join(origen, nombre), "2022-01-01", 24 * 10, i, sin=("O3_8H",) if i == 2 else ())
+
+    assert estacionales.armonizar_todo(origen, destino, procesos=2) == {2022: 3 * 24 * 10}
+    df = esquema.leer_csv(os.path.join(destino, "datos_Clean_2022.csv"))
+    assert df['DateTime'].is_monotonic_increasing
+    assert list(df['Estacion'].head(3)) == ['bine', 'santa', 'vel']
+    pd.testing.assert_frame_equal(_ordenar(df), _ordenar(_notebook(origen, nombres)))
+
+
+def test_reparte_por_anio_y_descarta_repetidos(dirs):
+    origen, destino = dirs
+    _archivo_r(os.path.join(origen, "utp2021_corregido.csv"), "2021-12-31", 48, 0)
+    _archivo_r(os.path.join(origen, "utp2022_corregido.csv"), "2022-01-01", 24, 0)
+
+    assert estacionales.armonizar_todo(origen, destino, procesos=2) == {2021: 24, 2022: 24}
+    df = esquema.leer_csv(os.path.join(destino, "datos_Clean_2022.csv"))
+    assert not df.duplicated(['Estacion', 'DateTime']).any()
+    assert sorted(os.listdir(destino)) == ["datos_Clean_2021.csv", "datos_Clean_2022.csv"]
@@ -0,0 +1,36 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+import pandas as pd
+
+from utils import estaciones
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def test_catalogo_del_repositorio():
+    catalogo = estaciones.catalogo(os.path.join(RAIZ, "data", "estaciones-Puebla_sinaica.csv"))
+    assert set(catalogo.claves(estaciones.RED_PUEBLA)) == {'santa', 'bine', 'ninfas', 'utp', 'vel'}
+    assert catalogo.nombre('vel') == "Velódromo"
+    assert catalogo.nombre('desconocida') == "desconocida"
+    assert catalogo.etiqueta('bine') == "Benemérito Instituto Normal del Estado (BINE)"
+    assert catalogo.etiqueta('utp') == "Universidad Tecnológica de Puebla (UTP)"
+    assert catalogo.etiqueta('vel') == "Velódromo"
+    assert catalogo.geometria('santa') == {"type": "Point", "coordinates": [-98.249527, 18.988747]}
+
+
+def test_red_opcional_y_relectura(tmp_path):
+    ruta = str(tmp_path / "estaciones.csv")
+    pd.DataFrame({'Estaciones': ['a', 'b'], 'lat': [19.0, 19.1], 'long': [-98.2, -98.3],
+                  'nombre': ['A', 'B']}).to_csv(ruta, index=False)
+    catalogo = estaciones.catalogo(ruta)
+    assert catalogo is estaciones.catalogo(ruta)
+    assert list(catalogo) == ['a', 'b'] and 'b' in catalogo and len(catalogo) == 2
+    assert catalogo.claves(estaciones.RED_PUEBLA) == ['a', 'b']
+    assert catalogo.etiqueta('b') == "B"
+
+    pd.DataFrame({'Estaciones': ['a', 'b', 'c'], 'lat': [19.0, 19.1, 19.2], 'long': [-98.2, -98.3, -98.4],
+                  'nombre': ['A', 'B', 'C'], 'red': ['Puebla', 'SINAICA', 'SINAICA']}).to_csv(ruta, index=False)
+    os.utime(ruta, ns=(0, 10 ** 18))
+    catalogo = estaciones.catalogo(ruta)
+    assert catalogo.claves('SINAICA') == ['b', 'c']
+    assert catalogo.coordenadas('c') == (19.2, -98.4)
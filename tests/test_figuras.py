@@ -0,0 +1,58 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import pandas as pd
+import pytest
+
+from utils import figuras
+
+
+@pytest.fixture(autouse=True)
+def cache_limpia():
+    figuras.CACHE_FIGURAS.limpiar()
+    yield
+    figuras.CACHE_FIGURAS.limpiar()
+
+
+def _grafica_contada():
+    llamadas = []
+
+    @figuras.figura_cacheada
+    def grafica(df, contaminante):
+        llamadas.append(contaminante)
+        fig, ax = plt.subplots()
+        df[contaminante].plot(ax=ax)
+        return fig
+
+    return grafica, llamadas
+
+
+def test_repeticion_usa_png_guardado():
+    grafica, llamadas = _grafica_contada()
+    df = pd.DataFrame({'O3': [1.0, 2.0, 3.0], 'NO2': [3.0, 2.0, 1.0]})
+
+    png = grafica(df, 'O3')
+    assert png.startswith(b"\x89PNG")
+    assert grafica(df.copy(), 'O3') == png
+    assert llamadas == ['O3']
+    assert not plt.get_fignums()
+
+
+def test_clave_depende_de_argumentos_y_datos():
+    grafica, llamadas = _grafica_contada()
+    df = pd.DataFrame({'O3': [1.0, 2.0, 3.0], 'NO2': [3.0, 2.0, 1.0]})
+
+    grafica(df, 'O3')
+    grafica(df, 'NO2')
+    grafica(df.assign(O3=[1.0, 2.0, 4.0]), 'O3')
+    assert llamadas == ['O3', 'NO2', 'O3']
+    assert figuras.estadisticas_cache_figuras()['entradas'] == 3
+
+
+def test_huella_datos_incluye_tipos():
+    df = pd.DataFrame({'O3': [1, 2]})
+    assert figuras.huella_datos(df) == figuras.huella_datos(df.copy())
+    assert figuras.huella_datos(df) != figuras.huella_datos(df.astype('float32'))
+    assert figuras.huella_datos(['santa', 'bine']) != figuras.huella_datos(['bine', 'santa'])
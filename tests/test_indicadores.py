@@ -0,0 +1,113 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import almacen, columnar, data_loader, indicadores
+from utils.levels_contaminacion import clasificar_tabla
+from test_data_loader import _datos_clean, requiere_parquet
+
+
+@pytest.fixture
+def dirs(tmp_path, monkeypatch):
+    clean = tmp_path / "Clean"
+    clean.mkdir()
+    _datos_clean(2024).to_csv(clean / "datos_Clean_2024.csv", index=False)
+    monkeypatch.setattr(data_loader, "DIR_CLEAN", str(clean))
+    monkeypatch.setattr(columnar, "DIR_COLUMNAR", str(tmp_path / "Columnar"))
+    monkeypatch.setattr(almacen, "RUTA_DB", str(tmp_path / "calidad_aire.sqlite"))
+    monkeypatch.setattr(indicadores, "DIR_INDICADORES", str(tmp_path / "Indicadores"))
+    data_loader.CACHE_DATOS.limpiar()
+    yield clean
+    data_loader.CACHE_DATOS.limpiar()
+
+
+def _con_huecos(df):
+    """Quita horas sueltas y un bloque largo para probar la regla de cobertura."""
+    rng = np.random.default_rng(1)
+    df = df[rng.random(len(df)) > 0.1].copy()
+    df.loc[df.index[200:260], 'PM10'] = np.nan
+    return df.reset_index(drop=True)
+
+
+def _rolling(df, contaminante):
+    """Referencia lenta: ``rolling`` por estación sobre una ventana de tiempo."""
+    ventana = indicadores.VENTANAS[contaminante]
+    serie = (df.set_index('DateTime').sort_index()
+             .groupby('Estacion', observed=True)[contaminante]
+             .rolling(f"{ventana}h", min_periods=indicadores.minimo_horas(ventana)).mean())
+    return serie.rename('esperado').reset_index()
+
+
+def test_cobertura_minima():
+    valores = np.array([1.0, 2.0, np.nan, 4.0, 5.0, 6.0, 7.0, 8.0, np.nan, np.nan])
+    promedio = indicadores.promedios_moviles(valores, 8)
+    assert np.isnan(promedio[:5]).all()  # menos de 6 horas válidas
+    assert promedio[7] == pytest.approx(np.mean([1, 2, 4, 5, 6, 7, 8]))
+    assert promedio[8] == pytest.approx(np.mean([2, 4, 5, 6, 7, 8]))
+    assert np.isnan(promedio[9])
+
+
+@pytest.mark.parametrize("contaminante", sorted(indicadores.VENTANAS))
+def test_equivale_a_rolling_por_estacion(contaminante):
+    df = _con_huecos(_datos_clean(2024, estaciones=("santa", "bine", "vel"), dias=10))
+    obtenido = indicadores.calcular(df)
+    assert obtenido.index.equals(df.index)
+
+    comparado = obtenido.merge(_rolling(df, contaminante), on=['Estacion', 'DateTime'])
+    np.testing.assert_allclose(comparado[indicadores.INDICADORES[contaminante]], comparado['esperado'], rtol=1e-5)
+
+
+def test_actualizacion_por_tandas():
+    df = _con_huecos(_datos_clean(2024, dias=6))
+    completo = indicadores.calcular(df).sort_values(['Estacion', 'DateTime']).reset_index(drop=True)
+
+    partes, contexto = [], None
+    for dia, tanda in df.groupby(df['DateTime'].dt.date):
+        calculados, contexto = indicadores.actualizar(tanda, contexto)
+        assert contexto['DateTime'].nunique() <= indicadores.VENTANA_MAXIMA - 1
+        partes.append(calculados)
+    por_tandas = pd.concat(partes).sort_values(['Estacion', 'DateTime']).reset_index(drop=True)
+    pd.testing.assert_frame_equal(por_tandas, completo, check_categorical=False)
+
+
+@requiere_parquet
+def test_persistencia_incremental_y_clasificacion(dirs, monkeypatch):
+    ruta = dirs / "datos_Clean_2024.csv"
+    completo = _datos_clean(2024, dias=41)
+    completo[completo['DateTime'] < pd.Timestamp("2024-02-10 07:00")].to_csv(ruta, index=False)
+    indicadores.construir_indicadores(2024)
+
+    completo[completo['DateTime'] >= pd.Timestamp("2024-02-10 07:00")].to_csv(
+        ruta, mode="a", header=False, index=False)
+    data_loader.CACHE_DATOS.limpiar()
+
+    def anio_completo(*args, **kwargs):
+        raise AssertionError("se leyó el año completo")
+
+    with monkeypatch.context() as parche:
+        parche.setattr(data_loader, "_leer_csv_sin_cache", anio_completo)
+        indicadores.actualizar_indicadores(2024)
+    incremental = indicadores.cargar_indicadores("2024-01-01", "2024-12-31")
+    reconstruido = indicadores.construir_indicadores(2024)
+    orden = ['Estacion', 'DateTime']
+    pd.testing.assert_frame_equal(incremental.sort_values(orden).reset_index(drop=True),
+                                  reconstruido.sort_values(orden).reset_index(drop=True), check_categorical=False)
+
+    maximos = incremental.groupby('Estacion', observed=True)[list(indicadores.INDICADORES.values())].max()
+    _, niveles, _ = clasificar_tabla(maximos)
+    assert list(niveles.columns) == list(indicadores.INDICADORES.values())
+    assert (niveles['PM10_24h'] > 0).all()
+
+
+def test_sin_tabla_la_carga_solo_calcula_lo_pedido(dirs):
+    dia = indicadores.cargar_indicadores("2024-02-05", "2024-02-05")
+    assert not os.path.exists(indicadores.DIR_INDICADORES)
+    assert dia['DateTime'].dt.date.astype(str).unique().tolist() == ["2024-02-05"]
+
+    completo = indicadores.calcular(data_loader.cargar_datos_por_anio(2024))
+    esperado = completo[completo['DateTime'].dt.date.astype(str) == "2024-02-05"]
+    orden = ['Estacion', 'DateTime']
+    pd.testing.assert_frame_equal(dia.sort_values(orden).reset_index(drop=True),
+                                  esperado.sort_values(orden).reset_index(drop=True), check_categorical=False)
@@ -0,0 +1,63 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+import pandas as pd
+import pytest
+
+from utils import esquema, indice_dias
+
+
+def _datos(estaciones, dias, inicio="2025-01-01"):
+    horas = pd.date_range(inicio, periods=dias * 24, freq="h")
+    partes = [
+        pd.DataFrame({'O3': range(len(horas)), 'Estacion': estacion, 'DateTime': horas})
+        for estacion in estaciones
+    ]
+    return pd.concat(partes, ignore_index=True)
+
+
+@pytest.fixture
+def ruta(tmp_path):
+    ruta = tmp_path / "datos_Clean_2025.csv"
+    _datos(["santa", "bine"], 5).to_csv(ruta, index=False)
+    indice_dias._indices.clear()
+    return str(ruta)
+
+
+def test_lee_solo_los_dias_pedidos(ruta):
+    df = indice_dias.leer_dias(ruta, ["2025-01-03"])
+    completo = esquema.leer_csv(ruta)
+    esperado = completo[completo['DateTime'].dt.date == pd.Timestamp("2025-01-03").date()]
+    pd.testing.assert_frame_equal(df, esperado.reset_index(drop=True))
+
+    indice = indice_dias.actualizar_indice(ruta)
+    assert len(indice['dias']['2025-01-03']) == 2  # un rango por estación
+    assert os.path.exists(indice_dias.ruta_indice(ruta))
+
+
+def test_dia_inexistente_devuelve_vacio(ruta):
+    df = indice_dias.leer_dias(ruta, ["2024-12-31"], columnas=['O3', 'DateTime'])
+    assert df.empty
+    assert list(df.columns) == ['O3', 'DateTime']
+    assert pd.api.types.is_datetime64_any_dtype(df['DateTime'])
+
+
+def test_actualizacion_incremental_al_agregar_un_dia(ruta):
+    antes = dict(indice_dias.actualizar_indice(ruta))
+    indice_dias._indices.clear()  # obliga a partir del índice persistido
+
+    nuevo = _datos(["santa"], 1, inicio="2025-01-06")
+    nuevo.to_csv(ruta, mode="a", header=False, index=False)
+    indice = indice_dias.actualizar_indice(ruta)
+
+    assert indice['tamano'] == os.path.getsize(ruta) > antes['tamano']
+    assert indice['dias']['2025-01-06'] == [[antes['tamano'], indice['tamano']]]
+    assert len(indice_dias.leer_dias(ruta, ["2025-01-06"])) == 24
+
+
+def test_reconstruye_si_el_archivo_se_reescribe(ruta):
+    indice_dias.actualizar_indice(ruta)
+    _datos(["vel"], 2).to_csv(ruta, index=False)
+
+    df = indice_dias.leer_dias(ruta, ["2025-01-01", "2025-01-02"])
+    assert set(df['Estacion']) == {"vel"}
+    assert len(df) == 48
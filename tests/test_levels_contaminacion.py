@@ -1,10 +1,16 @@
 import os, sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import numpy as np
+import pandas as pd
 import pytest
 
 from app.utils.levels_contaminacion import (
     menu_contaminante,
+    clasificar_niveles,
+    clasificar_tabla,
+    clasificar_vectorizado,
     colores_por_nivel,
+    limites_por_contaminante,
     clasificar_o3,
     clasificar_no2,
     clasificar_co,
@@ -123,3 +129,35 @@ def test_clasificar_pm25(valor, categoria, nivel):
 
 def test_menu_contaminante_desconocido():
     assert menu_contaminante("XYZ", 100) == ("Desconocido", 0, "gray")
+
+
+@pytest.mark.parametrize("contaminante", sorted(limites_por_contaminante))
+def test_clasificar_vectorizado_igual_a_escalar(contaminante):
+    limites = np.array(limites_por_contaminante[contaminante], dtype=float)
+    rng = np.random.default_rng(0)
+    valores = np.concatenate([
+        limites, limites - 0.5, limites + 0.5, [0.0, -1.0],
+        rng.uniform(0, limites[-1] * 1.5, 500),
+    ])
+
+    categorias, niveles, colores = clasificar_vectorizado(contaminante, valores)
+    esperado = [menu_contaminante(contaminante, v) for v in valores]
+    assert list(zip(categorias, niveles.tolist(), colores)) == esperado
+
+
+def test_clasificar_vectorizado_faltantes_y_desconocido():
+    assert clasificar_niveles("O3", [np.nan, 10]).tolist() == [0, 1]
+    categorias, niveles, colores = clasificar_vectorizado("XYZ", [100, 200])
+    assert list(zip(categorias, niveles.tolist(), colores)) == [("Desconocido", 0, "gray")] * 2
+
+
+def test_clasificar_tabla():
+    df = pd.DataFrame(
+        {'O3': [50.0, 150.0], 'PM10': [np.nan, 250.0], 'Otra': [1, 2]},
+        index=['santa', 'bine'],
+    )
+    categorias, niveles, colores = clasificar_tabla(df)
+    assert list(niveles.columns) == ['O3', 'PM10']
+    assert niveles.loc['bine'].tolist() == [4, 5]
+    assert categorias.loc['santa', 'PM10'] == "Desconocido"
+    assert colores.loc['santa', 'O3'] == colores_por_nivel[1]
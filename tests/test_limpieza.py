@@ -0,0 +1,129 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+import pandas as pd
+import pytest
+
+from utils import esquema, limpieza
+
+COLUMNAS_CRUDAS = ['Fecha', 'Hora', 'O3', 'O3 8hrs', 'NO2', 'CO', 'SO2', 'PM-10', 'PM-2.5', 'Estacion']
+
+
+def _crudo(fechas, estaciones=("santa", "bine"), ppm=False):
+    filas = []
+    for estacion in estaciones:
+        for fecha in fechas:
+            for hora in range(24):
+                o3 = (hora + 10) / (1000 if ppm else 1)
+                valores = [o3, "NA", 0.02 if ppm else 20, 0.5, "F.O." if hora == 3 else 0.004, 40, "Sin dato"]
+                filas.append([fecha, f"{hora:02d}:00"] + valores + [estacion])
+    return pd.DataFrame(filas, columns=COLUMNAS_CRUDAS)
+
+
+def _notebook(df):
+    """Los pasos de notebooks/01_limpieza.ipynb, tal cual."""
+    df_clean = df.copy()
+    df_clean['DateTime'] = pd.to_datetime(df_clean['Fecha'] + ' ' + df_clean['Hora'], format='%Y-%m-%d %H:%M')
+    df_clean.drop(columns=['Fecha', 'Hora'], inplace=True)
+    df_clean.columns = ['O3', 'O3_8hrs', 'NO2', 'CO', 'SO2', 'PM10', 'PM2_5', 'Estacion', 'DateTime']
+    cols_numeric = ['O3', 'O3_8hrs', 'NO2', 'CO', 'SO2', 'PM10', 'PM2_5']
+    df_clean[cols_numeric] = df_clean[cols_numeric].apply(pd.to_numeric, errors='coerce')
+    if df_clean['O3'].max() < 1:
+        df_clean['O3'] *= 1000
+        df_clean['O3_8hrs'] *= 1000
+        df_clean['CO'] *= 100
+        df_clean['NO2'] *= 1000
+        df_clean['SO2'] *= 1000
+    df_clean['Anio'] = df_clean['DateTime'].dt.year
+    df_clean['Mes'] = df_clean['DateTime'].dt.month
+    df_clean['Dia'] = df_clean['DateTime'].dt.day
+    df_clean['Hora'] = df_clean['DateTime'].dt.hour
+    return esquema.aplicar_esquema(df_clean)
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    return str(tmp_path)
+
+
+def _escribir_crudo(dirs, df, modo="w"):
+    df.to_csv(limpieza.ruta_cruda(2025, dirs), mode=modo, header=modo == "w", index=False)
+
+
+def _leer_clean(dirs):
+    return esquema.leer_csv(limpieza.ruta_clean(2025, dirs))
+
+
+@pytest.mark.parametrize("ppm", [False, True])
+def test_equivale_al_notebook(dirs, ppm):
+    crudo = _crudo(["2025-01-01", "2025-01-02"], ppm=ppm)
+    _escribir_crudo(dirs, crudo)
+
+    assert limpieza.actualizar_anio(2025, dirs, dirs, filas_por_bloque=30) == len(crudo)
+    esperado = _notebook(pd.read_csv(limpieza.ruta_cruda(2025, dirs)))
+    pd.testing.assert_frame_equal(_leer_clean(dirs), esperado, check_exact=False)
+
+
+def test_solo_procesa_filas_nuevas(dirs, monkeypatch):
+    _escribir_crudo(dirs, _crudo(["2025-01-01", "2025-01-02"]))
+    limpieza.actualizar_anio(2025, dirs, dirs)
+
+    nuevo_dia = _crudo(["2025-01-03"])
+    _escribir_crudo(dirs, nuevo_dia, modo="a")
+    procesadas = []
+    limpiar = limpieza.limpiar
+    monkeypatch.setattr(limpieza, "limpiar", lambda df, escala: procesadas.append(len(df)) or limpiar(df, escala))
+
+    assert limpieza.actualizar_anio(2025, dirs, dirs) == len(nuevo_dia)
+    assert sum(procesadas) == len(nuevo_dia)
+    esperado = _notebook(pd.read_csv(limpieza.ruta_cruda(2025, dirs)))
+    pd.testing.assert_frame_equal(_leer_clean(dirs), esperado, check_exact=False)
+
+
+def test_falla_deja_el_limpio_intacto(dirs, monkeypatch):
+    _escribir_crudo(dirs, _crudo(["2025-01-01"]))
+    limpieza.actualizar_anio(2025, dirs, dirs)
+    ruta = limpieza.ruta_clean(2025, dirs)
+    antes = open(ruta, "rb").read()
+
+    _escribir_crudo(dirs, _crudo(["2025-01-02", "2025-01-03"]), modo="a")
+    limpiar = limpieza.limpiar
+    llamadas = []
+
+    def limpiar_fallando(df, escala):
+        llamadas.append(1)
+        if len(llamadas) == 2:
+            raise RuntimeError("fallo simulado")
+        return limpiar(df, escala)
+
+    monkeypatch.setattr(limpieza, "limpiar", limpiar_fallando)
+    with pytest.raises(RuntimeError):
+        limpieza.actualizar_anio(2025, dirs, dirs, filas_por_bloque=24)
+    assert open(ruta, "rb").read() == antes
+
+    monkeypatch.setattr(limpieza, "limpiar", limpiar)
+    assert limpieza.actualizar_anio(2025, dirs, dirs) == 2 * 2 * 24
+    assert not _leer_clean(dirs).duplicated(['Estacion', 'DateTime']).any()
+
+
+def test_descarta_escritura_interrumpida(dirs):
+    _escribir_crudo(dirs, _crudo(["2025-01-01"]))
+    limpieza.actualizar_anio(2025, dirs, dirs)
+    with open(limpieza.ruta_clean(2025, dirs), "a", encoding="utf-8") as f:
+        f.write("1.0,,20.0,0.5,0.004,40.0,,santa,2025-01-02 00:00:00,2025,1,2,0\n1.0,")
+
+    _escribir_crudo(dirs, _crudo(["2025-01-02"]), modo="a")
+    limpieza.actualizar_anio(2025, dirs, dirs)
+    df = _leer_clean(dirs)
+    assert len(df) == 2 * 2 * 24
+    assert not df.duplicated(['Estacion', 'DateTime']).any()
+
+
+def test_limpio_regenerado_reinicia_estado(dirs):
+    crudo = _crudo(["2025-01-01", "2025-01-02"])
+    _escribir_crudo(dirs, crudo)
+    limpieza.actualizar_anio(2025, dirs, dirs)
+
+    # El notebook reescribe el limpio con menos días; se completa desde el crudo.
+    _notebook(crudo[crudo['Fecha'] == "2025-01-01"]).to_csv(limpieza.ruta_clean(2025, dirs), index=False)
+    assert limpieza.actualizar_anio(2025, dirs, dirs) == 2 * 24
+    assert len(_leer_clean(dirs)) == len(crudo)
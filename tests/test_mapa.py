@@ -0,0 +1,50 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+import importlib
+
+import pandas as pd
+import pytest
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+@pytest.fixture
+def mapa(monkeypatch):
+    # utils.mapa lee el catálogo de estaciones con una ruta relativa a la raíz.
+    monkeypatch.chdir(RAIZ)
+    return importlib.import_module("utils.mapa")
+
+
+def test_capa_estaciones(mapa):
+    df_media = pd.DataFrame({'PM10': [30.0, float('nan'), 150.0]}, index=['santa', 'bine', 'vel'])
+    capa = mapa.capa_estaciones(df_media, 'PM10')
+
+    propiedades = {f['properties']['nombre']: f['properties'] for f in capa['features']}
+    assert set(propiedades) == {'Agua Santa', 'Benemérito Instituto Normal del Estado', 'Velódromo'}
+    assert propiedades['Agua Santa']['calidad'] == "Buena (Nivel 1)"
+    assert propiedades['Velódromo']['calidad'] == "Muy Mala (Nivel 4)"
+    assert propiedades['Velódromo']['color'] == "red"
+    sin_dato = propiedades['Benemérito Instituto Normal del Estado']
+    assert (sin_dato['valor'], sin_dato['color']) == ("No se obtuvo información", "gray")
+
+    assert mapa.capa_estaciones(df_media, 'O3')['features'] == []
+
+
+def test_mapa_base_estable(mapa):
+    from streamlit_folium import _get_map_string
+    assert _get_map_string(mapa.mapa_base()) == _get_map_string(mapa.mapa_base())
+
+
+def test_mapa_agrupado_envia_filas(mapa, monkeypatch):
+    df_media = pd.DataFrame({'PM10': [30.0, float('nan')]}, index=['santa', 'bine'])
+    filas = mapa.filas_agrupadas(df_media, 'PM10')
+    assert filas[0][2:] == ["green", "Agua Santa", "30.000 ppm", "Buena (Nivel 1)"]
+    assert filas[1][2:4] == ["gray", "Benemérito Instituto Normal del Estado"]
+
+    capas = []
+    monkeypatch.setattr(mapa, "st_folium", lambda base, feature_group_to_add, **kw: capas.append(feature_group_to_add))
+    mapa.mapa(df_media, 'PM10', agrupar=True)
+    mapa.mapa(df_media, 'PM10')
+    agrupada, simple = (list(capa._children.values())[0] for capa in capas)
+    assert type(agrupada).__name__ == "FastMarkerCluster" and agrupada.data == filas
+    assert type(simple).__name__ == "GeoJson"
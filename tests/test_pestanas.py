@@ -0,0 +1,29 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+from streamlit.testing.v1 import AppTest
+
+
+def _pagina():
+    import streamlit as st
+    from utils.pestanas import pestana_activa
+
+    vista = pestana_activa(["Línea", "Barras", "Caja"], "vista_prueba")
+    if vista == "Línea":
+        st.write("linea")
+    elif vista == "Barras":
+        st.write("barras")
+    else:
+        st.write("caja")
+
+
+def test_solo_se_ejecuta_la_vista_seleccionada():
+    at = AppTest.from_function(_pagina).run()
+    assert [m.value for m in at.markdown] == ["linea"]
+
+    at.radio[0].set_value("Caja").run()
+    assert [m.value for m in at.markdown] == ["caja"]
+
+    # La selección se conserva en la sesión entre ejecuciones.
+    at.run()
+    assert at.session_state["vista_prueba"] == "Caja"
+    assert [m.value for m in at.markdown] == ["caja"]
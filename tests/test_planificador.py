@@ -0,0 +1,102 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "notebooks", "scraping")))
+import asyncio
+
+import pytest
+
+import planificador
+
+
+def _unidades(n_fechas=6, estaciones=("santa", "bine")):
+    return [(f"2024-01-{d:02d}", e) for e in estaciones for d in range(1, n_fechas + 1)]
+
+
+def test_reparte_entre_trabajadores():
+    atendidas = {}
+
+    async def procesar(recurso, unidad):
+        await asyncio.sleep(0.01)
+        atendidas.setdefault(recurso, []).append(unidad)
+        return unidad[0]
+
+    unidades = _unidades()
+    resultado = asyncio.run(planificador.ejecutar(unidades, ["p1", "p2", "p3"], procesar))
+
+    assert set(resultado.completadas) == set(unidades)
+    assert not resultado.fallidas
+    assert set(atendidas) == {"p1", "p2", "p3"}
+
+
+def test_escala_con_trabajadores():
+    async def procesar(recurso, unidad):
+        await asyncio.sleep(0.05)
+
+    async def medir(n):
+        inicio = asyncio.get_running_loop().time()
+        await planificador.ejecutar(_unidades(4), list(range(n)), procesar)
+        return asyncio.get_running_loop().time() - inicio
+
+    assert asyncio.run(medir(8)) < asyncio.run(medir(1)) / 3
+
+
+def test_unidad_atascada_pasa_a_otro_trabajador():
+    reinicios = []
+    atendida_por = {}
+
+    async def procesar(recurso, unidad):
+        if recurso == "lenta":
+            await asyncio.sleep(10)  # se atasca
+        atendida_por[unidad] = recurso
+        return "ok"
+
+    async def reiniciar(recurso):
+        reinicios.append(recurso)
+
+    unidades = _unidades(3, ("santa",))
+    resultado = asyncio.run(planificador.ejecutar(
+        unidades, ["lenta", "rapida"], procesar, reiniciar=reiniciar, arrendamiento=0.05, max_intentos=5,
+    ))
+
+    assert set(resultado.completadas) == set(unidades)
+    assert set(atendida_por.values()) == {"rapida"}
+    assert "lenta" in reinicios
+
+
+def test_unidad_fallida_tras_max_intentos():
+    cerradas = []
+
+    async def procesar(recurso, unidad):
+        if unidad[1] == "vel":
+            raise ValueError("Datos incompletos o vacíos")
+        return []
+
+    unidades = _unidades(2, ("santa", "vel"))
+    resultado = asyncio.run(planificador.ejecutar(
+        unidades, ["p1", "p2"], procesar, max_intentos=2,
+        al_terminar=lambda unidad, valor, error: cerradas.append(unidad),
+    ))
+
+    assert set(resultado.fallidas) == {u for u in unidades if u[1] == "vel"}
+    assert all(resultado.intentos[u] == 2 for u in resultado.fallidas)
+    assert sorted(cerradas) == sorted(unidades)
+
+
+def test_error_al_terminar_detiene_y_se_relanza():
+    cerradas = []
+
+    async def procesar(recurso, unidad):
+        await asyncio.sleep(0.001)
+        return []
+
+    def al_terminar(unidad, valor, error):
+        if len(cerradas) == 3:
+            raise OSError("disco lleno")
+        cerradas.append(unidad)
+
+    async def correr():
+        return await asyncio.wait_for(
+            planificador.ejecutar(_unidades(), ["p1", "p2"], procesar, al_terminar=al_terminar), 5)
+
+    with pytest.raises(OSError, match="disco lleno"):
+        asyncio.run(correr())
+    assert len(cerradas) == 3
@@ -0,0 +1,84 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import data_loader, pronosticadores
+
+
+def _tensor(horas=24 * 21, estaciones=3, contaminantes=2, ruido=0.0, semilla=0):
+    rng = np.random.default_rng(semilla)
+    t = np.arange(horas)[:, None, None]
+    escala = np.arange(1, estaciones * contaminantes + 1).reshape(1, estaciones, contaminantes)
+    diaria = 10 * np.cos(2 * np.pi * (t % 24 - 14) / 24)
+    semanal = 3 * np.sin(2 * np.pi * t / 168)
+    return 20 * escala + diaria + semanal + rng.normal(0, ruido, (horas, estaciones, contaminantes))
+
+
+def test_tensor_horario_rejilla_completa():
+    df = pd.DataFrame({
+        'Estacion': ['santa', 'vel', 'santa'],
+        'DateTime': pd.to_datetime(["2025-01-01 00:00", "2025-01-01 00:00", "2025-01-01 03:00"]),
+        'PM10': [1.0, 2.0, 3.0],
+        'O3': [0.1, 0.2, np.nan],
+    })
+    valores, horas, estaciones, contaminantes = pronosticadores.tensor_horario(df, ['PM10', 'O3', 'CO'])
+    assert valores.shape == (4, 2, 2)
+    assert estaciones == ['santa', 'vel'] and contaminantes == ['PM10', 'O3']
+    assert horas[-1] == pd.Timestamp("2025-01-01 03:00")
+    assert valores[3, 0, 0] == 3.0 and np.isnan(valores[1, 0, 0]) and np.isnan(valores[3, 0, 1])
+
+
+def test_ingenuo_estacional_repite_el_ultimo_dia():
+    valores = _tensor(horas=48)
+    valores[-1, 0, 0] = np.nan
+    pronostico = pronosticadores.ingenuo_estacional(valores, 30)
+    assert pronostico.shape == (30, 3, 2)
+    np.testing.assert_allclose(pronostico[1:23], valores[-23:-1])
+    assert pronostico[23, 0, 0] == valores[-2, 0, 0]  # hueco relleno con el último dato
+    np.testing.assert_allclose(pronostico[24:], pronostico[:6])
+
+
+@pytest.mark.parametrize("metodo", ["suavizamiento", "ridge"])
+def test_metodos_recuperan_la_estacionalidad(metodo):
+    valores = _tensor(ruido=1.0)
+    futuro = _tensor(horas=24 * 21 + 48)[-48:]
+    valores[::7, 1, 1] = np.nan  # horas sin dato
+    pronostico = pronosticadores.METODOS[metodo](valores, 48)
+    ingenuo = pronosticadores.ingenuo_estacional(valores, 48)
+    error = np.sqrt(np.mean((pronostico - futuro) ** 2))
+    assert error < 2.0
+    assert error <= np.sqrt(np.mean((ingenuo - futuro) ** 2))
+
+
+def test_pronosticar_intervalo_y_tabla():
+    valores = _tensor(horas=24 * 10, ruido=2.0)
+    valores[:, 2, 1] = np.nan
+    valores[:200, 1, 0] = np.nan  # cobertura insuficiente
+    horas = pd.date_range("2025-01-01", periods=len(valores), freq="h")
+    pronostico, inferior, superior = pronosticadores.pronosticar(valores, 24, 'ridge')
+    assert np.isfinite(pronostico).all()
+    assert (inferior <= pronostico).all() and (pronostico <= superior).all() and (inferior >= 0).all()
+
+    df = pronosticadores.a_tabla(pronostico, inferior, superior, valores, horas,
+                                 ['santa', 'vel', 'utp'], ['PM10', 'O3'], 'ridge')
+    assert list(df.columns) == data_loader.COLUMNAS_PRONOSTICOS
+    assert len(df) == 4 * 24
+    assert set(zip(df['Estacion'], df['Contaminante'])) == {
+        ('santa', 'PM10'), ('santa', 'O3'), ('vel', 'O3'), ('utp', 'PM10')}
+    utp = df[(df['Estacion'] == 'utp') & (df['Contaminante'] == 'PM10')]
+    assert utp['DateTime'].iloc[0] == horas[-1] + pd.Timedelta(hours=1)
+    assert list(utp['horizonte']) == list(range(1, 25))
+    np.testing.assert_allclose(utp['pronostico'], pronostico[:, 2, 0], rtol=1e-6)
+
+
+@pytest.mark.parametrize("metodo", sorted(pronosticadores.METODOS))
+@pytest.mark.parametrize("horas", [0, 1, 10])
+def test_historia_corta_pronostica_la_media(metodo, horas):
+    valores = _tensor(horas=horas)
+    pronostico, inferior, superior = pronosticadores.pronosticar(valores, 24, metodo)
+    assert pronostico.shape == (24, 3, 2)
+    esperado = valores.mean(axis=0) if horas else np.zeros((3, 2))
+    np.testing.assert_allclose(pronostico, np.broadcast_to(esperado, pronostico.shape))
+    assert np.isfinite(inferior).all() and np.isfinite(superior).all()
@@ -0,0 +1,97 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "notebooks", "modelado")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import data_loader
+
+pytest.importorskip("statsmodels")
+import pronosticos
+import seleccion_sarimax
+
+
+@pytest.fixture(autouse=True)
+def directorio(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_loader, "DIR_PRONOSTICOS", str(tmp_path / "Pronosticos"))
+    data_loader.CACHE_DATOS.limpiar()
+    yield
+    data_loader.CACHE_DATOS.limpiar()
+
+
+def _serie(semilla=0, horas=24 * 7):
+    rng = np.random.default_rng(semilla)
+    indice = pd.date_range("2025-01-01", periods=horas, freq="h")
+    valores = 40 + 15 * np.cos(2 * np.pi * (indice.hour - 14) / 24) + rng.normal(0, 3, horas)
+    return pd.Series(valores, index=indice)
+
+
+def test_ordenes_elegidas_usa_la_ultima_busqueda():
+    actual, anterior = _serie(0), _serie(1)
+    tabla = pd.DataFrame({
+        'Estacion': ['santa', 'santa', 'vel'],
+        'Contaminante': ['PM10', 'PM10', 'O3'],
+        'version': [seleccion_sarimax.version_serie(anterior)] * 2 + ['otra'],
+        'orden': ["1,0,0", "2,0,1", "1,1,1"],
+        'estacional': ["0,1,1,24", "0,0,0,24", "1,1,1,24"],
+        'estado': ['ok', 'ok', 'error'],
+        'aic': [10.0, 5.0, np.nan],
+    })
+    ordenes = pronosticos.ordenes_elegidas(tabla, {('santa', 'PM10'): actual, ('vel', 'O3'): actual,
+                                                   ('utp', 'CO'): actual})
+    assert ordenes[('santa', 'PM10')] == ((2, 0, 1), (0, 0, 0, 24))
+    assert ordenes[('vel', 'O3')] == pronosticos.ORDEN_POR_OMISION
+    assert ordenes[('utp', 'CO')] == pronosticos.ORDEN_POR_OMISION
+
+
+def test_pronostico_guardado_y_lectura():
+    series = {('santa', 'PM10'): _serie(0), ('vel', 'PM10'): _serie(1)}
+    ordenes = {('santa', 'PM10'): ((1, 0, 0), (1, 0, 0, 24))}
+    df = pronosticos.pronosticar_series(series, ordenes, horizonte=48, procesos=1)
+    assert len(df) == 2 * 48
+    assert list(df.columns) == data_loader.COLUMNAS_PRONOSTICOS
+    assert (df['inferior'] <= df['pronostico']).all() and (df['pronostico'] <= df['superior']).all()
+    assert (df['inferior'] >= 0).all()
+    santa = df[df['Estacion'] == 'santa']
+    assert santa['DateTime'].iloc[0] == pd.Timestamp("2025-01-08 00:00")
+    assert set(df['modelo']) == {"SARIMAX(1,0,0)x(1,0,0,24)", "SARIMAX(1,0,1)x(0,1,1,24)"}
+
+    assert data_loader.cargar_pronosticos().empty
+    pronosticos.guardar(df)
+    leidos = data_loader.cargar_pronosticos(estaciones=['vel'], horas=24)
+    assert len(leidos) == 24 and set(leidos['Estacion']) == {'vel'}
+    assert leidos['horizonte'].max() == 24
+    assert len(data_loader.cargar_pronosticos(contaminantes=['O3'])) == 0
+
+
+def test_orden_que_falla_usa_el_orden_por_omision(monkeypatch):
+    ordenes = {('santa', 'PM10'): ((9, 0, 0), (0, 0, 0, 24))}
+    original = pronosticos.pronosticar
+
+    def pronosticar(valores, orden, estacional, *args, **kwargs):
+        if orden == (9, 0, 0):
+            return None
+        return original(valores, orden, estacional, *args, **kwargs)
+
+    monkeypatch.setattr(pronosticos, "pronosticar", pronosticar)
+    df = pronosticos.pronosticar_series({('santa', 'PM10'): _serie()}, ordenes, horizonte=24, procesos=1)
+    assert set(df['modelo']) == {"SARIMAX(1,0,1)x(0,1,1,24)"}
+
+
+def test_series_sin_sarimax_toman_el_respaldo():
+    indice = pd.date_range("2025-01-01", periods=24 * 7, freq="h")
+    horas = pd.concat([
+        pd.DataFrame({'Estacion': estacion, 'DateTime': indice, 'PM10': _serie(i).to_numpy()})
+        for i, estacion in enumerate(['santa', 'vel'])
+    ], ignore_index=True)
+    respaldo = pronosticos.pronosticar_red(horas, horizonte=24)
+    assert set(respaldo['modelo']) == {pronosticos.RESPALDO}
+    assert set(respaldo['Estacion']) == {'santa', 'vel'}
+
+    sarimax = pronosticos.pronosticar_series({('santa', 'PM10'): _serie(0)}, {}, horizonte=24, procesos=1)
+    df = pronosticos.completar(sarimax, respaldo)
+    assert len(df) == 2 * 24
+    modelos = df.groupby('Estacion', observed=True)['modelo'].first().astype(str)
+    assert modelos['santa'].startswith("SARIMAX") and modelos['vel'] == pronosticos.RESPALDO
+    assert list(df.columns) == data_loader.COLUMNAS_PRONOSTICOS
@@ -0,0 +1,83 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "notebooks", "modelado")))
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("statsmodels")
+import seleccion_sarimax
+
+COMBINACIONES = [((0, 0, 0), (0, 0, 0, 24)), ((1, 0, 0), (0, 0, 0, 24)), ((1, 0, 1), (0, 0, 0, 24)),
+                 ((2, 0, 2), (0, 0, 0, 24))]
+
+
+def _serie(semilla=0, horas=24 * 6):
+    rng = np.random.default_rng(semilla)
+    ruido = rng.normal(0, 1, horas)
+    valores = np.empty(horas)
+    valores[0] = ruido[0]
+    for i in range(1, horas):
+        valores[i] = 0.8 * valores[i - 1] + ruido[i]
+    valores[rng.random(horas) < 0.05] = np.nan
+    return pd.Series(50 + valores, index=pd.date_range("2025-01-01", periods=horas, freq="h"))
+
+
+def test_busqueda_en_pool_y_reejecucion_sin_reajustes(tmp_path, monkeypatch):
+    ruta = str(tmp_path / "sarimax.csv")
+    series = {('santa', 'PM10'): _serie(0), ('vel', 'O3'): _serie(1)}
+    tabla = seleccion_sarimax.buscar(series, COMBINACIONES, procesos=2, paciencia=5, ruta=ruta)
+    assert len(tabla) == 2 * len(COMBINACIONES)
+    assert set(tabla['estado']) <= {'ok', 'sin_convergencia'}
+
+    elegidos = seleccion_sarimax.mejores(tabla).set_index(['Estacion', 'Contaminante'])
+    assert elegidos.loc[('santa', 'PM10'), 'orden'] != "0,0,0"
+    assert "ar.L1" in elegidos.loc[('santa', 'PM10'), 'parametros']
+
+    def no_ajustar(*args):
+        raise AssertionError("reajuste innecesario")
+
+    monkeypatch.setattr(seleccion_sarimax, "ajustar", no_ajustar)
+    repetida = seleccion_sarimax.buscar(series, COMBINACIONES, procesos=1, paciencia=5, ruta=ruta)
+    pd.testing.assert_frame_equal(repetida, seleccion_sarimax.leer_tabla(ruta))
+
+
+def test_nueva_version_de_datos_se_reajusta(tmp_path):
+    ruta = str(tmp_path / "sarimax.csv")
+    serie = _serie(0)
+    seleccion_sarimax.buscar({('santa', 'PM10'): serie}, COMBINACIONES[:2], procesos=1, ruta=ruta)
+    modificada = serie.copy()
+    modificada.iloc[-1] += 1
+    tabla = seleccion_sarimax.buscar({('santa', 'PM10'): modificada}, COMBINACIONES[:2], procesos=1, ruta=ruta)
+    assert tabla['version'].nunique() == 2 and len(tabla) == 4
+
+
+def test_parada_temprana_por_nivel(tmp_path, monkeypatch):
+    aic_por_nivel = {0: 100.0, 1: 99.0, 2: 90.0, 4: 10.0}
+    llamadas = []
+
+    def ajustar(valores, orden, estacional, limite, max_iteraciones):
+        n = seleccion_sarimax.nivel(orden, estacional)
+        llamadas.append(n)
+        return {'estado': 'ok', 'aic': aic_por_nivel[n], 'iteraciones': 1, 'segundos': 0.0, 'parametros': "{}"}
+
+    monkeypatch.setattr(seleccion_sarimax, "ajustar", ajustar)
+    tabla = seleccion_sarimax.buscar({('santa', 'PM10'): _serie()}, COMBINACIONES, procesos=1, paciencia=1,
+                                     tolerancia=2.0, ruta=str(tmp_path / "sarimax.csv"))
+    # El nivel 1 no mejora en más de 2 unidades de AIC: los niveles 2 y 4 no se ajustan.
+    assert llamadas == [0, 1]
+    assert seleccion_sarimax.mejores(tabla)['aic'].tolist() == [99.0]
+
+
+def test_limite_de_tiempo_por_ajuste():
+    resultado = seleccion_sarimax.ajustar(_serie().to_numpy(), (2, 0, 2), (1, 0, 1, 24), limite=0.0)
+    assert resultado['estado'] == 'tiempo'
+    assert np.isnan(resultado['aic'])
+
+
+def test_series_horarias_descarta_poca_cobertura():
+    horas = pd.date_range("2025-01-01", periods=48, freq="h")
+    df = pd.DataFrame({'Estacion': ['santa'] * 48, 'DateTime': horas,
+                       'PM10': np.arange(48.0), 'O3': [1.0] * 10 + [np.nan] * 38})
+    series = seleccion_sarimax.series_horarias(df.drop(index=[5, 6]), ['PM10', 'O3'])
+    assert list(series) == [('santa', 'PM10')]
+    assert len(series[('santa', 'PM10')]) == 48 and series[('santa', 'PM10')].isna().sum() == 2
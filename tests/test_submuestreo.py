@@ -0,0 +1,58 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.submuestreo import indices_lttb, indices_minmax, submuestrear
+
+
+def _serie_horaria(n=8760, semilla=0):
+    rng = np.random.default_rng(semilla)
+    horas = pd.date_range("2024-01-01", periods=n, freq="h")
+    return pd.Series(50 + 20 * np.sin(np.arange(n) / 24) + rng.normal(0, 5, n), index=horas)
+
+
+def test_serie_corta_sin_cambios():
+    serie = _serie_horaria(500)
+    assert submuestrear(serie, 1000) is serie
+
+
+@pytest.mark.parametrize("metodo", ["minmax", "lttb"])
+def test_respeta_presupuesto_y_extremos(metodo):
+    serie = _serie_horaria()
+    serie.iloc[4321] = 400.0  # excedencia aislada
+
+    reducida = submuestrear(serie, 1000, metodo)
+
+    assert len(reducida) <= 1000
+    assert reducida.index.is_monotonic_increasing
+    assert reducida.index[0] == serie.index[0] and reducida.index[-1] == serie.index[-1]
+    assert reducida.max() == 400.0
+
+
+def test_minmax_conserva_minimo_y_maximo_global():
+    serie = _serie_horaria(semilla=3)
+    reducida = submuestrear(serie, 200)
+    assert reducida.max() == serie.max()
+    assert reducida.min() == serie.min()
+
+
+def test_minmax_conserva_huecos():
+    y = np.arange(1000, dtype=float)
+    y[400:600] = np.nan
+    indices = indices_minmax(y, 100)
+    assert np.isnan(y[indices]).any()
+
+
+def test_lttb_omite_nan():
+    y = np.arange(1000, dtype=float)
+    y[::7] = np.nan
+    indices = indices_lttb(np.arange(1000), y, 100)
+    assert len(indices) == 100
+    assert not np.isnan(y[indices]).any()
+
+
+def test_metodo_desconocido():
+    with pytest.raises(ValueError):
+        submuestrear(_serie_horaria(), 100, "otro")